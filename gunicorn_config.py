@@ -71,3 +71,24 @@ def post_worker_init(worker):
     """Worker 초기화 후"""
     print(f"Worker {worker.pid} initialized")
 
+    # AI 클라이언트 미리 생성 (첫 요청에서 genai 초기화 비용 제거)
+    if os.environ.get('GEMINI_WARMUP', 'true').lower() in ('1', 'true', 'yes'):
+        try:
+            from nutrients_codi.ai_service import get_gemini_service
+            from recipe_ai.ai_service import get_recipe_ai_service
+            get_gemini_service()
+            get_recipe_ai_service()
+            print(f"Worker {worker.pid} AI clients ready")
+        except Exception as e:
+            print(f"Worker {worker.pid} AI client warmup skipped: {e}")
+
+    # 음식명 자동완성 / n-gram 인덱스 미리 구성 (첫 검색 지연 제거)
+    try:
+        from nutrients_codi.autocomplete import get_food_autocomplete_index
+        from nutrients_codi.ngram_index import get_food_ngram_index
+        get_food_autocomplete_index(warm=True)
+        get_food_ngram_index()
+        print(f"Worker {worker.pid} food autocomplete index ready")
+    except Exception as e:
+        print(f"Worker {worker.pid} food autocomplete warmup skipped: {e}")
+
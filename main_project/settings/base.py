@@ -209,6 +209,63 @@ ACCOUNT_EMAIL_CONFIRMATION_EXPIRE_DAYS = 3
 # Google Gemini API
 GEMINI_API_KEY = config('GEMINI_API_KEY', default='')
 
+# 음식 분석 LLM 폴백 (DB에 없는 음식의 영양성분 생성)
+FOOD_LLM_MAX_WORKERS = config('FOOD_LLM_MAX_WORKERS', default=4, cast=int)  # 동시 LLM 호출 수
+FOOD_LLM_TIMEOUT = config('FOOD_LLM_TIMEOUT', default=30, cast=float)  # 요청당 LLM 대기 한도 (초)
+FOOD_LLM_BATCH_SIZE = config('FOOD_LLM_BATCH_SIZE', default=5, cast=int)  # LLM 호출 1회당 음식 수
+
+# 음식 입력 파싱(analyze_food_text) 결과 캐시 유효 기간 (초, 기본 30일)
+FOOD_PARSE_CACHE_TTL = config('FOOD_PARSE_CACHE_TTL', default=60 * 60 * 24 * 30, cast=int)
+
+# 임베딩 캐시 (EmbeddingCache 테이블 + 프로세스 내 LRU)
+EMBEDDING_CACHE_MAX_ENTRIES = config('EMBEDDING_CACHE_MAX_ENTRIES', default=50000, cast=int)  # 초과 시 오래 안 쓴 항목부터 삭제
+EMBEDDING_CACHE_LRU_SIZE = config('EMBEDDING_CACHE_LRU_SIZE', default=2048, cast=int)  # 워커당 메모리 캐시 항목 수
+
+# 음식 임베딩 검색 백엔드: 'pgvector' (DB) 또는 'ann' (manage.py build_food_ann_index로 만든 메모리 매핑 인덱스)
+FOOD_SEARCH_BACKEND = config('FOOD_SEARCH_BACKEND', default='pgvector')
+FOOD_ANN_INDEX_DIR = config('FOOD_ANN_INDEX_DIR', default=str(BASE_DIR / 'food_ann_index'))
+FOOD_ANN_NPROBE = config('FOOD_ANN_NPROBE', default=8, cast=int)  # 검색 시 탐색할 클러스터 수
+FOOD_ANN_REFRESH_SECONDS = config('FOOD_ANN_REFRESH_SECONDS', default=30, cast=int)  # 인덱스 이후 추가된 음식을 DB에서 반영하는 주기 (초)
+
+# pgvector 검색 모드: 'full' (1536차원 HNSW), 'halfvec' / 'binary' (축소 표현 인덱스로 후보 검색 후 1536차원 재정렬)
+# 모드에 맞는 인덱스는 manage.py create_hnsw_index_1536 --mode 로 생성
+FOOD_VECTOR_SEARCH_MODE = config('FOOD_VECTOR_SEARCH_MODE', default='full')
+FOOD_VECTOR_HALFVEC_DIMENSIONS = config('FOOD_VECTOR_HALFVEC_DIMENSIONS', default=256, cast=int)
+FOOD_VECTOR_RERANK_K = config('FOOD_VECTOR_RERANK_K', default=40, cast=int)  # 재정렬할 후보 수 (hnsw.ef_search 이하로)
+# 쿼리마다 SET LOCAL hnsw.ef_search 로 적용 (0이면 서버 기본값), 값은 create_hnsw_index_1536 --sweep 결과로 정함
+FOOD_HNSW_EF_SEARCH = config('FOOD_HNSW_EF_SEARCH', default=40, cast=int)
+
+# 트라이그램(pg_trgm) + 벡터 하이브리드 음식 검색 (reciprocal rank fusion)
+FOOD_TRIGRAM_THRESHOLD = config('FOOD_TRIGRAM_THRESHOLD', default=0.3, cast=float)  # 후보로 가져올 최소 트라이그램 유사도
+FOOD_TRIGRAM_MATCH_THRESHOLD = config('FOOD_TRIGRAM_MATCH_THRESHOLD', default=0.6, cast=float)  # 매칭으로 인정할 트라이그램 유사도
+FOOD_HYBRID_CANDIDATES = config('FOOD_HYBRID_CANDIDATES', default=20, cast=int)  # 트라이그램/벡터 순위별 후보 수
+FOOD_RRF_K = config('FOOD_RRF_K', default=60, cast=int)  # RRF 점수 = 1 / (k + 순위)
+
+# 음식명 n-gram 역색인 (manage.py build_food_ngram_index로 생성, 파일이 없으면 워커가 메모리에서 구성)
+FOOD_NGRAM_INDEX_PATH = config('FOOD_NGRAM_INDEX_PATH', default=str(BASE_DIR / 'food_ngram_index.pkl'))
+FOOD_NGRAM_SHORTLIST = config('FOOD_NGRAM_SHORTLIST', default=50, cast=int)  # 유사도를 계산할 후보 수
+FOOD_NGRAM_REFRESH_SECONDS = config('FOOD_NGRAM_REFRESH_SECONDS', default=30, cast=int)  # 인덱스 이후 추가된 음식을 DB에서 반영하는 주기 (초)
+FOOD_STRING_MATCH_THRESHOLD = config('FOOD_STRING_MATCH_THRESHOLD', default=0.95, cast=float)  # 문자열 유사도 매칭 임계값 (낮추면 글자만 비슷한 다른 음식으로 매칭됨)
+
+# 음식 키워드 사전 (조리법/재료/음식 유형, JSON). 바꾼 뒤 manage.py backfill_food_keywords --all 실행
+FOOD_KEYWORDS_FILE = config('FOOD_KEYWORDS_FILE', default=str(BASE_DIR / 'nutrients_codi' / 'food_keywords.json'))
+
+# 음식명 자동완성 (프로세스 메모리 인덱스, nutrients_codi/autocomplete.py)
+FOOD_AUTOCOMPLETE_REFRESH_SECONDS = config('FOOD_AUTOCOMPLETE_REFRESH_SECONDS', default=30, cast=int)  # 새 음식 증분 반영 주기
+FOOD_AUTOCOMPLETE_REBUILD_SECONDS = config('FOOD_AUTOCOMPLETE_REBUILD_SECONDS', default=600, cast=int)  # 전체 재구성(이름 변경/삭제, 인기순) 주기
+FOOD_AUTOCOMPLETE_POPULARITY_DAYS = config('FOOD_AUTOCOMPLETE_POPULARITY_DAYS', default=180, cast=int)  # 인기순 집계 기간
+
+# 임베딩 검색 결과 캐시 (CACHES['food_resolution'], Food 추가·삭제·이름/임베딩 변경 커밋 시 전체 무효화)
+FOOD_RESOLUTION_CACHE_TTL = config('FOOD_RESOLUTION_CACHE_TTL', default=604800, cast=int)  # 매칭 성공 (7일)
+FOOD_RESOLUTION_NEGATIVE_TTL = config('FOOD_RESOLUTION_NEGATIVE_TTL', default=600, cast=int)  # 매칭 실패 (10분)
+
+# 음식 분석 백그라운드 작업 (manage.py run_analysis_worker)
+ANALYSIS_WORKER_CONCURRENCY = config('ANALYSIS_WORKER_CONCURRENCY', default=2, cast=int)  # 워커 스레드 수
+ANALYSIS_WORKER_POLL_INTERVAL = config('ANALYSIS_WORKER_POLL_INTERVAL', default=1.0, cast=float)  # 대기 작업 조회 간격 (초)
+ANALYSIS_JOB_MAX_ATTEMPTS = config('ANALYSIS_JOB_MAX_ATTEMPTS', default=3, cast=int)  # 작업당 최대 시도 횟수
+ANALYSIS_JOB_RETRY_DELAY = config('ANALYSIS_JOB_RETRY_DELAY', default=10, cast=int)  # 재시도 기본 지연 (초, 시도마다 2배)
+ANALYSIS_JOB_STALE_TIMEOUT = config('ANALYSIS_JOB_STALE_TIMEOUT', default=300, cast=int)  # 이 시간 넘게 실행 중인 작업은 재시도
+
 # YouTube Data API
 YOUTUBE_API_KEY = config('GEMINI_API_KEY', default='')
 
@@ -282,5 +339,15 @@ CACHES = {
         'OPTIONS': {
             'MAX_ENTRIES': 1000  # 최대 1000개 캐시 항목
         }
+    },
+    # 음식명 → 임베딩 검색 결과 캐시 (nutrients_codi/resolution_cache.py, 공용 캐시 항목을 밀어내지 않도록 분리)
+    'food_resolution': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'food_resolution_cache',
+        'TIMEOUT': 604800,  # 7일 (매칭 실패는 FOOD_RESOLUTION_NEGATIVE_TTL)
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+            'CULL_FREQUENCY': 4,
+        }
     }
 }
@@ -48,7 +48,8 @@ CACHES = {
             'MAX_ENTRIES': 5000,
             'CULL_FREQUENCY': 3,
         }
-    }
+    },
+    'food_resolution': CACHES['food_resolution'],  # base 설정 그대로 사용
 }
 
 # Production logging (console only, less verbose)
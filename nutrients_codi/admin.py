@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from .models import Profile, Food, FoodLog, CommunityPost, CommunityComment
+from .models import Profile, Food, FoodAlias, FoodLog, DailyNutritionSummary, FoodParseCache, EmbeddingCache, AnalysisJob, CommunityPost, CommunityComment
 
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
@@ -73,7 +73,8 @@ class FoodAdmin(admin.ModelAdmin):
     list_display = ['name', 'category', 'calories', 'protein', 'carbs', 'fat']
     list_filter = ['category', 'source']
     search_fields = ['name', 'food_code']  # autocomplete을 위해 필요
-    readonly_fields = ['created_at', 'updated_at', 'embedding_preview']
+    readonly_fields = ['created_at', 'updated_at', 'embedding_preview', 'keywords']
+    actions = ['recompute_food_log_totals']
     
     # 🔥 매우 중요: 대용량 테이블 최적화
     list_per_page = 25  # 100 → 25로 축소
@@ -90,7 +91,7 @@ class FoodAdmin(admin.ModelAdmin):
     
     fieldsets = (
         ('기본 정보', {
-            'fields': ('name', 'food_code', 'category', 'subcategory', 'source')
+            'fields': ('name', 'food_code', 'category', 'subcategory', 'source', 'keywords')
         }),
         ('기본 영양소', {
             'fields': ('calories', 'protein', 'carbs', 'fat', 'fiber', 'sugar', 'sodium'),
@@ -134,6 +135,16 @@ class FoodAdmin(admin.ModelAdmin):
         
         return qs
     
+    def recompute_food_log_totals(self, request, queryset):
+        from .utils_optimized import recompute_food_log_totals
+        food_ids = list(queryset.values_list('id', flat=True))
+        updated, user_ids = recompute_food_log_totals(food_ids=food_ids)
+        self.message_user(
+            request,
+            f"음식 {len(food_ids)}개의 섭취 기록 {updated}개를 재계산했습니다 (사용자 {len(user_ids)}명 캐시 무효화)."
+        )
+    recompute_food_log_totals.short_description = "선택한 음식의 섭취 기록 영양소 재계산"
+    
     def embedding_preview(self, obj):
         # VectorField는 None 체크만 가능
         if obj.embedding is not None:
@@ -155,6 +166,21 @@ class FoodAdmin(admin.ModelAdmin):
         return "임베딩 없음"
     embedding_preview.short_description = "임베딩 미리보기"
 
+@admin.register(FoodAlias)
+class FoodAliasAdmin(admin.ModelAdmin):
+    list_display = ['alias', 'food', 'match_type', 'similarity', 'created_at']
+    list_filter = ['match_type']
+    search_fields = ['alias', 'food__name']
+    readonly_fields = ['created_at']
+    autocomplete_fields = ['food']
+    
+    # 최적화
+    list_per_page = 50
+    show_full_result_count = False
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('food').defer('food__embedding')
+
 @admin.register(FoodLog)
 class FoodLogAdmin(admin.ModelAdmin):
     list_display = ['user', 'food', 'quantity', 'meal_type', 'consumed_date', 'total_calories']
@@ -190,6 +216,143 @@ class FoodLogAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('user', 'food')
 
+@admin.register(DailyNutritionSummary)
+class DailyNutritionSummaryAdmin(admin.ModelAdmin):
+    list_display = ['user', 'date', 'food_count', 'total_calories', 'total_protein', 'total_carbs', 'total_fat', 'updated_at']
+    search_fields = ['user__username']
+    date_hierarchy = 'date'
+    raw_id_fields = ['user']
+    actions = ['rebuild_selected']
+    
+    # 최적화
+    list_per_page = 50
+    show_full_result_count = False
+    
+    def has_add_permission(self, request):
+        # FoodLog 변경 시 자동으로 유지되므로 직접 추가하지 않음
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
+    
+    def rebuild_selected(self, request, queryset):
+        from .daily_summary import rebuild_daily_summaries
+        from .utils_optimized import bump_nutrition_cache_versions
+        selected = list(queryset.values_list('user_id', 'date'))
+        rebuilt = 0
+        for user_id, date in selected:
+            rebuilt += rebuild_daily_summaries([user_id], date, date)
+        bump_nutrition_cache_versions(user_id for user_id, _ in selected)
+        self.message_user(request, f"일별 합계 {rebuilt}개를 FoodLog에서 다시 계산했습니다.")
+    rebuild_selected.short_description = "선택한 일별 합계를 FoodLog에서 다시 계산"
+
+@admin.register(FoodParseCache)
+class FoodParseCacheAdmin(admin.ModelAdmin):
+    list_display = ['normalized_text_preview', 'language', 'food_count', 'hit_count', 'miss_count', 'last_hit_at', 'expires_at', 'is_expired']
+    list_filter = ['language']
+    search_fields = ['normalized_text']
+    readonly_fields = ['cache_key', 'normalized_text', 'language', 'parsed_foods', 'hit_count', 'miss_count', 'last_hit_at', 'expires_at', 'created_at', 'updated_at']
+    actions = ['purge_expired']
+    
+    # 최적화
+    list_per_page = 50
+    show_full_result_count = False
+    
+    def changelist_view(self, request, extra_context=None):
+        """목록 제목에 전체 적중률 표시"""
+        from .parse_cache import parse_cache_stats
+        stats = parse_cache_stats()
+        extra_context = extra_context or {}
+        extra_context['title'] = (
+            f"AI 파싱 캐시 - 적중률 {stats['hit_rate'] * 100:.1f}% "
+            f"(적중 {stats['hits']:,} / 미스 {stats['misses']:,}, 항목 {stats['entries']:,}개)"
+        )
+        return super().changelist_view(request, extra_context=extra_context)
+    
+    def normalized_text_preview(self, obj):
+        if len(obj.normalized_text) > 40:
+            return obj.normalized_text[:40] + "..."
+        return obj.normalized_text
+    normalized_text_preview.short_description = "입력 텍스트"
+    
+    def food_count(self, obj):
+        return len(obj.parsed_foods) if isinstance(obj.parsed_foods, list) else 0
+    food_count.short_description = "음식 수"
+    
+    def is_expired(self, obj):
+        from django.utils import timezone
+        return obj.expires_at <= timezone.now()
+    is_expired.short_description = "만료"
+    is_expired.boolean = True
+    
+    def purge_expired(self, request, queryset):
+        from .parse_cache import purge_parse_cache
+        deleted = purge_parse_cache(expired_only=True)
+        self.message_user(request, f"만료된 파싱 캐시 {deleted}개를 삭제했습니다.")
+    purge_expired.short_description = "만료된 캐시 전체 삭제 (선택과 무관)"
+
+
+@admin.register(EmbeddingCache)
+class EmbeddingCacheAdmin(admin.ModelAdmin):
+    list_display = ['cache_key_preview', 'model_name', 'dimension', 'hit_count', 'last_used_at', 'created_at']
+    list_filter = ['model_name', 'dimension']
+    readonly_fields = ['cache_key', 'model_name', 'dimension', 'hit_count', 'last_used_at', 'created_at']
+    exclude = ['vector']
+    actions = ['cull_cache']
+    
+    # 최적화
+    list_per_page = 50
+    show_full_result_count = False
+    
+    def cache_key_preview(self, obj):
+        return obj.cache_key[:16] + "..."
+    cache_key_preview.short_description = "캐시 키"
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('vector')
+    
+    def cull_cache(self, request, queryset):
+        from .embedding_cache import cull_embedding_cache
+        deleted = cull_embedding_cache()
+        self.message_user(request, f"오래 사용하지 않은 임베딩 캐시 {deleted}개를 삭제했습니다.")
+    cull_cache.short_description = "최대 개수 초과분 정리 (선택과 무관)"
+
+@admin.register(AnalysisJob)
+class AnalysisJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'food_text_preview', 'status', 'attempts', 'run_after', 'created_at', 'finished_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['user__username', 'food_text']
+    readonly_fields = ['user', 'food_text', 'language', 'attempts', 'result', 'error', 'started_at', 'finished_at', 'created_at', 'updated_at']
+    date_hierarchy = 'created_at'
+    actions = ['retry_jobs']
+    
+    # 최적화
+    list_per_page = 50
+    show_full_result_count = False
+    
+    def food_text_preview(self, obj):
+        if len(obj.food_text) > 40:
+            return obj.food_text[:40] + "..."
+        return obj.food_text
+    food_text_preview.short_description = "입력 텍스트"
+    
+    def retry_jobs(self, request, queryset):
+        from django.utils import timezone
+        updated = queryset.exclude(status=AnalysisJob.STATUS_RUNNING).update(
+            status=AnalysisJob.STATUS_PENDING,
+            attempts=0,
+            run_after=timezone.now(),
+            finished_at=None
+        )
+        self.message_user(request, f"{updated}개 작업을 다시 대기열에 넣었습니다.")
+    retry_jobs.short_description = "선택한 작업 다시 실행"
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
+
 @admin.register(CommunityPost)
 class CommunityPostAdmin(admin.ModelAdmin):
     list_display = ['title', 'user', 'category', 'views', 'like_count', 'comment_count', 'created_at']
@@ -1,7 +1,11 @@
 import google.generativeai as genai
 import json
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from django.conf import settings
+from django.db import models
 from typing import List, Dict, Any, Optional
 import re
 from difflib import SequenceMatcher
@@ -15,36 +19,9 @@ logger = logging.getLogger(__name__)
 class GeminiAIService:
     """Google Gemini API를 사용한 AI 서비스"""
     
-    def __init__(self, debug_timing: bool = False):
-        import time
-        self.debug_timing = debug_timing
-        
-        # API 키 설정
-        t1 = time.time()
-        api_key = settings.GEMINI_API_KEY
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY가 설정되지 않았습니다.")
-        
-        if debug_timing:
-            logger.info(f"[TIMING] API 키 로드: {time.time() - t1:.4f}초")
-        
-        t2 = time.time()
-        genai.configure(api_key=api_key)
-        if debug_timing:
-            logger.info(f"[TIMING] genai.configure: {time.time() - t2:.4f}초")
-        
-        t3 = time.time()
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
-        if debug_timing:
-            logger.info(f"[TIMING] GenerativeModel 생성: {time.time() - t3:.4f}초")
-        
-        # 임베딩 모델 초기화 (한국어 지원) - 지연 로딩
-        self.embedding_model = None
-        self._embedding_model_loaded = False
-        
-        # 음식 분석을 위한 프롬프트 (다국어 지원)
-        self.food_analysis_prompts = {
-            'ko': """
+    # 음식 분석을 위한 프롬프트 (다국어 지원)
+    food_analysis_prompts = {
+        'ko': """
 너는 한국 음식 영양 분석 AI야. 사용자가 입력한 자연어에서 음식명, 수량, 식사유형을 추출해서 JSON 형식으로 반환해줘.
 
 규칙:
@@ -62,7 +39,7 @@ class GeminiAIService:
 
 분석할 문장: "{user_input}"
 """,
-            'en': """
+        'en': """
 You are a Korean food nutrition analysis AI. Extract food names, quantities, and meal types from the user's natural language input and return them in JSON format.
 
 Rules:
@@ -80,20 +57,72 @@ Example output: [
 
 Analyze this sentence: "{user_input}"
 """
-        }
+    }
+
+    def __init__(self, debug_timing: bool = False):
+        import time
+        self.debug_timing = debug_timing
+        
+        # API 키 설정
+        t1 = time.time()
+        api_key = settings.GEMINI_API_KEY
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY가 설정되지 않았습니다.")
+        
+        if debug_timing:
+            logger.info(f"[TIMING] API 키 로드: {time.time() - t1:.4f}초")
+        
+        t2 = time.time()
+        genai.configure(api_key=api_key)
+        if debug_timing:
+            logger.info(f"[TIMING] genai.configure: {time.time() - t2:.4f}초")
+        
+        t3 = time.time()
+        self.model = genai.GenerativeModel('gemini-2.0-flash')
+        if debug_timing:
+            logger.info(f"[TIMING] GenerativeModel 생성: {time.time() - t3:.4f}초")
+        
+        # 임베딩 모델 초기화 (한국어 지원) - 지연 로딩
+        self.embedding_model = None
+        self._embedding_model_loaded = False
 
 
-    def analyze_food_text(self, user_input: str, language: str = 'ko') -> List[Dict[str, Any]]:
+    def analyze_food_text(self, user_input: str, language: str = 'ko', use_cache: bool = True,
+                          raise_errors: bool = False) -> List[Dict[str, Any]]:
         """
         사용자가 입력한 자연어에서 음식 정보를 추출
         
         Args:
             user_input: 사용자가 입력한 자연어 텍스트
             language: 언어 설정 ('ko' 또는 'en')
+            use_cache: 파싱 결과 캐시 사용 여부 (기본값: True)
+            raise_errors: True면 Gemini 호출/응답 파싱 오류를 빈 리스트 대신 예외로 전달
+                (백그라운드 작업이 429/5xx/시간 초과를 재시도할 수 있도록)
             
         Returns:
             List[Dict]: 추출된 음식 정보 리스트
         """
+        if use_cache:
+            from nutrients_codi.parse_cache import get_cached_food_analysis
+            try:
+                cached_foods = get_cached_food_analysis(user_input, language)
+                if cached_foods is not None:
+                    logger.info(f"AI 분석 캐시 적중: {user_input} (언어: {language})")
+                    return cached_foods
+            except Exception as e:
+                logger.warning(f"파싱 캐시 조회 실패: {e}")
+        
+        food_list = self._analyze_food_text_with_llm(user_input, language, raise_errors)
+        
+        if use_cache and isinstance(food_list, list) and food_list:
+            from nutrients_codi.parse_cache import store_food_analysis
+            store_food_analysis(user_input, language, food_list)
+        
+        return food_list
+    
+    def _analyze_food_text_with_llm(self, user_input: str, language: str,
+                                    raise_errors: bool = False) -> List[Dict[str, Any]]:
+        """Gemini를 호출하여 음식 정보 추출 (캐시 미사용)"""
         try:
             logger.info(f"AI 분석 시작: {user_input} (언어: {language})")
             
@@ -111,20 +140,7 @@ Analyze this sentence: "{user_input}"
             
             # JSON 파싱 시도
             try:
-                # 응답에서 JSON 부분만 추출 (```json ... ``` 형태일 수 있음)
-                if "```json" in response_text:
-                    start = response_text.find("```json") + 7
-                    end = response_text.find("```", start)
-                    json_text = response_text[start:end].strip()
-                elif "```" in response_text:
-                    start = response_text.find("```") + 3
-                    end = response_text.find("```", start)
-                    json_text = response_text[start:end].strip()
-                else:
-                    json_text = response_text
-                
-                # JSON 파싱
-                food_list = json.loads(json_text)
+                food_list = json.loads(self._extract_json_text(response_text))
                 
                 # AI가 분석한 식사 유형이 없는 경우 기본값 설정
                 if isinstance(food_list, list):
@@ -137,10 +153,14 @@ Analyze this sentence: "{user_input}"
             except json.JSONDecodeError as e:
                 logger.error(f"JSON 파싱 오류: {e}")
                 logger.error(f"응답 텍스트: {response_text}")
+                if raise_errors:
+                    raise
                 return []
                 
         except Exception as e:
             logger.error(f"음식 분석 중 오류 발생: {e}")
+            if raise_errors:
+                raise
             return []
     
 
@@ -166,76 +186,81 @@ Analyze this sentence: "{user_input}"
     
     def extract_keywords(self, food_name: str) -> List[str]:
         """
-        음식명에서 키워드를 추출합니다
+        음식명에서 키워드를 추출합니다 (조리법 / 재료 / 음식 유형)
         """
-        # 일반적인 음식 키워드들
-        keywords = []
-        food_name_lower = food_name.lower()
-        
-        # 조리법 키워드
-        cooking_methods = ['볶음', '튀김', '구이', '찜', '탕', '찌개', '국', '밥', '면', '죽', '샐러드', '샌드위치']
-        for method in cooking_methods:
-            if method in food_name_lower:
-                keywords.append(method)
-        
-        # 재료 키워드
-        ingredients = ['김치', '된장', '고추장', '닭', '돼지', '소고기', '생선', '새우', '게', '오징어', '두부', '콩', '쌀', '밀가루']
-        for ingredient in ingredients:
-            if ingredient in food_name_lower:
-                keywords.append(ingredient)
-        
-        # 음식 유형 키워드
-        food_types = ['밥', '면', '국', '찌개', '탕', '볶음', '튀김', '구이', '찜', '죽', '샐러드', '샌드위치', '피자', '햄버거']
-        for food_type in food_types:
-            if food_type in food_name_lower:
-                keywords.append(food_type)
-        
-        return keywords
+        from nutrients_codi.food_keywords import extract_food_keywords
+        return extract_food_keywords(food_name)
     
     def find_similar_food_by_string_matching(self, food_name: str, threshold: float = 0.6) -> Optional[Dict]:
         """
         문자열 유사도를 사용하여 유사한 음식을 찾습니다.
+
+        음식명 n-gram 역색인으로 후보를 고른 뒤 후보에 대해서만 유사도를 계산합니다.
+        """
+        return self.find_similar_foods_by_string_matching([food_name], threshold).get(food_name)
+    
+    def find_similar_foods_by_string_matching(self, food_names: List[str], threshold: float = 0.6) -> Dict[str, Dict]:
+        """
+        여러 음식명을 n-gram 역색인으로 검색합니다 (메모리 검색 + Food 조회 1회).
+
+        역색인으로 찾지 못한 이름은 키워드가 겹치는 음식(Food.keywords GIN 인덱스)을
+        DB에서 FOOD_NGRAM_SHORTLIST개만 가져와 같은 방식으로 점수를 계산합니다.
+
+        Returns:
+            Dict: {음식명: {'food', 'similarity', 'match_type'}} (매칭된 음식만 포함)
         """
         try:
             from nutrients_codi.models import Food
-            
-            # 모든 음식 가져오기
-            all_foods = Food.objects.all()
-            
-            best_match = None
-            best_similarity = 0
-            
-            # 입력 음식명의 키워드 추출
-            input_keywords = self.extract_keywords(food_name)
-            
-            for food in all_foods:
-                # 1. 전체 문자열 유사도 계산
-                similarity = self.calculate_similarity(food_name, food.name)
-                
-                # 2. 키워드 매칭 보너스
-                food_keywords = self.extract_keywords(food.name)
-                keyword_bonus = 0
-                if input_keywords and food_keywords:
-                    common_keywords = set(input_keywords) & set(food_keywords)
-                    if common_keywords:
-                        keyword_bonus = len(common_keywords) * 0.1
-                
-                # 3. 최종 유사도 계산
-                final_similarity = min(similarity + keyword_bonus, 1.0)
-                
-                if final_similarity > best_similarity and final_similarity >= threshold:
-                    best_similarity = final_similarity
-                    best_match = {
-                        'food': food,
-                        'similarity': final_similarity,
-                        'match_type': 'string_matching'
-                    }
-            
-            return best_match
+            from nutrients_codi.ngram_index import get_food_ngram_index
+
+            index = get_food_ngram_index()
+            hits = {name: index.search(name, threshold) for name in food_names}
+            for name in food_names:
+                if not hits[name]:
+                    hits[name] = self._find_food_by_keyword_overlap(name, threshold)
+            foods = Food.objects.defer('embedding').in_bulk([hit[0] for hit in hits.values() if hit])
+
+            matches = {}
+            for name, hit in hits.items():
+                if not hit or hit[0] not in foods:
+                    continue
+                matches[name] = {
+                    'food': foods[hit[0]],
+                    'similarity': hit[1],
+                    'match_type': 'string_matching'
+                }
+            return matches
             
         except Exception as e:
             logger.error(f"문자열 유사도 기반 음식 검색 중 오류 발생: {e}")
+            return {}
+    
+    def _find_food_by_keyword_overlap(self, food_name: str, threshold: float):
+        """키워드가 겹치는 음식 중 이름 길이가 비슷한 후보만 점수 계산 → (food_id, 유사도) 또는 None"""
+        from django.db.models import Func
+        from django.db.models.functions import Length
+        from nutrients_codi.food_keywords import extract_food_keywords, filter_foods_by_keywords
+        from nutrients_codi.models import Food
+        from nutrients_codi.ngram_index import string_similarity
+        from nutrients_codi.text_normalization import normalize_food_name
+
+        keywords = extract_food_keywords(food_name)
+        query_key = normalize_food_name(food_name)
+        if not keywords or not query_key:
             return None
+
+        candidates = (
+            filter_foods_by_keywords(Food.objects.all(), keywords)
+            .order_by(Func(Length('name') - len(food_name), function='ABS'), 'id')
+            .values_list('id', 'name', 'keywords')[:settings.FOOD_NGRAM_SHORTLIST]
+        )
+        best, best_score = None, None
+        for food_id, name, food_keywords in candidates:
+            # 임계값은 문자열 유사도만으로 비교, 공통 키워드 수는 동점 처리에만 사용
+            score = string_similarity(query_key, keywords, normalize_food_name(name), food_keywords or ())
+            if score[0] >= threshold and (best_score is None or score > best_score):
+                best, best_score = (food_id, score[0]), score
+        return best
     
     def _load_embedding_model(self):
         """Gemini Embedding API를 사용합니다."""
@@ -267,13 +292,20 @@ Analyze this sentence: "{user_input}"
             import time
             timings = {}
             
+            # 지연 로딩
+            t1 = time.time()
+            self._load_embedding_model()
+            timings['model_load'] = time.time() - t1
+            
+            if not self.embedding_model:
+                return None
+            
             # 캐싱 (API 호출 30초 → 0.001초!)
             if use_cache:
-                t1 = time.time()
-                from django.core.cache import cache
-                cache_key = f'embedding:{text[:100]}'  # 최대 100자까지만
-                cached_embedding = cache.get(cache_key)
-                timings['cache_check'] = time.time() - t1
+                t2 = time.time()
+                from nutrients_codi.embedding_cache import get_cached_embeddings
+                cached_embedding = get_cached_embeddings([text], self.embedding_model, self.embedding_dimension)[0]
+                timings['cache_check'] = time.time() - t2
                 
                 if cached_embedding:
                     if debug_timing:
@@ -281,14 +313,6 @@ Analyze this sentence: "{user_input}"
                     logger.debug(f"[CACHE HIT] 임베딩 캐시 사용: {text[:30]}...")
                     return cached_embedding
             
-            # 지연 로딩
-            t2 = time.time()
-            self._load_embedding_model()
-            timings['model_load'] = time.time() - t2
-            
-            if not self.embedding_model:
-                return None
-            
             # Gemini Embedding API 호출 (1536차원으로 생성)
             t3 = time.time()
             result = genai.embed_content(
@@ -303,12 +327,11 @@ Analyze this sentence: "{user_input}"
             embedding = result['embedding']
             timings['extract_embedding'] = time.time() - t4
             
-            # 캐시에 저장 (1시간)
+            # 임베딩 캐시에 저장
             if use_cache and embedding:
                 t5 = time.time()
-                from django.core.cache import cache
-                cache_key = f'embedding:{text[:100]}'
-                cache.set(cache_key, embedding, 3600)
+                from nutrients_codi.embedding_cache import store_embeddings
+                store_embeddings([text], [embedding], self.embedding_model, self.embedding_dimension)
                 timings['cache_save'] = time.time() - t5
                 logger.debug(f"[CACHE SET] 임베딩 캐시 저장: {text[:30]}...")
             
@@ -322,19 +345,80 @@ Analyze this sentence: "{user_input}"
         except Exception as e:
             logger.error(f"임베딩 생성 중 오류 발생: {e}")
             return None
-    
-    def get_embeddings_batch(self, texts: List[str]) -> List[Optional[List[float]]]:
+
+    def get_embeddings(self, texts: List[str], use_cache: bool = True,
+                       cached_only: bool = False) -> List[Optional[List[float]]]:
+        """
+        여러 텍스트의 임베딩을 캐시 조회 1회 + API 호출 1회로 생성합니다.
+
+        Args:
+            texts: 임베딩을 생성할 텍스트 리스트
+            use_cache: 캐시 사용 여부 (기본값: True)
+            cached_only: True면 API를 호출하지 않고 캐시에 있는 임베딩만 반환 (하이브리드 검색용)
+
+        Returns:
+            입력 순서대로 임베딩 벡터 리스트 (실패한 경우 None)
+        """
+        if not texts:
+            return []
+
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        try:
+            from nutrients_codi.embedding_cache import get_cached_embeddings, store_embeddings
+
+            self._load_embedding_model()
+            if not self.embedding_model:
+                return embeddings
+
+            if use_cache:
+                embeddings = get_cached_embeddings(texts, self.embedding_model, self.embedding_dimension)
+
+            missing = [idx for idx, emb in enumerate(embeddings) if emb is None]
+            if not missing:
+                logger.debug(f"[CACHE HIT] 임베딩 배치 전체 캐시 사용: {len(texts)}개")
+                return embeddings
+            if cached_only:
+                return embeddings
+
+            # 캐시에 없는 텍스트만 한 번의 배치 요청으로 생성
+            result = genai.embed_content(
+                model=self.embedding_model,
+                content=[texts[idx] for idx in missing],
+                task_type="retrieval_document",
+                output_dimensionality=self.embedding_dimension
+            )
+
+            for idx, embedding in zip(missing, result['embedding']):
+                embeddings[idx] = embedding
+
+            if use_cache:
+                store_embeddings(
+                    [texts[idx] for idx in missing],
+                    [embeddings[idx] for idx in missing],
+                    self.embedding_model,
+                    self.embedding_dimension
+                )
+
+            return embeddings
+
+        except Exception as e:
+            logger.error(f"배치 임베딩(캐시) 생성 중 오류 발생: {e}")
+            return embeddings
+
+    def get_embeddings_batch(self, texts: List[str], use_cache: bool = True) -> List[Optional[List[float]]]:
         """
         여러 텍스트의 임베딩을 배치로 생성합니다.
         
         Args:
             texts: 임베딩을 생성할 텍스트 리스트
+            use_cache: 임베딩 캐시 사용 여부 (조회/저장 모두 쿼리 1회)
             
         Returns:
             임베딩 벡터 리스트 (실패한 경우 None)
         """
         try:
             import time
+            from nutrients_codi.embedding_cache import get_cached_embeddings, store_embeddings
             
             # 지연 로딩
             self._load_embedding_model()
@@ -342,10 +426,15 @@ Analyze this sentence: "{user_input}"
             if not self.embedding_model:
                 return [None] * len(texts)
             
-            embeddings = []
-            
-            # 각 텍스트에 대해 임베딩 생성 (1536차원)
-            for idx, text in enumerate(texts):
+            if use_cache:
+                embeddings = get_cached_embeddings(texts, self.embedding_model, self.embedding_dimension)
+            else:
+                embeddings = [None] * len(texts)
+            missing = [idx for idx, emb in enumerate(embeddings) if emb is None]
+            
+            # 캐시에 없는 텍스트만 임베딩 생성 (1536차원)
+            for count, idx in enumerate(missing):
+                text = texts[idx]
                 try:
                     result = genai.embed_content(
                         model=self.embedding_model,
@@ -353,10 +442,10 @@ Analyze this sentence: "{user_input}"
                         task_type="retrieval_document",
                         output_dimensionality=self.embedding_dimension  # 1536차원!
                     )
-                    embeddings.append(result['embedding'])
+                    embeddings[idx] = result['embedding']
                     
                     # API rate limit 방지 - 10개마다 짧은 대기
-                    if (idx + 1) % 10 == 0:
+                    if (count + 1) % 10 == 0:
                         time.sleep(0.05)
                         
                 except Exception as e:
@@ -369,10 +458,17 @@ Analyze this sentence: "{user_input}"
                             task_type="retrieval_document",
                             output_dimensionality=self.embedding_dimension  # 1536차원!
                         )
-                        embeddings.append(result['embedding'])
+                        embeddings[idx] = result['embedding']
                     except Exception as retry_e:
                         logger.error(f"임베딩 생성 실패 (재시도 포함) - {text[:30]}...: {retry_e}")
-                        embeddings.append(None)
+            
+            if use_cache and missing:
+                store_embeddings(
+                    [texts[idx] for idx in missing],
+                    [embeddings[idx] for idx in missing],
+                    self.embedding_model,
+                    self.embedding_dimension
+                )
             
             return embeddings
             
@@ -380,104 +476,127 @@ Analyze this sentence: "{user_input}"
             logger.error(f"배치 임베딩 생성 중 오류 발생: {e}")
             return [None] * len(texts)
     
-    def find_similar_food_by_embedding(self, food_name: str, threshold: float = 0.9) -> Optional[Dict]:
+    def find_similar_food_by_embedding(self, food_name: str, threshold: float = 0.9,
+                                       ef_search: Optional[int] = None) -> Optional[Dict]:
+        """
+        임베딩을 사용하여 유사한 음식을 찾습니다. (pgvector 또는 ANN 인덱스, FOOD_SEARCH_BACKEND)
+
+        ef_search: pgvector HNSW 탐색 후보 수 (기본값: FOOD_HNSW_EF_SEARCH)
         """
-        임베딩을 사용하여 유사한 음식을 찾습니다. (pgvector로 100배 빠름!)
+        return self.find_similar_foods_by_embeddings(
+            [food_name], threshold=threshold, ef_search=ef_search
+        ).get(food_name)
+
+    def find_similar_foods(self, food_name: str, k: int = 5, threshold: float = 0.8,
+                           ef_search: Optional[int] = None) -> List[Dict]:
+        """
+        음식명과 비슷한 음식 후보 k개를 유사도 순으로 반환합니다. ("혹시 이 음식인가요?" 후보용)
+
+        임베딩은 캐시를 먼저 사용하고, 검색은 embedding 컬럼을 제외한 쿼리 1회로 끝납니다.
+
+        Returns:
+            List[Dict]: [{'food', 'similarity', 'match_type'}, ...] (유사도 내림차순, 없으면 빈 리스트)
         """
+        try:
+            from nutrients_codi.vector_search import similar_foods
+
+            embedding = self.get_embedding(food_name)
+            if not embedding:
+                return []
+
+            match_type = f'embedding_{settings.FOOD_SEARCH_BACKEND}'
+            return [
+                {'food': food, 'similarity': float(1 - distance), 'match_type': match_type}
+                for food, distance in similar_foods(embedding, k=k, max_distance=1 - threshold, ef_search=ef_search)
+            ]
+
+        except Exception as e:
+            logger.warning(f"유사 음식 후보 검색 중 오류 발생: {e}")
+            return []
+
+    def find_similar_foods_by_embeddings(self, food_names: List[str], threshold: float = 0.9,
+                                         ef_search: Optional[int] = None) -> Dict[str, Dict]:
+        """
+        여러 음식명을 임베딩 배치 생성 1회 + multi-probe 벡터 쿼리 1회로 검색합니다.
+
+        이전 검색 결과(매칭 실패 포함)는 resolution_cache에서 먼저 찾으므로
+        자주 나오는 음식은 캐시 조회 1회 + Food 조회 1회로 끝납니다.
+
+        Returns:
+            Dict: {음식명: {'food', 'similarity', 'match_type'}} (매칭된 음식만 포함)
+        """
+        if not food_names:
+            return {}
+
         try:
             from nutrients_codi.models import Food
-            from pgvector.django import CosineDistance
-            
-            # 지연 로딩
+            from nutrients_codi.resolution_cache import get_cached_resolutions, store_resolutions
+            from nutrients_codi.vector_search import nearest_foods
+
             self._load_embedding_model()
-            
             if not self.embedding_model:
                 logger.info("임베딩 모델이 없어 임베딩 검색을 건너뜁니다.")
-                return None
-            
-            # 입력 음식명의 임베딩 생성
-            input_embedding = self.get_embedding(food_name)
-            if not input_embedding:
-                return None
-            
-            # pgvector로 데이터베이스에서 직접 코사인 유사도 계산 (초고속!)
-            similar_foods = Food.objects.annotate(
-                distance=CosineDistance('embedding', input_embedding)
-            ).filter(
-                embedding__isnull=False,
-                distance__lt=(1 - threshold)  # cosine distance = 1 - cosine similarity
-            ).order_by('distance')[:1]
-            
-            if similar_foods.exists():
-                food = similar_foods[0]
-                similarity = 1 - food.distance
-                logger.info(f"[pgvector] 유사 음식 발견: {food.name} (유사도: {similarity:.3f})")
-                return {
-                    'food': food,
+                return {}
+
+            # 이전 검색 결과 (매칭 실패 포함, 캐시 조회 1회)
+            try:
+                version, resolved = get_cached_resolutions(food_names, threshold)
+            except Exception as e:
+                logger.warning(f"음식 검색 결과 캐시 조회 실패: {e}")
+                version, resolved = None, {}
+
+            pending = [name for name in food_names if name not in resolved]
+            if pending:
+                embeddings = self.get_embeddings(pending)
+                probes = [(name, emb) for name, emb in zip(pending, embeddings) if emb]
+                searched = {}
+                if probes:
+                    nearest = nearest_foods([emb for _, emb in probes], max_distance=1 - threshold, ef_search=ef_search)
+                    for (name, _), hit in zip(probes, nearest):
+                        searched[name] = (hit[0], float(1 - hit[1])) if hit else None
+
+                # 임베딩 생성에 실패한 이름은 일시적 오류일 수 있으므로 저장하지 않음
+                if searched and version is not None:
+                    try:
+                        store_resolutions(version, searched, threshold)
+                    except Exception as e:
+                        logger.warning(f"음식 검색 결과 캐시 저장 실패: {e}")
+                resolved = {**resolved, **searched}
+
+            backend = settings.FOOD_SEARCH_BACKEND
+            foods = Food.objects.defer('embedding').in_bulk([hit[0] for hit in resolved.values() if hit])
+
+            matches = {}
+            for name, hit in resolved.items():
+                if not hit or hit[0] not in foods:
+                    continue
+                food_id, similarity = hit
+                logger.info(f"[{backend}] 유사 음식 발견: {name} -> {foods[food_id].name} (유사도: {similarity:.3f})")
+                matches[name] = {
+                    'food': foods[food_id],
                     'similarity': float(similarity),
-                    'match_type': 'embedding_pgvector'
+                    'match_type': f'embedding_{backend}'
                 }
-            
-            return None
-            
-        except Exception as e:
-            logger.warning(f"pgvector 임베딩 검색 중 오류 발생: {e}")
-            return None
-    
-    def get_nutrition_from_llm(self, food_name: str) -> Optional[Dict]:
-        """
-        Gemini LLM을 사용하여 음식의 영양성분을 추출합니다.
-        """
-        try:
-            prompt = f"""
-당신은 영양 전문가입니다. 다음 음식의 영양성분을 JSON 형태로 제공해주세요.
 
-음식명: {food_name}
+            return matches
 
-다음 형식으로 응답해주세요:
-{{
-    "name": "{food_name}",
-    "calories": 100,
-    "protein": 10.0,
-    "carbs": 20.0,
-    "fat": 5.0,
-    "fiber": 2.0,
-    "sugar": 3.0,
-    "sodium": 500.0,
-    "potassium": 300.0,
-    "calcium": 50.0,
-    "iron": 2.0,
-    "magnesium": 25.0,
-    "phosphorus": 100.0,
-    "zinc": 1.0,
-    "copper": 0.1,
-    "manganese": 0.5,
-    "selenium": 10.0,
-    "vitamin_a": 50.0,
-    "vitamin_b1": 0.1,
-    "vitamin_b2": 0.1,
-    "vitamin_b3": 1.0,
-    "vitamin_b6": 0.2,
-    "vitamin_b12": 1.0,
-    "vitamin_c": 10.0,
-    "vitamin_d": 2.0,
-    "vitamin_e": 1.0,
-    "vitamin_k": 5.0,
-    "folate": 20.0,
-    "choline": 50.0,
-    "cholesterol": 0.0,
-    "saturated_fat": 1.0,
-    "monounsaturated_fat": 2.0,
-    "polyunsaturated_fat": 1.0,
-    "omega3": 0.1,
-    "omega6": 0.5,
-    "trans_fat": 0.0,
-    "caffeine": 0.0,
-    "alcohol": 0.0,
-    "water": 70.0,
-    "ash": 1.0
-}}
+        except Exception as e:
+            logger.warning(f"배치 임베딩 검색 중 오류 발생: {e}")
+            return {}
 
+    # LLM 영양성분 응답 형식 (단건/배치 프롬프트 공용, 100g 기준 예시 값)
+    NUTRITION_EXAMPLE = {
+        "calories": 100, "protein": 10.0, "carbs": 20.0, "fat": 5.0, "fiber": 2.0, "sugar": 3.0,
+        "sodium": 500.0, "potassium": 300.0, "calcium": 50.0, "iron": 2.0, "magnesium": 25.0,
+        "phosphorus": 100.0, "zinc": 1.0, "copper": 0.1, "manganese": 0.5, "selenium": 10.0,
+        "vitamin_a": 50.0, "vitamin_b1": 0.1, "vitamin_b2": 0.1, "vitamin_b3": 1.0, "vitamin_b6": 0.2,
+        "vitamin_b12": 1.0, "vitamin_c": 10.0, "vitamin_d": 2.0, "vitamin_e": 1.0, "vitamin_k": 5.0,
+        "folate": 20.0, "choline": 50.0, "cholesterol": 0.0, "saturated_fat": 1.0,
+        "monounsaturated_fat": 2.0, "polyunsaturated_fat": 1.0, "omega3": 0.1, "omega6": 0.5,
+        "trans_fat": 0.0, "caffeine": 0.0, "alcohol": 0.0, "water": 70.0, "ash": 1.0,
+    }
+    
+    NUTRITION_UNITS_PROMPT = """
 단위:
 - 칼로리: kcal
 - 단백질, 탄수화물, 지방, 섬유질, 당분: g
@@ -493,35 +612,89 @@ Analyze this sentence: "{user_input}"
 
 정확하지 않은 값은 0으로 설정해주세요. 100g 기준으로 계산해주세요.
 """
+    
+    @staticmethod
+    def _extract_json_text(response_text: str) -> str:
+        """LLM 응답에서 JSON 부분만 추출 (```json ... ``` 형태일 수 있음)"""
+        if "```json" in response_text:
+            start = response_text.find("```json") + 7
+            end = response_text.find("```", start)
+            return response_text[start:end].strip()
+        if "```" in response_text:
+            start = response_text.find("```") + 3
+            end = response_text.find("```", start)
+            return response_text[start:end].strip()
+        return response_text
+    
+    def _nutrition_schema(self, food_name: str) -> str:
+        """음식 하나에 대한 응답 JSON 예시"""
+        example = {"name": food_name, **self.NUTRITION_EXAMPLE}
+        return json.dumps(example, ensure_ascii=False, indent=4)
+    
+    def _validate_nutrition_data(self, nutrition_data: Any, food_name: str) -> Optional[Dict]:
+        """
+        LLM이 반환한 영양성분 항목을 검증하여 Food 생성용 dict로 정리합니다.
+        
+        - Food 모델에 없는 키는 버림 (Food.objects.create 오류 방지)
+        - 숫자가 아니거나 음수인 영양소 값은 0으로 설정
+        """
+        from nutrients_codi.models import Food
+        
+        if not isinstance(nutrition_data, dict):
+            return None
+        
+        float_fields = {
+            field.name for field in Food._meta.get_fields()
+            if isinstance(field, models.FloatField)
+        }
+        
+        cleaned = {}
+        for key, value in nutrition_data.items():
+            if key in float_fields:
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    value = 0.0
+                cleaned[key] = value if value >= 0 else 0.0
+        
+        # 필수 영양소가 모두 없으면 유효하지 않은 응답으로 간주
+        if not any(key in cleaned for key in ('calories', 'protein', 'carbs', 'fat')):
+            logger.warning(f"LLM 영양성분 응답에 필수 값 없음: {food_name}")
+            return None
+        
+        for key in ('calories', 'protein', 'carbs', 'fat'):
+            cleaned.setdefault(key, 0.0)
+        
+        # 기본값 설정
+        cleaned['name'] = food_name
+        cleaned['category'] = 'LLM 생성'
+        cleaned['subcategory'] = ''
+        cleaned['food_code'] = ''
+        cleaned['source'] = 'Gemini LLM'
+        
+        return cleaned
+    
+    def get_nutrition_from_llm(self, food_name: str) -> Optional[Dict]:
+        """
+        Gemini LLM을 사용하여 음식의 영양성분을 추출합니다.
+        """
+        try:
+            prompt = f"""
+당신은 영양 전문가입니다. 다음 음식의 영양성분을 JSON 형태로 제공해주세요.
+
+음식명: {food_name}
+
+다음 형식으로 응답해주세요:
+{self._nutrition_schema(food_name)}
+{self.NUTRITION_UNITS_PROMPT}"""
             
             response = self.model.generate_content(prompt)
             response_text = response.text.strip()
             
             # JSON 파싱 시도
             try:
-                # 응답에서 JSON 부분만 추출
-                if "```json" in response_text:
-                    start = response_text.find("```json") + 7
-                    end = response_text.find("```", start)
-                    json_text = response_text[start:end].strip()
-                elif "```" in response_text:
-                    start = response_text.find("```") + 3
-                    end = response_text.find("```", start)
-                    json_text = response_text[start:end].strip()
-                else:
-                    json_text = response_text
-                
-                # JSON 파싱
-                nutrition_data = json.loads(json_text)
-                
-                # 기본값 설정
-                nutrition_data.setdefault('name', food_name)
-                nutrition_data.setdefault('category', 'LLM 생성')
-                nutrition_data.setdefault('subcategory', '')
-                nutrition_data.setdefault('food_code', '')
-                nutrition_data.setdefault('source', 'Gemini LLM')
-                
-                return nutrition_data
+                nutrition_data = json.loads(self._extract_json_text(response_text))
+                return self._validate_nutrition_data(nutrition_data, food_name)
                 
             except json.JSONDecodeError as e:
                 logger.error(f"LLM 응답 JSON 파싱 오류: {e}")
@@ -532,20 +705,157 @@ Analyze this sentence: "{user_input}"
             logger.error(f"LLM 영양성분 추출 중 오류 발생: {e}")
             return None
     
-    def create_food_from_llm(self, food_name: str) -> Optional[Dict]:
+    # 단건 재시도를 마감 시간 직전까지 기다리지 않도록 남겨 두는 여유 (초)
+    LLM_RETRY_MARGIN = 0.5
+
+    def get_nutrition_batch_from_llm(self, food_names: List[str],
+                                     deadline: Optional[float] = None) -> Dict[str, Optional[Dict]]:
         """
-        LLM으로 영양성분을 추출하여 새로운 Food 객체를 생성합니다.
+        여러 음식의 영양성분을 한 번의 Gemini 호출로 추출합니다.
+        
+        응답 형식 설명은 한 번만 보내고, 결과 배열의 각 항목은 name으로 입력과 매칭합니다.
+        배치 응답은 받았지만 빠진 음식(이름이 어긋난 항목 포함)만 단건 호출로 동시에 한 번 더 시도하고,
+        배치 호출 자체가 실패하면 (예외 / JSON 파싱 실패) 재시도하지 않습니다.
+        
+        Args:
+            deadline: time.monotonic() 기준 마감 시각 - 단건 재시도는 그 전에 끝난 것만 사용
+        
+        Returns:
+            Dict: {음식명: 영양성분 dict 또는 None}
         """
+        if len(food_names) <= 1:
+            return {name: self.get_nutrition_from_llm(name) for name in food_names}
+        
+        results: Dict[str, Optional[Dict]] = {name: None for name in food_names}
+        batch_succeeded = False
         try:
-            from nutrients_codi.models import Food
+            names_text = "\n".join(f"- {name}" for name in food_names)
+            prompt = f"""
+당신은 영양 전문가입니다. 다음 음식들의 영양성분을 JSON 배열로 제공해주세요.
+
+음식명 목록:
+{names_text}
+
+배열의 각 항목은 아래 형식이며, "name"에는 위 목록의 음식명을 그대로 적어주세요.
+목록의 모든 음식을 포함해주세요:
+[
+{self._nutrition_schema(food_names[0])}
+]
+{self.NUTRITION_UNITS_PROMPT}"""
             
-            # LLM으로 영양성분 추출
-            nutrition_data = self.get_nutrition_from_llm(food_name)
-            if not nutrition_data:
-                return None
+            response = self.model.generate_content(prompt)
+            response_text = response.text.strip()
+            
+            try:
+                items = json.loads(self._extract_json_text(response_text))
+            except json.JSONDecodeError as e:
+                logger.error(f"LLM 배치 응답 JSON 파싱 오류: {e}")
+                logger.error(f"응답 텍스트: {response_text}")
+                return results
+            
+            if isinstance(items, dict):
+                items = [items]
+            if not isinstance(items, list):
+                logger.error(f"LLM 배치 응답 형식 오류: {type(items).__name__}")
+                return results
+            batch_succeeded = True
+            
+            # name으로 매칭 (공백/대소문자 차이 허용)
+            def _key(name):
+                return re.sub(r'\s+', '', str(name)).lower()
+            
+            # 이름이 어긋난 항목은 순서로 추측하지 않고 버림 (다른 음식의 영양성분으로 저장되지 않도록)
+            by_key = {_key(name): name for name in food_names}
+            for item in items:
+                name = by_key.get(_key(item.get('name', ''))) if isinstance(item, dict) else None
+                if name and results[name] is None:
+                    results[name] = self._validate_nutrition_data(item, name)
             
-            # Food 객체 생성
-            food = Food.objects.create(**nutrition_data)
+        except Exception as e:
+            logger.error(f"LLM 배치 영양성분 추출 중 오류 발생: {e}")
+        
+        missing = [name for name, data in results.items() if data is None]
+        if batch_succeeded and missing:
+            logger.warning(f"LLM 배치 응답 누락, 단건 재시도: {missing}")
+            results.update(self._retry_nutrition_from_llm(missing, deadline))
+        
+        return results
+    
+    def _retry_nutrition_from_llm(self, food_names: List[str],
+                                  deadline: Optional[float] = None) -> Dict[str, Optional[Dict]]:
+        """배치 응답에서 빠진 음식을 단건 호출로 동시에 재시도 (마감 시각까지 끝난 것만 반환)"""
+        timeout = None
+        if deadline is not None:
+            timeout = deadline - time.monotonic() - self.LLM_RETRY_MARGIN
+            if timeout <= 0:
+                logger.warning(f"⏱️ LLM 단건 재시도 생략 (마감 시간 부족): {food_names}")
+                return {}
+        
+        executor = ThreadPoolExecutor(max_workers=len(food_names), thread_name_prefix='food-llm-retry')
+        try:
+            futures = {executor.submit(self.get_nutrition_from_llm, name): name for name in food_names}
+            done, not_done = wait(futures, timeout=timeout)
+            if not_done:
+                logger.warning(f"⏱️ LLM 단건 재시도 마감 시간 초과: {[futures[future] for future in not_done]}")
+            
+            results = {}
+            for future in done:
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    logger.error(f"LLM 단건 재시도 실패 '{futures[future]}': {e}")
+            return results
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def create_food_from_nutrition(self, nutrition_data: Dict,
+                                   embedding: Optional[List[float]] = None) -> Optional[Dict]:
+        """
+        LLM이 생성한 영양성분 데이터로 Food 객체를 저장합니다.
+        
+        LLM 호출(느림)과 DB 저장을 분리하여, 호출은 여러 스레드에서 동시에 하고
+        저장은 요청 스레드에서 하도록 합니다.
+        
+        - 임베딩을 함께 저장해 다음 검색부터 벡터 검색으로 찾을 수 있게 합니다.
+        - 정규화된 이름의 FoodAlias(unique)를 같은 트랜잭션에서 만들어, 여러 워커가 같은 음식을
+          동시에 생성해도 Food는 하나만 남고 나머지는 먼저 만들어진 Food를 사용합니다.
+        
+        Args:
+            nutrition_data: _validate_nutrition_data 결과
+            embedding: 음식명 임베딩 (없으면 새로 생성, 임베딩 검색 단계에서 캐시된 값 사용)
+        """
+        from django.db import IntegrityError, transaction
+        from nutrients_codi.models import Food, FoodAlias
+        from nutrients_codi.text_normalization import normalize_food_name
+        
+        alias = normalize_food_name(nutrition_data.get('name', ''))
+        
+        try:
+            existing = self._find_food_by_alias(alias)
+            if existing:
+                logger.info(f"♻️ [LLM 생성] 이미 생성된 음식 사용: '{existing.name}'")
+                return {'food': existing, 'similarity': 1.0, 'match_type': 'alias'}
+            
+            if embedding is None:
+                embedding = self.get_embeddings([nutrition_data['name']])[0]
+            
+            try:
+                with transaction.atomic():
+                    food = Food.objects.create(**nutrition_data, embedding=embedding)
+                    if alias:
+                        FoodAlias.objects.create(
+                            alias=alias,
+                            food=food,
+                            match_type='llm_generated',
+                            similarity=1.0
+                        )
+            except IntegrityError:
+                # 다른 워커가 같은 음식을 먼저 생성함 - 방금 만든 Food는 롤백됨
+                existing = self._find_food_by_alias(alias)
+                if existing is None:
+                    raise
+                logger.info(f"♻️ [LLM 생성] 동시 생성 감지, 기존 음식 사용: '{existing.name}'")
+                return {'food': existing, 'similarity': 1.0, 'match_type': 'alias'}
             
             return {
                 'food': food,
@@ -554,5 +864,36 @@ Analyze this sentence: "{user_input}"
             }
             
         except Exception as e:
-            logger.error(f"LLM 기반 Food 생성 중 오류 발생: {e}")
+            logger.error(f"LLM 기반 Food 저장 중 오류 발생: {e}")
             return None
+    
+    def _find_food_by_alias(self, alias: str):
+        """정규화된 음식명으로 등록된 Food 조회 (없으면 None)"""
+        from nutrients_codi.models import FoodAlias
+        
+        if not alias:
+            return None
+        food_alias = FoodAlias.objects.select_related('food').defer('food__embedding').filter(alias=alias).first()
+        return food_alias.food if food_alias else None
+
+# 프로세스(gunicorn 워커) 단위로 공유하는 서비스 인스턴스
+_gemini_service: Optional[GeminiAIService] = None
+_gemini_service_lock = threading.Lock()
+
+
+def get_gemini_service() -> GeminiAIService:
+    """
+    워커 프로세스당 한 번만 생성되는 GeminiAIService를 반환합니다.
+
+    genai.configure와 GenerativeModel 생성은 최초 호출 시 한 번만 실행되고,
+    이후 요청은 같은 클라이언트(연결)를 재사용합니다. 여러 스레드에서 동시에 호출해도 안전합니다.
+
+    Raises:
+        ValueError: GEMINI_API_KEY가 설정되지 않은 경우
+    """
+    global _gemini_service
+    if _gemini_service is None:
+        with _gemini_service_lock:
+            if _gemini_service is None:
+                _gemini_service = GeminiAIService()
+    return _gemini_service
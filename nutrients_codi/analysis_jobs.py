@@ -0,0 +1,155 @@
+"""
+음식 분석 백그라운드 작업 큐
+- 별도 브로커 없이 DB 테이블(AnalysisJob) + SELECT ... FOR UPDATE SKIP LOCKED로 작업 분배
+- 요청은 작업만 등록하고 바로 반환, 실제 분석은 manage.py run_analysis_worker가 처리
+"""
+
+import logging
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .food_analysis import run_food_analysis, summarize_saved_food_logs
+from .models import AnalysisJob
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_analysis_job(user, food_text: str, language: str = 'ko') -> AnalysisJob:
+    """분석 작업 등록 (즉시 반환)"""
+    job = AnalysisJob.objects.create(
+        user=user,
+        food_text=food_text,
+        language=language,
+        max_attempts=settings.ANALYSIS_JOB_MAX_ATTEMPTS,
+        run_after=timezone.now(),
+    )
+    logger.info(f"📥 분석 작업 등록: #{job.id} ({user.username})")
+    return job
+
+
+def claim_analysis_job() -> Optional[AnalysisJob]:
+    """
+    처리할 작업 하나를 가져와 실행 중으로 표시합니다.
+
+    다른 워커가 잠근 행은 SKIP LOCKED로 건너뛰므로 여러 프로세스/스레드가
+    동시에 호출해도 같은 작업을 두 번 가져가지 않습니다.
+
+    Returns:
+        AnalysisJob 또는 None (대기 중인 작업 없음)
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        job = AnalysisJob.objects.select_for_update(skip_locked=True).filter(
+            status=AnalysisJob.STATUS_PENDING,
+            run_after__lte=now
+        ).order_by('run_after', 'id').first()
+
+        if job is None:
+            return None
+
+        job.status = AnalysisJob.STATUS_RUNNING
+        job.attempts += 1
+        job.started_at = now
+        job.save(update_fields=['status', 'attempts', 'started_at', 'updated_at'])
+    return job
+
+
+def process_analysis_job(job: AnalysisJob, ai_service, max_attempts: Optional[int] = None) -> AnalysisJob:
+    """
+    작업 실행 - 예외가 나면 지수 백오프로 재시도하고, 시도 횟수를 넘기면 실패 처리합니다.
+
+    Gemini 호출 오류(429/5xx/시간 초과)도 예외로 처리되어 재시도됩니다.
+    이전 시도에서 FoodLog 저장까지 끝난 뒤 실패했다면 다시 분석하지 않고
+    저장된 기록으로 결과만 만듭니다 (중복 저장 방지).
+
+    Args:
+        job: claim_analysis_job으로 가져온 작업
+        ai_service: GeminiAIService 인스턴스
+        max_attempts: 지정 시 작업에 저장된 최대 시도 횟수 대신 사용
+    """
+    try:
+        saved_logs = list(job.food_logs.select_related('food').order_by('id'))
+        if saved_logs:
+            logger.info(f"♻️ 분석 작업 #{job.id}: 이전 시도에서 저장된 기록 {len(saved_logs)}개 사용")
+            result = summarize_saved_food_logs(saved_logs, job.language)
+        else:
+            result = run_food_analysis(ai_service, job.user, job.food_text, job.language, analysis_job=job)
+    except Exception as e:
+        logger.error(f"❌ 분석 작업 #{job.id} 오류 ({job.attempts}회차): {e}", exc_info=True)
+        _retry_or_fail(job, e, max_attempts or job.max_attempts)
+        return job
+
+    job.status = AnalysisJob.STATUS_COMPLETED
+    job.result = result
+    job.error = ''
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'finished_at', 'updated_at'])
+    logger.info(f"✅ 분석 작업 #{job.id} 완료: {result.get('message', '')}")
+    return job
+
+
+def _retry_or_fail(job: AnalysisJob, error: Exception, max_attempts: int) -> None:
+    job.error = str(error)
+
+    if job.attempts < max_attempts:
+        delay = settings.ANALYSIS_JOB_RETRY_DELAY * (2 ** (job.attempts - 1))
+        job.status = AnalysisJob.STATUS_PENDING
+        job.run_after = timezone.now() + timedelta(seconds=delay)
+        job.save(update_fields=['status', 'error', 'run_after', 'updated_at'])
+        logger.info(f"🔁 분석 작업 #{job.id} {delay}초 후 재시도 ({job.attempts}/{max_attempts})")
+        return
+
+    job.status = AnalysisJob.STATUS_FAILED
+    job.finished_at = timezone.now()
+    job.result = {
+        'success': False,
+        'message': f'음식 분석 중 오류가 발생했습니다: {job.error}'
+    }
+    job.save(update_fields=['status', 'error', 'result', 'finished_at', 'updated_at'])
+
+
+def requeue_stale_jobs() -> int:
+    """
+    워커가 죽어 실행 중으로 남은 작업을 다시 대기 상태로 돌립니다.
+    (시도 횟수를 다 쓴 작업은 실패 처리)
+
+    Returns:
+        int: 다시 대기 상태가 된 작업 수
+    """
+    now = timezone.now()
+    stale = AnalysisJob.objects.filter(
+        status=AnalysisJob.STATUS_RUNNING,
+        started_at__lt=now - timedelta(seconds=settings.ANALYSIS_JOB_STALE_TIMEOUT)
+    )
+
+    failed = 0
+    for job in stale.filter(attempts__gte=F('max_attempts')):
+        job.status = AnalysisJob.STATUS_FAILED
+        job.error = job.error or '작업 처리 시간 초과'
+        job.finished_at = now
+        job.result = {'success': False, 'message': '음식 분석 시간이 초과되었습니다.'}
+        job.save(update_fields=['status', 'error', 'finished_at', 'result', 'updated_at'])
+        failed += 1
+
+    requeued = stale.update(status=AnalysisJob.STATUS_PENDING, run_after=now, updated_at=now)
+    if requeued or failed:
+        logger.warning(f"⏱️ 멈춘 분석 작업 정리: {requeued}개 재시도, {failed}개 실패 처리")
+    return requeued
+
+
+def serialize_analysis_job(job: AnalysisJob) -> Dict[str, Any]:
+    """상태 조회 응답"""
+    return {
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'attempts': job.attempts,
+        'result': job.result,
+        'created_at': job.created_at.isoformat(),
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
@@ -0,0 +1,419 @@
+"""
+음식 임베딩 근사 최근접 이웃(ANN) 인덱스
+- Food.embedding 전체를 float16 행렬 + IVF(역색인 클러스터)로 디스크에 저장
+- np.load(mmap_mode='r')로 읽으므로 모든 gunicorn 워커가 같은 페이지 캐시를 공유
+- Postgres(pgvector) 없이도 임베딩 검색 가능 (FOOD_SEARCH_BACKEND='ann')
+
+디렉터리 구조:
+    manifest.json          현재 사용 중인 인덱스 정보 (원자적으로 교체)
+    base-<버전>/           전체 빌드 결과
+        vectors.npy        (N, D) float16, 정규화된 벡터 (클러스터 순서로 정렬)
+        ids.npy            (N,) int64, vectors 각 행의 Food id
+        centroids.npy      (C, D) float32, 정규화된 클러스터 중심
+        offsets.npy        (C + 1,) int64, 클러스터 c의 행 범위 = offsets[c]:offsets[c + 1]
+    delta-<버전>/          증분 빌드 결과 (base 이후 추가된 음식, 전수 비교)
+        vectors.npy, ids.npy
+
+인덱스 파일 이후 추가된 음식(LLM 생성 등)은 워커가 FOOD_ANN_REFRESH_SECONDS마다 DB에서 id 기준으로
+읽어 메모리에 붙이고 delta와 함께 전수 비교하므로, build_food_ann_index 없이도 바로 검색됩니다.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .models import Food
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+INDEX_FORMAT_VERSION = 1
+
+# 메모리에 붙인 새 음식이 이보다 많으면 증분/전체 빌드를 권장하는 경고
+RECENT_WARNING_SIZE = 5000
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """코사인 유사도 = 내적이 되도록 행 단위 L2 정규화"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class FoodAnnIndex:
+    """memory-mapped IVF 인덱스 (읽기 전용, 스레드 안전)"""
+
+    def __init__(self, index_dir: Path, manifest: Dict):
+        self.index_dir = Path(index_dir)
+        self.manifest = manifest
+        self.nprobe = settings.FOOD_ANN_NPROBE
+
+        base_dir = self.index_dir / manifest['base']
+        self.vectors = np.load(base_dir / 'vectors.npy', mmap_mode='r')
+        self.ids = np.load(base_dir / 'ids.npy', mmap_mode='r')
+        self.centroids = np.load(base_dir / 'centroids.npy')
+        self.offsets = np.load(base_dir / 'offsets.npy')
+
+        if manifest.get('delta'):
+            delta_dir = self.index_dir / manifest['delta']
+            self.delta_vectors = np.load(delta_dir / 'vectors.npy').astype(np.float32)
+            self.delta_ids = np.load(delta_dir / 'ids.npy')
+        else:
+            self.delta_vectors = np.zeros((0, self.vectors.shape[1]), dtype=np.float32)
+            self.delta_ids = np.zeros(0, dtype=np.int64)
+
+        # 인덱스 파일 이후 추가된 음식 (refresh_recent로 갱신, 튜플째 교체하므로 검색은 잠금 없이 읽음)
+        self.max_food_id = max(int(manifest.get('max_food_id', 0)), int(self.delta_ids.max()) if len(self.delta_ids) else 0)
+        self.recent = (np.zeros(0, dtype=np.int64), np.zeros((0, self.vectors.shape[1]), dtype=np.float32))
+        self.recent_checked_at = 0.0
+        self._recent_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids) + len(self.delta_ids) + len(self.recent[0])
+
+    def refresh_recent(self) -> None:
+        """
+        인덱스에 없는 새 음식(id 기준)을 DB에서 읽어 메모리에 추가 (쿼리 1회)
+
+        이미 다른 스레드가 갱신 중이면 기다리지 않고 이전 목록으로 검색합니다.
+        """
+        if not self._recent_lock.acquire(blocking=False):
+            return
+        try:
+            self.recent_checked_at = time.monotonic()
+            recent_ids, recent_vectors = self.recent
+            last_id = max(self.max_food_id, int(recent_ids.max()) if len(recent_ids) else 0)
+            ids, matrix = load_food_embeddings(min_id=last_id)
+            if not len(ids):
+                return
+
+            self.recent = (
+                np.concatenate([recent_ids, ids]),
+                np.concatenate([recent_vectors, matrix.astype(np.float32)]),
+            )
+            logger.info(f"[ANN] 새 음식 {len(ids)}개 반영 (메모리 {len(self.recent[0])}개)")
+            if len(self.recent[0]) > RECENT_WARNING_SIZE:
+                logger.warning("[ANN] 인덱스 이후 추가된 음식이 많습니다. manage.py build_food_ann_index로 다시 빌드하세요.")
+        except Exception as e:
+            logger.warning(f"[ANN] 새 음식 반영 실패: {e}")
+        finally:
+            self._recent_lock.release()
+
+    def search(self, vectors: Sequence[Sequence[float]], k: int = 1,
+               nprobe: Optional[int] = None) -> List[List[Tuple[int, float]]]:
+        """
+        여러 쿼리 벡터의 최근접 음식 검색
+
+        Args:
+            vectors: 쿼리 임베딩 벡터 리스트
+            k: 쿼리당 반환할 후보 수
+            nprobe: 탐색할 클러스터 수 (기본값: FOOD_ANN_NPROBE)
+
+        Returns:
+            입력 순서대로 [(food_id, 코사인 유사도), ...] (유사도 내림차순)
+        """
+        if not len(vectors):
+            return []
+
+        queries = _normalize_rows(np.asarray(vectors, dtype=np.float32))
+        nprobe = max(1, min(nprobe or self.nprobe, len(self.centroids)))
+
+        # 쿼리별로 가까운 클러스터 nprobe개 선택
+        centroid_scores = queries @ self.centroids.T
+        probes = np.argpartition(-centroid_scores, nprobe - 1, axis=1)[:, :nprobe]
+        # delta + 메모리에 붙인 새 음식은 전수 비교
+        recent_ids, recent_vectors = self.recent
+        extra_ids = np.concatenate([self.delta_ids, recent_ids])
+        extra_vectors = np.concatenate([self.delta_vectors, recent_vectors]) if len(recent_ids) else self.delta_vectors
+        extra_scores = queries @ extra_vectors.T if len(extra_ids) else None
+
+        results = []
+        for i, query in enumerate(queries):
+            candidate_ids = []
+            candidate_scores = []
+            for cluster in probes[i]:
+                start, end = self.offsets[cluster], self.offsets[cluster + 1]
+                if start == end:
+                    continue
+                candidate_scores.append(self.vectors[start:end] @ query)
+                candidate_ids.append(self.ids[start:end])
+            if extra_scores is not None:
+                candidate_scores.append(extra_scores[i])
+                candidate_ids.append(extra_ids)
+
+            if not candidate_ids:
+                results.append([])
+                continue
+
+            scores = np.concatenate(candidate_scores)
+            ids = np.concatenate(candidate_ids)
+            top = min(k, len(scores))
+            best = np.argpartition(-scores, top - 1)[:top]
+            best = best[np.argsort(-scores[best])]
+            results.append([(int(ids[j]), float(scores[j])) for j in best])
+
+        return results
+
+
+# 프로세스 단위 인덱스 캐시 (manifest.json이 바뀌면 다시 로드)
+_index_lock = threading.Lock()
+_loaded_index: Optional[FoodAnnIndex] = None
+_loaded_mtime: Optional[float] = None
+
+
+def get_food_ann_index() -> Optional[FoodAnnIndex]:
+    """
+    현재 인덱스 반환 (없으면 None)
+
+    manifest.json의 수정 시간을 확인해 build_food_ann_index로 새로 빌드/증분 갱신된
+    인덱스를 자동으로 다시 읽고, FOOD_ANN_REFRESH_SECONDS마다 인덱스 이후 추가된 음식을 반영합니다.
+    """
+    global _loaded_index, _loaded_mtime
+
+    index_dir = Path(settings.FOOD_ANN_INDEX_DIR)
+    manifest_path = index_dir / MANIFEST_NAME
+    try:
+        mtime = manifest_path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+    if _loaded_index is not None and mtime == _loaded_mtime:
+        return _loaded_index
+
+    with _index_lock:
+        if _loaded_index is None or mtime != _loaded_mtime:
+            try:
+                manifest = json.loads(manifest_path.read_text())
+                _loaded_index = FoodAnnIndex(index_dir, manifest)
+                _loaded_mtime = mtime
+                logger.info(f"[ANN] 인덱스 로드: {len(_loaded_index)}개 음식 ({manifest['base']}, delta={manifest.get('delta')})")
+            except Exception as e:
+                logger.warning(f"[ANN] 인덱스 로드 실패: {e}")
+
+    index = _loaded_index
+    if index is not None and time.monotonic() - index.recent_checked_at >= settings.FOOD_ANN_REFRESH_SECONDS:
+        index.refresh_recent()
+    return index
+
+
+def nearest_foods_for_vectors_ann(
+    vectors: Sequence[Sequence[float]],
+    max_distance: float,
+) -> List[Optional[Tuple[int, float]]]:
+    """
+    vector_search.nearest_foods_for_vectors와 같은 형태로 ANN 인덱스를 검색합니다.
+
+    Raises:
+        RuntimeError: 인덱스가 아직 빌드되지 않은 경우
+    """
+    index = get_food_ann_index()
+    if index is None:
+        raise RuntimeError('ANN 인덱스가 없습니다. manage.py build_food_ann_index를 먼저 실행하세요.')
+
+    results: List[Optional[Tuple[int, float]]] = []
+    for hits in index.search(vectors, k=1):
+        if hits and 1 - hits[0][1] < max_distance:
+            results.append((hits[0][0], 1 - hits[0][1]))
+        else:
+            results.append(None)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# 빌드
+# ---------------------------------------------------------------------------
+
+def _embedding_queryset(min_id: int = 0):
+    return Food.objects.filter(embedding__isnull=False, id__gt=min_id).order_by('id')
+
+
+def load_food_embeddings(min_id: int = 0, chunk_size: int = 2000) -> Tuple[np.ndarray, np.ndarray]:
+    """id > min_id인 음식 임베딩을 (ids, 정규화된 float16 행렬)로 읽기"""
+    queryset = _embedding_queryset(min_id)
+    count = queryset.count()
+    if count == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.float16)
+
+    ids = np.zeros(count, dtype=np.int64)
+    matrix = None
+    row = 0
+    for food_id, embedding in queryset.values_list('id', 'embedding').iterator(chunk_size=chunk_size):
+        if row >= count:
+            break
+        vector = np.asarray(embedding, dtype=np.float32)
+        if matrix is None:
+            matrix = np.zeros((count, len(vector)), dtype=np.float16)
+        norm = np.linalg.norm(vector)
+        matrix[row] = vector / norm if norm else vector
+        ids[row] = food_id
+        row += 1
+
+    return ids[:row], matrix[:row]
+
+
+def _assign_clusters(matrix: np.ndarray, centroids: np.ndarray, chunk_size: int = 4096) -> np.ndarray:
+    assignments = np.empty(len(matrix), dtype=np.int64)
+    for start in range(0, len(matrix), chunk_size):
+        chunk = matrix[start:start + chunk_size].astype(np.float32)
+        assignments[start:start + chunk_size] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignments
+
+
+def _train_centroids(matrix: np.ndarray, nlist: int, iterations: int = 10,
+                     sample_size: int = 20000, seed: int = 0) -> np.ndarray:
+    """구면 k-means로 클러스터 중심 학습 (표본 최대 sample_size개)"""
+    rng = np.random.default_rng(seed)
+    if len(matrix) > sample_size:
+        sample = matrix[np.sort(rng.choice(len(matrix), sample_size, replace=False))]
+    else:
+        sample = matrix
+    sample = sample.astype(np.float32)
+
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = _assign_clusters(sample, centroids)
+        membership = np.zeros((len(sample), nlist), dtype=np.float32)
+        membership[np.arange(len(sample)), assignments] = 1.0
+        sums = membership.T @ sample
+        counts = np.bincount(assignments, minlength=nlist)
+
+        # 비어 있는 클러스터는 임의의 표본으로 다시 시작
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+        centroids = _normalize_rows(sums)
+    return centroids.astype(np.float32)
+
+
+def _save_array(directory: Path, name: str, array: np.ndarray) -> None:
+    np.save(directory / name, np.ascontiguousarray(array))
+
+
+def _write_manifest(index_dir: Path, manifest: Dict) -> None:
+    """manifest.json 원자적 교체 후 사용하지 않는 이전 버전 정리"""
+    previous = read_manifest(index_dir) or {}
+
+    tmp_path = index_dir / f'{MANIFEST_NAME}.tmp'
+    tmp_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2))
+    os.replace(tmp_path, index_dir / MANIFEST_NAME)
+
+    # 직전 버전은 아직 로드 중인 워커가 있을 수 있으므로 남겨 둠
+    keep = {manifest.get('base'), manifest.get('delta'), previous.get('base'), previous.get('delta')}
+    for path in index_dir.iterdir():
+        if path.is_dir() and path.name.startswith(('base-', 'delta-')) and path.name not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def read_manifest(index_dir=None) -> Optional[Dict]:
+    manifest_path = Path(index_dir or settings.FOOD_ANN_INDEX_DIR) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return None
+    return json.loads(manifest_path.read_text())
+
+
+def build_food_ann_index(index_dir=None, nlist: Optional[int] = None, iterations: int = 10) -> Dict:
+    """
+    전체 빌드
+
+    Args:
+        index_dir: 저장 위치 (기본값: FOOD_ANN_INDEX_DIR)
+        nlist: 클러스터 수 (기본값: sqrt(N))
+        iterations: k-means 반복 횟수
+
+    Returns:
+        dict: 새 manifest
+    """
+    started = time.time()
+    ids, matrix = load_food_embeddings()
+    if len(ids) == 0:
+        raise RuntimeError('임베딩이 있는 음식이 없습니다. generate_embeddings를 먼저 실행하세요.')
+
+    return build_ann_index_from_arrays(
+        Path(index_dir or settings.FOOD_ANN_INDEX_DIR), ids, matrix,
+        nlist=nlist, iterations=iterations, started=started
+    )
+
+
+def build_ann_index_from_arrays(index_dir: Path, ids: np.ndarray, matrix: np.ndarray,
+                                nlist: Optional[int] = None, iterations: int = 10,
+                                started: Optional[float] = None) -> Dict:
+    """
+    (ids, 정규화된 행렬)로 base 인덱스를 만들고 manifest 교체 (DB 없이 사용 가능, bench_food_search --synthetic)
+
+    Returns:
+        dict: 새 manifest
+    """
+    started = started or time.time()
+    index_dir = Path(index_dir)
+    index_dir.mkdir(parents=True, exist_ok=True)
+
+    nlist = max(1, min(nlist or int(np.sqrt(len(ids))), len(ids)))
+    centroids = _train_centroids(matrix, nlist, iterations=iterations)
+    assignments = _assign_clusters(matrix, centroids)
+
+    # 클러스터 순서로 정렬해 각 클러스터를 연속된 행 범위로 저장
+    order = np.argsort(assignments, kind='stable')
+    offsets = np.zeros(nlist + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(assignments, minlength=nlist))
+
+    version = f'base-{int(time.time() * 1000)}'
+    base_dir = index_dir / version
+    base_dir.mkdir()
+    _save_array(base_dir, 'vectors.npy', matrix[order])
+    _save_array(base_dir, 'ids.npy', ids[order])
+    _save_array(base_dir, 'centroids.npy', centroids)
+    _save_array(base_dir, 'offsets.npy', offsets)
+
+    manifest = {
+        'format': INDEX_FORMAT_VERSION,
+        'base': version,
+        'delta': None,
+        'count': int(len(ids)),
+        'delta_count': 0,
+        'dim': int(matrix.shape[1]),
+        'nlist': int(nlist),
+        'max_food_id': int(ids.max()),
+        'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'build_seconds': round(time.time() - started, 2),
+    }
+    _write_manifest(index_dir, manifest)
+    return manifest
+
+
+def update_food_ann_index(index_dir=None) -> Dict:
+    """
+    증분 갱신 - 마지막 전체 빌드 이후 추가된 음식(id 기준)을 delta로 저장
+
+    delta는 검색 시 전수 비교하므로 커지면 전체 빌드(build_food_ann_index)를 다시 하는 것이 좋습니다.
+    이미 인덱스에 있는 음식의 임베딩 변경은 전체 빌드에서만 반영됩니다.
+
+    Returns:
+        dict: 새 manifest
+    """
+    index_dir = Path(index_dir or settings.FOOD_ANN_INDEX_DIR)
+    manifest = read_manifest(index_dir)
+    if manifest is None:
+        return build_food_ann_index(index_dir)
+
+    ids, matrix = load_food_embeddings(min_id=manifest['max_food_id'])
+    if len(ids) == manifest.get('delta_count', 0):
+        return manifest
+
+    version = f'delta-{int(time.time() * 1000)}'
+    delta_dir = index_dir / version
+    delta_dir.mkdir()
+    _save_array(delta_dir, 'vectors.npy', matrix)
+    _save_array(delta_dir, 'ids.npy', ids)
+
+    manifest = dict(manifest, delta=version, delta_count=int(len(ids)),
+                    updated_at=time.strftime('%Y-%m-%dT%H:%M:%S'))
+    _write_manifest(index_dir, manifest)
+    return manifest
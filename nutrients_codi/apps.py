@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class NutrientsCodiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'nutrients_codi'
+
+    def ready(self):
+        from . import signals  # noqa: F401
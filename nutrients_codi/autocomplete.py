@@ -0,0 +1,276 @@
+"""
+음식명 자동완성 (프로세스 메모리 인덱스)
+- 정규화된 음식명(소문자, 공백 제거)과 단어 시작 위치부터의 이름을 정렬 리스트에 저장해 bisect로 접두어 검색
+- 초성 검색: "ㄱㅊㅉㄱ" → 김치찌개 (초성 키 정렬 리스트)
+- 최근 FoodLog 기록 횟수로 인기순 정렬
+- 새 Food는 FOOD_AUTOCOMPLETE_REFRESH_SECONDS마다 id 기준으로 증분 반영 (새 키만 정렬해 기존 목록과 병합),
+  전체 재구성은 FOOD_AUTOCOMPLETE_REBUILD_SECONDS마다
+- 구성/갱신은 백그라운드 스레드에서 하고 (gunicorn post_worker_init에서는 미리 구성),
+  새 스냅샷을 만든 뒤 참조만 교체하므로 검색 요청은 기다리거나 잠금을 잡지 않음
+"""
+
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Food, FoodLog
+from .text_normalization import normalize_food_name, normalize_food_text
+
+logger = logging.getLogger(__name__)
+
+CHOSUNG = [
+    'ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ',
+    'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ',
+]
+HANGUL_FIRST, HANGUL_LAST = 0xAC00, 0xD7A3
+SYLLABLES_PER_CHOSUNG = 21 * 28  # 중성 21개 x 종성 28개
+
+# 접두어에 걸리는 음식이 이보다 많으면 (예: "김") 인기 음식 목록에서 먼저 찾음
+SCAN_LIMIT = 3000
+POPULAR_SIZE = 5000
+
+
+def to_chosung(text: str) -> str:
+    """한글 음절을 초성으로 변환 (다른 문자는 그대로): "김치찌개" → "ㄱㅊㅉㄱ" """
+    return ''.join(
+        CHOSUNG[(ord(char) - HANGUL_FIRST) // SYLLABLES_PER_CHOSUNG]
+        if HANGUL_FIRST <= ord(char) <= HANGUL_LAST else char
+        for char in text
+    )
+
+
+def is_chosung_query(text: str) -> bool:
+    """한글 자음(호환 자모 ㄱ-ㅎ)으로만 이루어진 입력인지"""
+    return bool(text) and all(0x3131 <= ord(char) <= 0x314E for char in text)
+
+
+def name_keys(name: str) -> List[str]:
+    """
+    음식명 검색 키: 전체 이름 + 두 번째 단어부터 시작하는 이름
+
+    "돼지고기 김치찌개" → ["돼지고기김치찌개", "김치찌개"]
+    """
+    words = normalize_food_text(name).split(' ')
+    keys = [normalize_food_name(name)]
+    for i in range(1, len(words)):
+        key = ''.join(words[i:])
+        if key and key not in keys:
+            keys.append(key)
+    return [key for key in keys if key]
+
+
+def _search_keys(foods: Dict[int, Tuple[str, str, float]]):
+    """음식들의 (검색 키, 초성 키, 정렬된 (키, id) 목록, 정렬된 (초성 키, id) 목록)"""
+    keys = {food_id: name_keys(name) for food_id, (name, _, _) in foods.items()}
+    chosung_keys = {food_id: [to_chosung(key) for key in food_keys] for food_id, food_keys in keys.items()}
+    name_items = sorted((key, food_id) for food_id, food_keys in keys.items() for key in food_keys)
+    chosung_items = sorted((key, food_id) for food_id, food_keys in chosung_keys.items() for key in food_keys)
+    return keys, chosung_keys, name_items, chosung_items
+
+
+class _Snapshot:
+    """한 시점의 인덱스 (검색 키는 만든 뒤 바꾸지 않고, 인기 횟수만 record_use로 증가)"""
+
+    def __init__(self, foods: Dict[int, Tuple[str, str, float]], popularity: Dict[int, int], built_at: float,
+                 search_keys=None, popular=None):
+        self.foods = foods  # id → (이름, 분류, 칼로리)
+        self.popularity = popularity
+        self.built_at = built_at
+        self.max_food_id = max(foods, default=0)
+
+        self.keys, self.chosung_keys, self.name_items, self.chosung_items = search_keys or _search_keys(foods)
+
+        # 짧은 접두어용 인기 음식 (id, 검색 키, 초성 키), 인기순
+        if popular is None:
+            popular = [
+                (food_id, self.keys[food_id], self.chosung_keys[food_id])
+                for food_id, _ in heapq.nlargest(POPULAR_SIZE, popularity.items(), key=lambda item: item[1])
+                if food_id in foods
+            ]
+        self.popular = popular
+
+    def with_new_foods(self, new_foods: Dict[int, Tuple[str, str, float]]) -> '_Snapshot':
+        """
+        새 음식을 더한 스냅샷 (새 음식의 키만 만들고 정렬한 뒤 기존 정렬 목록과 병합 - 전체 재정렬 없음)
+
+        인기 횟수와 인기 음식 목록은 그대로 이어받습니다 (새 음식은 record_use로 추가됨).
+        """
+        keys, chosung_keys, name_items, chosung_items = _search_keys(new_foods)
+        search_keys = (
+            {**self.keys, **keys},
+            {**self.chosung_keys, **chosung_keys},
+            list(heapq.merge(self.name_items, name_items)),
+            list(heapq.merge(self.chosung_items, chosung_items)),
+        )
+        return _Snapshot({**self.foods, **new_foods}, self.popularity, self.built_at,
+                         search_keys=search_keys, popular=self.popular)
+
+
+class FoodAutocompleteIndex:
+    """음식명 자동완성 인덱스 (스레드 안전, 프로세스당 하나)"""
+
+    def __init__(self):
+        self._snapshot: Optional[_Snapshot] = None
+        self._refresh_lock = threading.Lock()
+        self._checked_at = 0.0
+
+    def build(self) -> None:
+        """Food / FoodLog에서 전체 재구성 (쿼리 2회)"""
+        started = time.monotonic()
+        foods = {
+            food_id: (name, category, calories)
+            for food_id, name, category, calories in
+            Food.objects.order_by().values_list('id', 'name', 'category', 'calories').iterator(chunk_size=5000)
+        }
+        self._snapshot = _Snapshot(foods, self._load_popularity(), time.monotonic())
+        self._checked_at = time.monotonic()
+        logger.info(f"🔤 자동완성 인덱스 구성: 음식 {len(foods):,}개 ({(time.monotonic() - started) * 1000:.0f}ms)")
+
+    def _load_popularity(self) -> Dict[int, int]:
+        since = timezone.localdate() - timedelta(days=settings.FOOD_AUTOCOMPLETE_POPULARITY_DAYS)
+        return dict(
+            FoodLog.objects.filter(consumed_date__gte=since).order_by()
+            .values('food_id').annotate(count=Count('id')).values_list('food_id', 'count')
+        )
+
+    def _add_new_foods(self) -> None:
+        """마지막 구성 이후 추가된 Food(id 기준)만 반영"""
+        snapshot = self._snapshot
+        new_foods = {
+            food_id: (name, category, calories)
+            for food_id, name, category, calories in
+            Food.objects.filter(id__gt=snapshot.max_food_id).order_by()
+            .values_list('id', 'name', 'category', 'calories')
+        }
+        if not new_foods:
+            return
+
+        self._snapshot = snapshot.with_new_foods(new_foods)
+        logger.info(f"🔤 자동완성 인덱스 증분 반영: {len(new_foods)}개")
+
+    def refresh_if_stale(self) -> None:
+        """
+        주기적으로 새 음식 반영 / 전체 재구성 (백그라운드 스레드에서 실행)
+
+        검색 요청은 갱신을 기다리지 않고 이전 스냅샷으로 검색하며,
+        이미 갱신 중이면 새 스레드를 만들지 않습니다.
+        """
+        now = time.monotonic()
+        if now - self._checked_at < settings.FOOD_AUTOCOMPLETE_REFRESH_SECONDS:
+            return
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        self._checked_at = now
+        try:
+            threading.Thread(target=self._refresh, name='food-autocomplete-refresh', daemon=True).start()
+        except Exception as e:
+            self._refresh_lock.release()
+            logger.warning(f"자동완성 인덱스 갱신 스레드 시작 실패: {e}")
+
+    def _refresh(self) -> None:
+        from django.db import connection
+
+        try:
+            snapshot = self._snapshot
+            if snapshot is None or time.monotonic() - snapshot.built_at >= settings.FOOD_AUTOCOMPLETE_REBUILD_SECONDS:
+                self.build()
+            else:
+                self._add_new_foods()
+        except Exception as e:
+            logger.warning(f"자동완성 인덱스 갱신 실패: {e}")
+        finally:
+            # 백그라운드 스레드의 DB 연결은 요청 처리 주기로 정리되지 않으므로 직접 닫음
+            connection.close()
+            self._refresh_lock.release()
+
+    def record_use(self, food_id: int) -> None:
+        """음식을 기록하면 다음 재구성 전까지도 인기순에 바로 반영"""
+        snapshot = self._snapshot
+        if snapshot is None or food_id not in snapshot.foods:
+            return
+        if food_id not in snapshot.popularity:
+            snapshot.popular.append((food_id, snapshot.keys[food_id], snapshot.chosung_keys[food_id]))
+        snapshot.popularity[food_id] = snapshot.popularity.get(food_id, 0) + 1
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        접두어 / 초성 검색 (정확히 같은 이름 → 인기순 → 짧은 이름순)
+
+        아직 인덱스를 구성 중이면 (워커 시작 직후) 빈 결과를 반환합니다.
+
+        Returns:
+            List[Dict]: [{'id', 'name', 'category', 'calories', 'count'}, ...]
+        """
+        self.refresh_if_stale()
+        snapshot = self._snapshot
+        prefix = normalize_food_name(query)
+        if snapshot is None or not prefix:
+            return []
+
+        chosung = is_chosung_query(prefix)
+        items = snapshot.chosung_items if chosung else snapshot.name_items
+        lo = bisect_left(items, (prefix,))
+        hi = bisect_left(items, (prefix + '\uffff',))
+        if lo == hi:
+            return []
+
+        def rank(food_id):
+            exact = snapshot.keys[food_id][0] == prefix
+            return (exact, snapshot.popularity.get(food_id, 0), -len(snapshot.foods[food_id][0]))
+
+        if hi - lo <= SCAN_LIMIT:
+            food_ids = heapq.nlargest(limit, {items[i][1] for i in range(lo, hi)}, key=rank)
+        else:
+            # 짧은 접두어: 인기 음식 중 일치하는 것 먼저, 부족하면 가나다순으로 채움
+            food_ids = []
+            for food_id, food_keys, chosung_keys in snapshot.popular:
+                if any(key.startswith(prefix) for key in (chosung_keys if chosung else food_keys)):
+                    food_ids.append(food_id)
+                    if len(food_ids) >= limit:
+                        break
+            food_ids.sort(key=rank, reverse=True)
+            for i in range(lo, hi):
+                if len(food_ids) >= limit:
+                    break
+                if items[i][1] not in food_ids:
+                    food_ids.append(items[i][1])
+
+        return [
+            {
+                'id': food_id,
+                'name': snapshot.foods[food_id][0],
+                'category': snapshot.foods[food_id][1],
+                'calories': snapshot.foods[food_id][2],
+                'count': snapshot.popularity.get(food_id, 0),
+            }
+            for food_id in food_ids
+        ]
+
+
+_index_lock = threading.Lock()
+_index: Optional[FoodAutocompleteIndex] = None
+
+
+def get_food_autocomplete_index(warm: bool = False) -> FoodAutocompleteIndex:
+    """
+    프로세스 공용 자동완성 인덱스
+
+    요청 경로에서는 구성을 기다리지 않고 첫 검색 때 백그라운드에서 구성하며,
+    warm=True(gunicorn post_worker_init)면 현재 스레드에서 바로 구성합니다.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = FoodAutocompleteIndex()
+    if warm and _index._snapshot is None:
+        _index.build()
+    return _index
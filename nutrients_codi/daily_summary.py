@@ -0,0 +1,145 @@
+"""
+일별 영양소 합계 테이블 (DailyNutritionSummary) 유지
+- FoodLog 생성/수정/삭제 시 (사용자, 날짜)별 변화량만 더하고 빼서 반영 (시그널 / bulk_create 경로에서 호출)
+  · 늘어나는 날짜: INSERT ... ON CONFLICT DO UPDATE 1회 (없는 행은 새로 생성)
+  · 줄어드는 날짜: UPDATE만 하고, 기록이 0개가 된 행은 삭제
+- 호출하는 쪽의 transaction.atomic 안에서 실행해야 FoodLog와 합계가 함께 커밋/롤백됨
+- rebuild_daily_summaries: FoodLog에서 INSERT ... SELECT로 다시 계산 (백필 / 복구용)
+"""
+
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import DailyNutritionSummary, FoodLog
+from .nutrients import TOTAL_FIELD_NAMES
+
+logger = logging.getLogger(__name__)
+
+
+def _collect_deltas(added: Iterable, removed: Iterable) -> Dict[Tuple[int, object], List[float]]:
+    """(user_id, 날짜) → [기록 수 변화, total_* 변화...] (변화가 없는 날짜는 제외)"""
+    deltas = defaultdict(lambda: [0] + [0.0] * len(TOTAL_FIELD_NAMES))
+    for sign, food_logs in ((1, added), (-1, removed)):
+        for food_log in food_logs:
+            delta = deltas[(food_log.user_id, food_log.consumed_date)]
+            delta[0] += sign
+            for i, name in enumerate(TOTAL_FIELD_NAMES, start=1):
+                delta[i] += sign * (getattr(food_log, name) or 0.0)
+    return {key: delta for key, delta in deltas.items() if any(delta)}
+
+
+def apply_food_log_deltas(added: Iterable = (), removed: Iterable = ()) -> None:
+    """
+    FoodLog 변화량을 일별 합계에 반영
+
+    Args:
+        added: 새로 저장된 (또는 수정 후) FoodLog
+        removed: 삭제된 (또는 수정 전) FoodLog - user_id, consumed_date, total_*만 있으면 됨
+    """
+    deltas = _collect_deltas(added, removed)
+    if not deltas:
+        return
+
+    quote = connection.ops.quote_name
+    table = quote(DailyNutritionSummary._meta.db_table)
+    columns = [quote(name) for name in TOTAL_FIELD_NAMES]
+    now = timezone.now()
+
+    upserts = [(key, delta) for key, delta in deltas.items() if delta[0] > 0]
+    updates = [(key, delta) for key, delta in deltas.items() if delta[0] <= 0]
+
+    with connection.cursor() as cursor:
+        if upserts:
+            placeholders = ', '.join(['(' + ', '.join(['%s'] * (len(columns) + 4)) + ')'] * len(upserts))
+            assignments = ', '.join(
+                f'{column} = {table}.{column} + EXCLUDED.{column}'
+                for column in [quote('food_count'), *columns]
+            )
+            params = []
+            for (user_id, consumed_date), delta in upserts:
+                params.extend([user_id, consumed_date, now, *delta])
+            cursor.execute(
+                f'INSERT INTO {table} ({quote("user_id")}, {quote("date")}, {quote("updated_at")}, '
+                f'{quote("food_count")}, {", ".join(columns)}) VALUES {placeholders} '
+                f'ON CONFLICT ({quote("user_id")}, {quote("date")}) DO UPDATE SET '
+                f'{assignments}, {quote("updated_at")} = EXCLUDED.{quote("updated_at")}',
+                params
+            )
+
+        if updates:
+            # 기록이 줄어드는 날짜는 행이 없으면 만들지 않음 (어긋난 합계는 rebuild로 복구)
+            food_count = quote('food_count')
+            assignments = ', '.join(f'{column} = {column} + %s' for column in columns)
+            cursor.executemany(
+                f'UPDATE {table} SET {food_count} = CASE WHEN {food_count} + %s > 0 '
+                f'THEN {food_count} + %s ELSE 0 END, {assignments}, {quote("updated_at")} = %s '
+                f'WHERE {quote("user_id")} = %s AND {quote("date")} = %s',
+                [
+                    [delta[0], delta[0], *delta[1:], now, user_id, consumed_date]
+                    for (user_id, consumed_date), delta in updates
+                ]
+            )
+            emptied = [key for key, delta in updates if delta[0] < 0]
+            if emptied:
+                cursor.executemany(
+                    f'DELETE FROM {table} WHERE {quote("user_id")} = %s AND {quote("date")} = %s '
+                    f'AND {food_count} <= 0',
+                    emptied
+                )
+
+
+def rebuild_daily_summaries(user_ids=None, start_date=None, end_date=None) -> int:
+    """
+    FoodLog에서 일별 합계를 다시 계산 (범위 안의 행을 지우고 INSERT ... SELECT 1회)
+
+    Args:
+        user_ids: 이 사용자들만 (None이면 전체)
+        start_date, end_date: 날짜 범위 (포함)
+
+    Returns:
+        int: 만들어진 일별 합계 행 수
+    """
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return 0
+
+    summaries = DailyNutritionSummary.objects.all()
+    conditions, params = [], []
+    if user_ids is not None:
+        summaries = summaries.filter(user_id__in=user_ids)
+        conditions.append(f'user_id IN ({", ".join(["%s"] * len(user_ids))})')
+        params.extend(user_ids)
+    if start_date:
+        summaries = summaries.filter(date__gte=start_date)
+        conditions.append('consumed_date >= %s')
+        params.append(start_date)
+    if end_date:
+        summaries = summaries.filter(date__lte=end_date)
+        conditions.append('consumed_date <= %s')
+        params.append(end_date)
+
+    quote = connection.ops.quote_name
+    columns = [quote(name) for name in TOTAL_FIELD_NAMES]
+    where = f'WHERE {" AND ".join(conditions)} ' if conditions else ''
+    sql = (
+        f'INSERT INTO {quote(DailyNutritionSummary._meta.db_table)} '
+        f'({quote("user_id")}, {quote("date")}, {quote("updated_at")}, {quote("food_count")}, {", ".join(columns)}) '
+        f'SELECT user_id, consumed_date, %s, COUNT(*), '
+        f'{", ".join(f"COALESCE(SUM({column}), 0)" for column in columns)} '
+        f'FROM {quote(FoodLog._meta.db_table)} {where}'
+        f'GROUP BY user_id, consumed_date'
+    )
+
+    with transaction.atomic():
+        summaries.delete()
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [timezone.now(), *params])
+            created = cursor.rowcount
+
+    logger.info(f"📊 일별 영양소 합계 재계산: {created}개")
+    return created
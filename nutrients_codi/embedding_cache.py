@@ -0,0 +1,162 @@
+"""
+임베딩 캐시
+- 키: 모델명 + 차원 + 정규화된 텍스트의 SHA-256 (긴 입력도 충돌 없음)
+- 값: float16 바이너리 (1536차원 기준 약 3KB, 파이썬 리스트 pickle 대비 1/4 이하)
+- 프로세스 내 LRU → EmbeddingCache 테이블 순으로 조회, 여러 키를 쿼리 1회로 읽고 씀
+- 공용 DatabaseCache(api_cache_table)와 분리되어 YouTube/영양소 캐시를 밀어내지 않음
+"""
+
+import hashlib
+import logging
+import random
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import EmbeddingCache
+from .text_normalization import normalize_food_text
+
+logger = logging.getLogger(__name__)
+
+VECTOR_DTYPE = np.float16
+
+# 저장할 때 이 확률로 오래된 항목 정리 (DatabaseCache의 cull과 같은 방식)
+CULL_PROBABILITY = 0.01
+
+
+def make_embedding_cache_key(text: str, model_name: str, dimension: int) -> str:
+    raw = f'{model_name}:{dimension}:{normalize_food_text(text)}'
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def pack_vector(vector: Sequence[float]) -> bytes:
+    return np.asarray(vector, dtype=VECTOR_DTYPE).tobytes()
+
+
+def unpack_vector(data: bytes) -> List[float]:
+    return np.frombuffer(bytes(data), dtype=VECTOR_DTYPE).astype(np.float32).tolist()
+
+
+class _LRUCache:
+    """압축된 벡터(bytes)를 보관하는 스레드 안전 LRU"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, bytes]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._data:
+                    self._data.move_to_end(key)
+                    found[key] = self._data[key]
+        return found
+
+    def set_many(self, items: Dict[str, bytes]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            for key, value in items.items():
+                self._data[key] = value
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_local_cache = _LRUCache(settings.EMBEDDING_CACHE_LRU_SIZE)
+
+
+def get_cached_embeddings(texts: Sequence[str], model_name: str, dimension: int) -> List[Optional[List[float]]]:
+    """
+    여러 텍스트의 캐시된 임베딩 조회 (LRU 확인 후 DB 쿼리 1회)
+
+    Returns:
+        입력 순서대로 임베딩 벡터 또는 None (캐시 미스)
+    """
+    keys = [make_embedding_cache_key(text, model_name, dimension) for text in texts]
+    found = _local_cache.get_many(keys)
+
+    missing = list({key for key in keys if key not in found})
+    if missing:
+        rows = dict(
+            EmbeddingCache.objects.filter(cache_key__in=missing).values_list('cache_key', 'vector')
+        )
+        if rows:
+            rows = {key: bytes(value) for key, value in rows.items()}
+            _local_cache.set_many(rows)
+            found.update(rows)
+            EmbeddingCache.objects.filter(cache_key__in=list(rows)).update(
+                hit_count=F('hit_count') + 1,
+                last_used_at=timezone.now()
+            )
+
+    expected_size = dimension * np.dtype(VECTOR_DTYPE).itemsize
+    results: List[Optional[List[float]]] = []
+    for key in keys:
+        data = found.get(key)
+        results.append(unpack_vector(data) if data and len(data) == expected_size else None)
+
+    hits = sum(1 for result in results if result is not None)
+    if hits:
+        logger.debug(f"[CACHE HIT] 임베딩 캐시 사용: {hits}/{len(texts)}개")
+    return results
+
+
+def store_embeddings(texts: Sequence[str], vectors: Sequence[Optional[Sequence[float]]],
+                     model_name: str, dimension: int) -> None:
+    """여러 임베딩을 bulk_create 1회로 저장 (이미 있는 키는 무시)"""
+    items = {}
+    for text, vector in zip(texts, vectors):
+        if vector:
+            items[make_embedding_cache_key(text, model_name, dimension)] = pack_vector(vector)
+    if not items:
+        return
+
+    _local_cache.set_many(items)
+    try:
+        EmbeddingCache.objects.bulk_create(
+            [
+                EmbeddingCache(cache_key=key, model_name=model_name, dimension=dimension, vector=data)
+                for key, data in items.items()
+            ],
+            ignore_conflicts=True
+        )
+        if random.random() < CULL_PROBABILITY:
+            cull_embedding_cache()
+    except Exception as e:
+        logger.warning(f"임베딩 캐시 저장 실패: {e}")
+
+
+def cull_embedding_cache(max_entries: Optional[int] = None) -> int:
+    """
+    가장 오래 사용되지 않은 항목부터 삭제해 max_entries개 이하로 유지
+
+    Returns:
+        int: 삭제된 항목 수
+    """
+    max_entries = settings.EMBEDDING_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+    cutoff = list(
+        EmbeddingCache.objects.order_by('-last_used_at').values_list('last_used_at', flat=True)[max_entries:max_entries + 1]
+    )
+    if not cutoff:
+        return 0
+
+    deleted, _ = EmbeddingCache.objects.filter(last_used_at__lte=cutoff[0]).delete()
+    logger.info(f"🧹 임베딩 캐시 정리: {deleted}개 삭제")
+    return deleted
+
+
+def clear_local_embedding_cache() -> None:
+    """프로세스 내 LRU 비우기"""
+    _local_cache.clear()
@@ -0,0 +1,225 @@
+"""
+임베딩 대량 생성(generate_embeddings) 파이프라인 도구
+- 토큰 버킷 속도 제한 (429 응답 시 자동으로 속도를 낮추고 성공하면 천천히 회복)
+- 배치(최대 100개) 임베딩 요청 + 지수 백오프 재시도
+- 마지막으로 연속 처리된 id 체크포인트 (중단 후 이어서 실행)
+  + 재시도 후에도 실패한 id 구간 기록 (--resume 시 먼저 다시 시도)
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+logger = logging.getLogger(__name__)
+
+# embed_content(batchEmbedContents) 요청 1회당 최대 텍스트 수
+MAX_EMBED_BATCH_SIZE = 100
+
+
+class TokenBucket:
+    """
+    스레드 안전 토큰 버킷
+
+    rate(초당 요청 수)만큼 토큰이 채워지고 acquire()는 토큰이 생길 때까지 기다립니다.
+    slow_down()은 속도를 절반으로 낮추고, speed_up()은 설정된 최대 속도까지 조금씩 회복합니다.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, min_rate: float = 0.1):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def slow_down(self) -> None:
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0
+        logger.warning(f"⏬ 임베딩 요청 속도 감소: 초당 {self.rate:.2f}회")
+
+    def speed_up(self, step: float = 0.05) -> None:
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill()
+                self.rate = min(self.max_rate, self.rate * (1 + step))
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """429 / 할당량 초과 오류 여부"""
+    if isinstance(error, (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)):
+        return True
+    message = str(error).lower()
+    return '429' in message or 'quota' in message or 'rate limit' in message
+
+
+def embed_texts_with_backoff(
+    texts: List[str],
+    model: str,
+    dimensions: int,
+    limiter: TokenBucket,
+    max_retries: int = 5,
+    base_delay: float = 1.0,
+) -> List[List[float]]:
+    """
+    텍스트 묶음(최대 100개)을 embed_content 요청 1회로 임베딩
+
+    429는 속도를 낮추고 지수 백오프(+지터)로 재시도, 다른 오류는 최대 2회까지 재시도합니다.
+
+    Raises:
+        Exception: 재시도 후에도 실패한 경우 마지막 오류
+    """
+    attempt = 0
+    while True:
+        limiter.acquire()
+        try:
+            result = genai.embed_content(
+                model=model,
+                content=texts,
+                task_type="retrieval_document",
+                output_dimensionality=dimensions
+            )
+            limiter.speed_up()
+            return result['embedding']
+        except Exception as e:
+            rate_limited = is_rate_limit_error(e)
+            if rate_limited:
+                limiter.slow_down()
+
+            retries = max_retries if rate_limited else min(2, max_retries)
+            if attempt >= retries:
+                raise
+
+            delay = base_delay * (2 ** attempt) * (1 + random.random() * 0.5)
+            logger.warning(f"임베딩 요청 실패 ({attempt + 1}/{retries}), {delay:.1f}초 후 재시도: {e}")
+            time.sleep(delay)
+            attempt += 1
+
+
+class EmbeddingCheckpoint:
+    """
+    처리 진행 상황 파일
+
+    배치는 완료 순서가 뒤섞일 수 있으므로, 앞선 배치가 모두 끝난 구간까지만
+    last_id를 올립니다. 중단 후에는 last_id 다음부터 다시 처리하면 됩니다.
+
+    실패한 음식은 last_id를 넘어가더라도 failed_ranges([첫 id, 마지막 id] 목록)에 남기므로
+    --resume 시 그 구간을 먼저 다시 처리합니다.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.last_id = 0
+        self.success = 0
+        self.errors = 0
+        self.failed_ranges: List[List[int]] = []
+        self._pending: Dict[int, Optional[int]] = {}  # 배치 순번 → 완료 시 마지막 id (진행 중이면 None)
+        self._next_seq = 0
+        self._done_seq = 0
+
+    def load(self) -> 'EmbeddingCheckpoint':
+        if self.path.exists():
+            data = json.loads(self.path.read_text())
+            self.last_id = data.get('last_id', 0)
+            self.success = data.get('success', 0)
+            self.errors = data.get('errors', 0)
+            self.failed_ranges = data.get('failed_ranges', [])
+        return self
+
+    def start_batch(self) -> int:
+        """배치 등록 (id 오름차순으로 호출), 배치 순번 반환"""
+        seq = self._next_seq
+        self._pending[seq] = None
+        self._next_seq += 1
+        return seq
+
+    def finish_batch(self, seq: int, last_id: int, success: int, errors: int,
+                     row_ids: Sequence[int] = (), failed_ids: Sequence[int] = ()) -> None:
+        """
+        배치 완료 - 앞선 배치가 모두 끝났으면 last_id를 올리고 파일에 저장
+
+        Args:
+            row_ids: 배치의 음식 id (id 순서), failed_ids: 그중 실패한 id - 실패 구간으로 기록
+        """
+        self._pending[seq] = last_id
+        self.success += success
+        self.errors += errors
+        recorded = self._record_failures(row_ids, failed_ids)
+
+        advanced = False
+        while self._done_seq in self._pending and self._pending[self._done_seq] is not None:
+            self.last_id = self._pending.pop(self._done_seq)
+            self._done_seq += 1
+            advanced = True
+
+        if advanced or recorded:
+            self.save()
+
+    def finish_retry(self, success: int, row_ids: Sequence[int] = (), failed_ids: Sequence[int] = ()) -> None:
+        """실패 구간 재시도 완료 - 성공한 만큼 실패 수를 줄이고, 다시 실패한 id는 구간으로 남김"""
+        self.success += success
+        self.errors = max(0, self.errors - success)
+        self._record_failures(row_ids, failed_ids)
+        self.save()
+
+    def take_failed_ranges(self) -> List[List[int]]:
+        """재시도할 실패 구간 (목록은 비워지고, 다시 실패하면 finish_retry가 새로 기록)"""
+        ranges, self.failed_ranges = self.failed_ranges, []
+        return ranges
+
+    def _record_failures(self, row_ids: Sequence[int], failed_ids: Sequence[int]) -> bool:
+        """배치 안에서 연속으로 실패한 id를 [첫 id, 마지막 id] 구간으로 기록"""
+        failed = set(failed_ids)
+        if not failed:
+            return False
+        current = None
+        for food_id in row_ids:
+            if food_id in failed:
+                if current is None:
+                    current = [food_id, food_id]
+                    self.failed_ranges.append(current)
+                else:
+                    current[1] = food_id
+            else:
+                current = None
+        return True
+
+    def save(self) -> None:
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        tmp_path.write_text(json.dumps({
+            'last_id': self.last_id,
+            'success': self.success,
+            'errors': self.errors,
+            'failed_ranges': self.failed_ranges,
+            'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }))
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        if self.path.exists():
+            self.path.unlink()
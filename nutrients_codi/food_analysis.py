@@ -0,0 +1,528 @@
+"""
+음식 분석 파이프라인
+- AI 파싱 결과를 Food로 일괄 매칭 (정확한 이름 → 별칭 → 트라이그램/벡터 하이브리드 → 임베딩 → LLM 생성)
+- FoodLog 일괄 저장 및 캐시 무효화
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Any, Dict, Iterator, List, Tuple
+
+from django.conf import settings
+from django.db import transaction
+
+from .daily_summary import apply_food_log_deltas
+from .models import Food, FoodAlias, FoodLog
+from .nutrients import compute_food_log_totals
+from .text_normalization import normalize_food_name
+from .utils import get_language_messages
+from .utils_optimized import invalidate_nutrition_cache
+
+logger = logging.getLogger(__name__)
+
+VALID_MEAL_TYPES = ['breakfast', 'lunch', 'dinner', 'snack']
+
+# 한 번에 기록할 수 있는 최대 섭취량 (g)
+MAX_FOOD_LOG_QUANTITY = 5000
+
+
+def meal_type_for_time(moment) -> str:
+    """식사 유형을 지정하지 않았을 때 시각으로 추정 (자동완성 바로 기록용)"""
+    if 5 <= moment.hour < 11:
+        return 'breakfast'
+    if 11 <= moment.hour < 16:
+        return 'lunch'
+    if 16 <= moment.hour < 22:
+        return 'dinner'
+    return 'snack'
+
+
+def normalize_ai_results(ai_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    AI 분석 결과를 음식명/수량/식사유형이 정리된 항목 리스트로 변환
+
+    Args:
+        ai_results: analyze_food_text 결과
+
+    Returns:
+        List[Dict]: {'food_name', 'quantity', 'meal_type', 'result'} 리스트
+    """
+    entries = []
+    for result in ai_results:
+        if not isinstance(result, dict):
+            continue
+
+        meal_type = result.get('meal_type', 'lunch')
+        if meal_type not in VALID_MEAL_TYPES:
+            logger.warning(f"유효하지 않은 meal_type: '{meal_type}', 'lunch'로 변경")
+            meal_type = 'lunch'
+
+        entries.append({
+            'food_name': result.get('food_name', ''),
+            'quantity': result.get('quantity', 100),  # 기본값 100g
+            'meal_type': meal_type,
+            'result': result,
+        })
+    return entries
+
+
+class FoodResolver:
+    """
+    여러 음식명을 단계별로 한꺼번에 Food에 매칭합니다.
+
+    각 단계는 남은 음식명 전체를 한 번에 처리하므로 음식 수와 관계없이
+    정확한 이름 조회 1회, 하이브리드 쿼리 1회, 임베딩 배치 1회, 벡터 쿼리 1회,
+    n-gram 역색인 검색(메모리)으로 끝납니다.
+    """
+
+    def __init__(self, ai_service, similarity_threshold: float = 0.95):
+        self.ai_service = ai_service
+        self.similarity_threshold = similarity_threshold
+
+    def resolve(self, food_names: List[str]) -> Dict[str, Dict]:
+        """
+        Returns:
+            Dict: {음식명: {'food', 'similarity', 'match_type'}} (매칭된 음식만 포함)
+        """
+        matches: Dict[str, Dict] = {}
+        for stage_matches in self.iter_resolve(food_names):
+            matches.update(stage_matches)
+        return matches
+
+    def iter_resolve(self, food_names: List[str]) -> Iterator[Dict[str, Dict]]:
+        """
+        단계별로 새로 매칭된 음식을 바로 내보냅니다 (스트리밍 응답용).
+
+        LLM 단계는 묶음 하나가 끝날 때마다 내보내므로, 앞 단계에서 찾은 음식은
+        느린 LLM 호출을 기다리지 않고 먼저 처리할 수 있습니다.
+
+        Yields:
+            Dict: {음식명: {'food', 'similarity', 'match_type'}} (비어 있지 않은 묶음만)
+        """
+        pending = list(dict.fromkeys(name for name in food_names if name))
+
+        stages = (
+            lambda names: [self.match_exact(names)],
+            lambda names: [self.match_alias(names)],
+            lambda names: [self.match_hybrid(names)],
+            lambda names: [self.match_embedding(names)],
+            lambda names: [self.match_string(names)],
+            self.iter_match_llm,
+        )
+        for stage in stages:
+            if not pending:
+                break
+            for stage_matches in stage(pending):
+                stage_matches = {name: match for name, match in stage_matches.items() if name in pending}
+                if not stage_matches:
+                    continue
+                self.remember_aliases(stage_matches)
+                pending = [name for name in pending if name not in stage_matches]
+                yield stage_matches
+
+        for name in pending:
+            logger.warning(f"❌ 모든 검색 방법 실패: '{name}'")
+
+    def match_exact(self, food_names: List[str]) -> Dict[str, Dict]:
+        """1. 정확한 이름 매칭 (name IN (...) 쿼리 1회)"""
+        matches = {}
+        foods = Food.objects.defer('embedding').filter(name__in=food_names).order_by('id')
+        for food in foods:
+            if food.name not in matches:
+                matches[food.name] = {
+                    'food': food,
+                    'similarity': 1.0,
+                    'match_type': 'exact',
+                }
+        logger.info(f"✅ [정확한 이름 매칭] {len(matches)}/{len(food_names)}개 성공")
+        return matches
+
+    def match_alias(self, food_names: List[str]) -> Dict[str, Dict]:
+        """2. 별칭 매칭 (정규화된 음식명 IN (...) 쿼리 1회)"""
+        names_by_alias = {}
+        for name in food_names:
+            names_by_alias.setdefault(normalize_food_name(name), []).append(name)
+
+        matches = {}
+        aliases = FoodAlias.objects.select_related('food').defer('food__embedding').filter(
+            alias__in=list(names_by_alias)
+        )
+        for alias in aliases:
+            for name in names_by_alias.get(alias.alias, []):
+                matches[name] = {
+                    'food': alias.food,
+                    'similarity': alias.similarity,
+                    'match_type': 'alias',
+                }
+        logger.info(f"✅ [별칭 매칭] {len(matches)}/{len(food_names)}개 성공")
+        return matches
+
+    def remember_aliases(self, matches: Dict[str, Dict]) -> None:
+        """
+        임베딩/LLM 단계에서 찾은 이름을 별칭으로 저장 (다음부터 별칭 매칭으로 처리)
+
+        문자열 유사도 매칭은 글자만 비슷한 다른 음식(된장찌개 → 김치찌개)일 수 있으므로
+        별칭으로 굳히지 않고 매번 다시 검색합니다.
+        """
+        aliases = {}
+        for name, match in matches.items():
+            if match['match_type'] in ('exact', 'alias', 'string_matching'):
+                continue
+            alias = normalize_food_name(name)
+            if alias:
+                aliases[alias] = FoodAlias(
+                    alias=alias,
+                    food=match['food'],
+                    match_type=match['match_type'],
+                    similarity=match.get('similarity', 1.0),
+                )
+
+        if not aliases:
+            return
+
+        try:
+            FoodAlias.objects.bulk_create(aliases.values(), ignore_conflicts=True)
+        except Exception as e:
+            logger.warning(f"음식 별칭 저장 실패: {e}")
+
+    def match_hybrid(self, food_names: List[str]) -> Dict[str, Dict]:
+        """
+        3. 트라이그램 + 벡터 하이브리드 검색 (쿼리 1회, 외부 API 호출 없음)
+
+        띄어쓰기/접미사만 다른 이름을 음식명 트라이그램 인덱스로 찾습니다. 캐시에 임베딩이
+        있는 이름은 벡터 순위도 함께 RRF로 합치고, 없으면 트라이그램 순위만 사용합니다.
+        1위 후보의 트라이그램 유사도가 FOOD_TRIGRAM_MATCH_THRESHOLD 이상이거나
+        벡터 유사도가 임계값 이상일 때만 매칭으로 인정합니다.
+        """
+        try:
+            from .vector_search import hybrid_search_foods
+
+            vectors = self.ai_service.get_embeddings(food_names, cached_only=True)
+            hits = hybrid_search_foods(food_names, vectors)
+            foods = Food.objects.defer('embedding').in_bulk([hit['id'] for hit in hits if hit])
+
+            matches = {}
+            for name, vector, hit in zip(food_names, vectors, hits):
+                if not hit or hit['id'] not in foods:
+                    continue
+                trigram_similarity = hit['trigram_similarity'] or 0.0
+                vector_similarity = 1 - hit['distance'] if hit['distance'] is not None else 0.0
+                if (trigram_similarity < settings.FOOD_TRIGRAM_MATCH_THRESHOLD
+                        and vector_similarity < self.similarity_threshold):
+                    continue
+                matches[name] = {
+                    'food': foods[hit['id']],
+                    'similarity': max(trigram_similarity, vector_similarity),
+                    'match_type': 'hybrid' if vector else 'trigram',
+                }
+            logger.info(f"✅ [하이브리드 검색] {len(matches)}/{len(food_names)}개 성공")
+            return matches
+        except Exception as e:
+            logger.warning(f"❌ [하이브리드 검색] 오류: {e}")
+            return {}
+
+    def match_string(self, food_names: List[str]) -> Dict[str, Dict]:
+        """
+        5. 문자열 유사도 검색 (n-gram 역색인 후보만 점수 계산, 외부 API 호출 없음)
+
+        임베딩 검색으로 찾지 못한 이름만, LLM으로 새 음식을 만들기 전 마지막으로 확인합니다.
+        """
+        matches = self.ai_service.find_similar_foods_by_string_matching(
+            food_names, threshold=settings.FOOD_STRING_MATCH_THRESHOLD
+        )
+        logger.info(f"✅ [문자열 유사도 검색] {len(matches)}/{len(food_names)}개 성공")
+        return matches
+
+    def match_embedding(self, food_names: List[str]) -> Dict[str, Dict]:
+        """4. 임베딩 기반 유사 음식 검색 (임베딩 배치 1회 + 벡터 쿼리 1회)"""
+        try:
+            matches = self.ai_service.find_similar_foods_by_embeddings(
+                food_names, threshold=self.similarity_threshold
+            )
+            logger.info(f"✅ [임베딩 검색] {len(matches)}/{len(food_names)}개 성공")
+            return matches
+        except Exception as e:
+            logger.warning(f"❌ [임베딩 검색] 오류: {e}")
+            return {}
+
+    def match_llm(self, food_names: List[str]) -> Dict[str, Dict]:
+        """6. LLM으로 새로운 음식 생성 (모든 묶음 결과를 합쳐 반환)"""
+        matches = {}
+        for batch_matches in self.iter_match_llm(food_names):
+            matches.update(batch_matches)
+        return matches
+
+    def iter_match_llm(self, food_names: List[str]) -> Iterator[Dict[str, Dict]]:
+        """
+        6. LLM으로 새로운 음식 생성
+
+        음식명을 FOOD_LLM_BATCH_SIZE개씩 묶어 한 번의 호출로 영양성분을 생성하고,
+        묶음들은 제한된 스레드 풀에서 동시에 실행합니다. 요청 단위 마감 시간 안에
+        끝난 묶음만 완료되는 순서대로 저장해 내보내므로 지연 시간은 가장 느린 호출 하나로 결정됩니다.
+        """
+        batch_size = max(1, settings.FOOD_LLM_BATCH_SIZE)
+        batches = [food_names[i:i + batch_size] for i in range(0, len(food_names), batch_size)]
+
+        max_workers = max(1, min(settings.FOOD_LLM_MAX_WORKERS, len(batches)))
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='food-llm')
+        try:
+            # 묶음 안의 단건 재시도도 같은 마감 시간 안에서만 기다림
+            deadline = time.monotonic() + settings.FOOD_LLM_TIMEOUT
+            futures = {}
+            for batch in batches:
+                logger.info(f"🤖 [LLM 생성] 시도: {batch}")
+                futures[executor.submit(self.ai_service.get_nutrition_batch_from_llm, batch, deadline)] = batch
+
+            try:
+                for future in as_completed(futures, timeout=settings.FOOD_LLM_TIMEOUT):
+                    yield self._create_llm_matches(futures[future], future)
+            except FuturesTimeoutError:
+                not_done = [future for future in futures if not future.done()]
+                logger.warning(f"⏱️ [LLM 생성] 마감 시간({settings.FOOD_LLM_TIMEOUT}초) 초과: {len(not_done)}개 묶음")
+        finally:
+            # 마감 시간을 넘긴 호출은 기다리지 않음 (결과는 버려짐)
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _create_llm_matches(self, batch: List[str], future) -> Dict[str, Dict]:
+        """완료된 LLM 묶음 결과로 Food 생성 (DB 저장은 요청 스레드에서 묶음 내 순서대로)"""
+        try:
+            nutrition_by_name = future.result()
+        except Exception as e:
+            logger.error(f"LLM 기반 음식 생성 실패: {e}")
+            nutrition_by_name = {}
+
+        # 생성된 음식의 임베딩을 한 번에 준비 (임베딩 검색 단계에서 캐시된 값 재사용)
+        created_names = [name for name in batch if nutrition_by_name.get(name)]
+        try:
+            embeddings = dict(zip(created_names, self.ai_service.get_embeddings(created_names)))
+        except Exception as e:
+            logger.warning(f"LLM 생성 음식 임베딩 실패: {e}")
+            embeddings = {}
+
+        matches = {}
+        for food_name in batch:
+            nutrition_data = nutrition_by_name.get(food_name)
+            llm_match = None
+            if nutrition_data:
+                llm_match = self.ai_service.create_food_from_nutrition(
+                    nutrition_data, embedding=embeddings.get(food_name)
+                )
+            if llm_match:
+                matches[food_name] = llm_match
+            else:
+                logger.info(f"❌ [LLM 생성] 실패: '{food_name}'")
+        return matches
+
+
+def create_food_logs(user, food_text: str, entries: List[Dict[str, Any]],
+                     matches: Dict[str, Dict], invalidate_cache: bool = True,
+                     analysis_job=None) -> Tuple[List[FoodLog], List[str]]:
+    """
+    매칭된 항목을 bulk_create 1회로 저장하고 (일별 합계도 같은 트랜잭션에서 반영)
+    날짜별 캐시를 한 번만 무효화합니다.
+
+    Args:
+        invalidate_cache: False면 캐시 무효화를 호출한 쪽에 맡김 (스트리밍 저장용)
+        analysis_job: 백그라운드 작업에서 저장할 때 FoodLog에 기록할 AnalysisJob
+
+    Returns:
+        Tuple: (저장된 FoodLog 리스트, 찾지 못한 음식명 리스트)
+    """
+    food_logs = []
+    not_found_foods = []
+
+    for entry in entries:
+        match = matches.get(entry['food_name'])
+        if not match:
+            not_found_foods.append(entry['food_name'])
+            continue
+
+        food_log = FoodLog(
+            user=user,
+            food=match['food'],
+            quantity=entry['quantity'],
+            meal_type=entry['meal_type'],
+            original_text=food_text,
+            ai_analysis=entry['result'],
+            analysis_job=analysis_job,
+        )
+        food_logs.append(food_log)
+
+    if food_logs:
+        # bulk_create는 save()를 호출하지 않으므로 영양소를 한 번에 계산
+        compute_food_log_totals(food_logs)
+        with transaction.atomic():
+            FoodLog.objects.bulk_create(food_logs)
+            # bulk_create는 시그널을 보내지 않으므로 일별 합계도 여기서 반영
+            apply_food_log_deltas(added=food_logs)
+        if invalidate_cache:
+            for consumed_date in {log.consumed_date for log in food_logs}:
+                invalidate_nutrition_cache(user, consumed_date)
+        logger.info(f"💾 FoodLog 일괄 저장 완료: {len(food_logs)}개")
+
+    return food_logs, not_found_foods
+
+
+def serialize_food_log(food_log: FoodLog) -> Dict[str, Any]:
+    """응답용 저장 결과 요약"""
+    return {
+        'name': food_log.food.name,
+        'quantity': food_log.quantity,
+        'meal_type': food_log.meal_type,
+        'calories': food_log.total_calories,
+        'protein': food_log.total_protein,
+        'carbs': food_log.total_carbs,
+        'fat': food_log.total_fat,
+    }
+
+
+def run_food_analysis(ai_service, user, food_text: str, language: str = 'ko',
+                      analysis_job=None) -> Dict[str, Any]:
+    """
+    자연어 입력을 분석하여 FoodLog로 저장하고 응답 데이터를 반환합니다.
+
+    Args:
+        ai_service: GeminiAIService 인스턴스
+        user: 사용자 객체
+        food_text: 사용자가 입력한 원본 텍스트
+        language: 언어 코드 ('ko' 또는 'en')
+        analysis_job: 백그라운드 작업에서 호출 시 - 저장한 FoodLog에 작업을 기록하고,
+            Gemini 호출 오류는 빈 결과 대신 예외로 올려 작업이 재시도되게 합니다.
+
+    Returns:
+        dict: analyze_food JSON 응답과 같은 형태
+    """
+    messages = get_language_messages(language)
+
+    logger.info(f"🔍 AI 분석 시작: '{food_text}' (언어: {language})")
+    ai_results = ai_service.analyze_food_text(food_text, language, raise_errors=analysis_job is not None)
+    logger.info(f"📋 AI 분석 결과: {ai_results}")
+
+    entries = normalize_ai_results(ai_results or [])
+    if not entries:
+        logger.warning("⚠️ AI 분석 결과가 비어있음")
+        return {
+            'success': False,
+            'message': messages['analysis_failed']
+        }
+
+    logger.info(f"🎯 음식 매칭 시작: {len(entries)}개 결과")
+    matches = FoodResolver(ai_service).resolve([entry['food_name'] for entry in entries])
+    food_logs, not_found_foods = create_food_logs(user, food_text, entries, matches, analysis_job=analysis_job)
+    saved_count = len(food_logs)
+
+    logger.info(f"📊 분석 결과 요약: 총 {len(entries)}개 음식 분석, {saved_count}개 저장 성공, {len(not_found_foods)}개 실패")
+
+    result = build_analysis_summary(saved_count, not_found_foods, language)
+    if result['success']:
+        result['saved_foods'] = [serialize_food_log(log) for log in food_logs]
+    return result
+
+
+def summarize_saved_food_logs(food_logs: List[FoodLog], language: str = 'ko') -> Dict[str, Any]:
+    """이미 저장된 FoodLog로 응답 구성 (분석 작업 재시도 시 다시 분석하지 않고 사용)"""
+    result = build_analysis_summary(len(food_logs), [], language)
+    if result['success']:
+        result['saved_foods'] = [serialize_food_log(log) for log in food_logs]
+    return result
+
+
+def build_analysis_summary(saved_count: int, not_found_foods: List[str], language: str = 'ko') -> Dict[str, Any]:
+    """저장 결과로 최종 응답 메시지 구성"""
+    messages = get_language_messages(language)
+
+    if saved_count > 0:
+        message = f'{saved_count}{messages["analysis_success"]}'
+        if not_found_foods:
+            if language == 'ko':
+                message += f' (찾을 수 없는 음식: {", ".join(not_found_foods)})'
+            else:
+                message += f' (Foods not found: {", ".join(not_found_foods)})'
+
+        logger.info(f"✅ 최종 결과: {message}")
+        return {
+            'success': True,
+            'message': message,
+            'not_found_foods': not_found_foods,
+            'saved_count': saved_count,
+            'language': language
+        }
+
+    logger.warning("❌ 최종 결과: 모든 음식 분석 실패")
+    return {
+        'success': False,
+        'message': messages['food_not_found'],
+        'not_found_foods': not_found_foods,
+        'language': language
+    }
+
+
+def stream_food_analysis(ai_service, user, food_text: str, language: str = 'ko') -> Iterator[Dict[str, Any]]:
+    """
+    run_food_analysis의 스트리밍 버전 - 진행 상황을 이벤트로 하나씩 내보냅니다.
+
+    Yields:
+        dict: 'event' 키로 구분되는 이벤트
+            - parsed: AI가 파싱한 음식 목록
+            - food: 매칭되어 저장된 음식 하나 (영양소 합계 포함)
+            - summary: 최종 결과 (analyze_food 응답과 같은 형태)
+            - error: 처리 중 오류
+    """
+    messages = get_language_messages(language)
+    saved_dates = set()
+
+    try:
+        logger.info(f"🔍 AI 분석 시작 (스트리밍): '{food_text}' (언어: {language})")
+        entries = normalize_ai_results(ai_service.analyze_food_text(food_text, language) or [])
+        if not entries:
+            logger.warning("⚠️ AI 분석 결과가 비어있음")
+            yield {'event': 'error', 'success': False, 'message': messages['analysis_failed']}
+            return
+
+        yield {
+            'event': 'parsed',
+            'foods': [
+                {
+                    'index': index,
+                    'food_name': entry['food_name'],
+                    'quantity': entry['quantity'],
+                    'meal_type': entry['meal_type'],
+                }
+                for index, entry in enumerate(entries)
+            ],
+        }
+
+        saved_count = 0
+        resolved = set()
+        resolver = FoodResolver(ai_service)
+        for stage_matches in resolver.iter_resolve([entry['food_name'] for entry in entries]):
+            stage_indexes = [i for i, entry in enumerate(entries) if entry['food_name'] in stage_matches]
+            food_logs, _ = create_food_logs(
+                user, food_text, [entries[i] for i in stage_indexes], stage_matches, invalidate_cache=False
+            )
+            resolved.update(stage_matches)
+            saved_dates.update(log.consumed_date for log in food_logs)
+            saved_count += len(food_logs)
+
+            for index, food_log in zip(stage_indexes, food_logs):
+                yield {
+                    'event': 'food',
+                    'index': index,
+                    'match_type': stage_matches[entries[index]['food_name']]['match_type'],
+                    'food': serialize_food_log(food_log),
+                }
+
+        not_found_foods = [entry['food_name'] for entry in entries if entry['food_name'] not in resolved]
+        logger.info(f"📊 분석 결과 요약: 총 {len(entries)}개 음식 분석, {saved_count}개 저장 성공, {len(not_found_foods)}개 실패")
+        yield {'event': 'summary', **build_analysis_summary(saved_count, not_found_foods, language)}
+
+    except Exception as e:
+        logger.error(f"음식 분석 중 오류 (스트리밍): {e}", exc_info=True)
+        yield {'event': 'error', 'success': False, 'message': f'음식 분석 중 오류가 발생했습니다: {str(e)}'}
+
+    finally:
+        # 클라이언트가 중간에 연결을 끊어도 이미 저장된 날짜의 캐시는 무효화
+        for consumed_date in saved_dates:
+            invalidate_nutrition_cache(user, consumed_date)
@@ -0,0 +1,45 @@
+"""
+음식 키워드 (조리법 / 재료 / 음식 유형)
+- 키워드 사전은 FOOD_KEYWORDS_FILE(JSON, {"분류": ["키워드", ...]})에서 읽어 프로세스당 1회만 로드
+- 음식명에서 추출한 키워드는 Food.keywords(GIN 인덱스 배열 컬럼)에 저장 (Food.save / load_food_data)
+- 사전을 바꾼 뒤에는 manage.py backfill_food_keywords --all로 기존 음식을 다시 계산
+"""
+
+import json
+import logging
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def load_keyword_dictionaries() -> Dict[str, Tuple[str, ...]]:
+    """{분류: (키워드, ...)} - 파일을 읽을 수 없으면 빈 사전 (키워드 없이 동작)"""
+    try:
+        with open(settings.FOOD_KEYWORDS_FILE, encoding='utf-8') as f:
+            data = json.load(f)
+        return {category: tuple(keyword.lower() for keyword in keywords) for category, keywords in data.items()}
+    except (OSError, ValueError, AttributeError) as e:
+        logger.warning(f"음식 키워드 사전 로드 실패 ({settings.FOOD_KEYWORDS_FILE}): {e}")
+        return {}
+
+
+@lru_cache(maxsize=1)
+def _all_keywords() -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(
+        keyword for keywords in load_keyword_dictionaries().values() for keyword in keywords
+    ))
+
+
+def extract_food_keywords(food_name: str) -> List[str]:
+    """음식명에 포함된 키워드 (중복 제거, 사전 순서 유지)"""
+    food_name_lower = (food_name or '').lower()
+    return [keyword for keyword in _all_keywords() if keyword in food_name_lower]
+
+
+def filter_foods_by_keywords(queryset, keywords: Sequence[str]):
+    """키워드가 하나라도 겹치는 음식만 (keywords && ARRAY[...], GIN 인덱스 사용)"""
+    return queryset.filter(keywords__overlap=list(keywords))
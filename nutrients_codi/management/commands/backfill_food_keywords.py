@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from nutrients_codi.models import Food
+from nutrients_codi.food_keywords import extract_food_keywords
+import time
+
+
+class Command(BaseCommand):
+    help = '음식명에서 키워드를 추출해 Food.keywords를 채웁니다 (키워드 사전 FOOD_KEYWORDS_FILE 변경 후 --all)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='키워드가 이미 있는 음식도 다시 계산 (기본값: 키워드가 비어 있는 음식만)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='한 번에 읽고 저장할 음식 수 (기본값: 2000)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Food.objects.order_by('id')
+        if not options['all']:
+            queryset = queryset.filter(keywords__len=0)
+
+        self.stdout.write(f"[INFO] 키워드 계산 대상: {'전체 음식' if options['all'] else '키워드가 비어 있는 음식'}")
+        started = time.time()
+        last_id = 0
+        scanned = updated = 0
+
+        # id 기준 keyset 페이지네이션 (OFFSET 없이 배치마다 인덱스 범위 조회)
+        while True:
+            rows = list(queryset.filter(id__gt=last_id).values_list('id', 'name', 'keywords')[:batch_size])
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            scanned += len(rows)
+
+            changed = []
+            for food_id, name, keywords in rows:
+                new_keywords = extract_food_keywords(name)
+                if new_keywords != (keywords or []):
+                    changed.append(Food(id=food_id, keywords=new_keywords))
+            if changed:
+                Food.objects.bulk_update(changed, ['keywords'], batch_size=batch_size)
+                updated += len(changed)
+
+            self.stdout.write(f'[PROGRESS] {scanned:,}개 확인, {updated:,}개 갱신 (마지막 id: {last_id})')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'[OK] 완료: {scanned:,}개 중 {updated:,}개 갱신 ({time.time() - started:.1f}초)'
+        ))
+        if updated:
+            self.stdout.write('[INFO] 문자열 유사도 검색에 반영하려면 build_food_ngram_index를 다시 실행하세요.')
@@ -0,0 +1,392 @@
+"""
+음식 임베딩 검색 벤치마크 (recall@k / 지연 시간 / QPS)
+- 쿼리: --fixture JSON 파일 또는 FoodLog.ai_analysis 음식명 → 실제로 선택된 food_id 표본
+- 정답: 전체 임베딩 전수 비교 (numpy, 정확한 코사인 유사도)
+- 백엔드: exact(numpy 전수 비교), pgvector-full/halfvec/binary, ann
+- --output JSON으로 저장하고 --baseline으로 이전 결과와 비교 (회귀 확인)
+- --synthetic: DB 임베딩/Gemini API 없이 랜덤 벡터로 측정 (exact, ann)
+
+fixture 형식:
+    [{"query": "김치찌개", "food_id": 123}, {"query": "아메리카노"}, ...]
+"""
+
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from nutrients_codi.ann_index import (
+    FoodAnnIndex, _normalize_rows, build_ann_index_from_arrays, get_food_ann_index, load_food_embeddings
+)
+from nutrients_codi.models import FoodLog
+from nutrients_codi.text_normalization import normalize_food_text
+
+BACKENDS = ['exact', 'pgvector-full', 'pgvector-halfvec', 'pgvector-binary', 'ann']
+WARMUP_QUERIES = 5
+
+
+def exact_top_k(matrix, queries, k, chunk_size=8192):
+    """
+    전수 비교 top-k (행 번호, 코사인 유사도) - 행렬을 chunk_size행씩 float32로 올려 메모리 사용 제한
+
+    matrix, queries는 행 단위로 정규화되어 있어야 합니다.
+    """
+    k = min(k, len(matrix))
+    best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+    best_scores = np.zeros((len(queries), 0), dtype=np.float32)
+
+    for start in range(0, len(matrix), chunk_size):
+        chunk_scores = queries @ matrix[start:start + chunk_size].astype(np.float32).T
+        chunk_rows = np.broadcast_to(np.arange(start, start + chunk_scores.shape[1]), chunk_scores.shape)
+        scores = np.concatenate([best_scores, chunk_scores], axis=1)
+        rows = np.concatenate([best_rows, chunk_rows], axis=1)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, top, axis=1)
+        best_rows = np.take_along_axis(rows, top, axis=1)
+
+    order = np.argsort(-best_scores, axis=1)
+    return np.take_along_axis(best_rows, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+
+def latency_stats(latencies):
+    latencies = np.asarray(latencies)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'mean_ms': round(float(latencies.mean() * 1000), 3),
+        'qps': round(float(len(latencies) / latencies.sum()), 1) if latencies.sum() else None,
+    }
+
+
+class Command(BaseCommand):
+    help = '음식 임베딩 검색 백엔드별 recall@k, p50/p95/p99 지연 시간, QPS를 측정합니다'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fixture',
+            type=str,
+            default=None,
+            help='쿼리 파일 (JSON: [{"query": 음식명, "food_id": 정답 id}], 없으면 FoodLog에서 표본 추출)'
+        )
+        parser.add_argument(
+            '--sample',
+            type=int,
+            default=200,
+            help='FoodLog에서 추출할 쿼리 수 / --synthetic 쿼리 수 (기본값: 200)'
+        )
+        parser.add_argument(
+            '--k',
+            type=int,
+            default=10,
+            help='recall@k의 k (기본값: 10)'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.95,
+            help='매칭 유사도 임계값 - 임계값 이상 매칭 비율과 그 정확도 측정 (기본값: 0.95)'
+        )
+        parser.add_argument(
+            '--backends',
+            type=str,
+            default='exact,pgvector-full,ann',
+            help=f'측정할 백엔드 (쉼표 구분: {", ".join(BACKENDS)})'
+        )
+        parser.add_argument(
+            '--ef-search',
+            type=int,
+            default=None,
+            help=f'pgvector hnsw.ef_search (기본값: FOOD_HNSW_EF_SEARCH={settings.FOOD_HNSW_EF_SEARCH})'
+        )
+        parser.add_argument(
+            '--nprobe',
+            type=int,
+            default=None,
+            help=f'ANN 탐색 클러스터 수 (기본값: FOOD_ANN_NPROBE={settings.FOOD_ANN_NPROBE})'
+        )
+        parser.add_argument(
+            '--synthetic',
+            action='store_true',
+            help='DB 임베딩/Gemini API 없이 랜덤 벡터로 측정 (exact, ann만)'
+        )
+        parser.add_argument(
+            '--catalog-size',
+            type=int,
+            default=20000,
+            help='--synthetic: 음식 벡터 수 (기본값: 20000)'
+        )
+        parser.add_argument(
+            '--dim',
+            type=int,
+            default=1536,
+            help='--synthetic: 벡터 차원 (기본값: 1536)'
+        )
+        parser.add_argument(
+            '--noise',
+            type=float,
+            default=0.3,
+            help='--synthetic: 쿼리에 더할 잡음 크기 (0.3이면 정답과의 유사도 약 0.96, 기본값: 0.3)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='표본 추출 / 랜덤 벡터 시드 (기본값: 0)'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=None,
+            help='결과 JSON 저장 경로'
+        )
+        parser.add_argument(
+            '--baseline',
+            type=str,
+            default=None,
+            help='비교할 이전 결과 JSON (recall 하락 / 지연 시간 증가 표시)'
+        )
+
+    def handle(self, *args, **options):
+        backends = [b.strip() for b in options['backends'].split(',') if b.strip()]
+        unknown = set(backends) - set(BACKENDS)
+        if unknown:
+            raise CommandError(f'알 수 없는 백엔드: {", ".join(sorted(unknown))} (사용 가능: {", ".join(BACKENDS)})')
+
+        k = options['k']
+        rng = np.random.default_rng(options['seed'])
+
+        if options['synthetic']:
+            ids, matrix, queries, labels = self._synthetic_data(options, rng)
+            skipped = [b for b in backends if b.startswith('pgvector')]
+            if skipped:
+                self.stdout.write(self.style.WARNING(f'[WARNING] --synthetic 에서는 제외: {", ".join(skipped)}'))
+                backends = [b for b in backends if b not in skipped]
+        else:
+            ids, matrix, queries, labels = self._catalog_data(options)
+
+        if len(ids) == 0 or len(queries) == 0:
+            self.stdout.write(self.style.WARNING('[WARNING] 측정할 음식 임베딩 또는 쿼리가 없습니다.'))
+            return
+
+        self.stdout.write(f'[INFO] 음식: {len(ids):,}개, 쿼리: {len(queries)}개, k={k}, 임계값={options["threshold"]}')
+
+        # 정답: 전수 비교 top-k
+        started = time.time()
+        truth_rows, _ = exact_top_k(matrix, queries, k)
+        truth = [[int(ids[row]) for row in rows] for rows in truth_rows]
+        self.stdout.write(f'[INFO] 정답 계산 완료 (전수 비교, {time.time() - started:.1f}초)\n')
+
+        results = {}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for backend in backends:
+                search = self._make_searcher(backend, ids, matrix, k, options, temp_dir)
+                if search is None:
+                    continue
+                self.stdout.write(f'[INFO] [{backend}] 측정 중...')
+                results[backend] = self._run_backend(search, queries, truth, labels, k, options['threshold'])
+                self._print_result(backend, results[backend], k)
+
+        if not results:
+            return
+
+        report = {
+            'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'config': {
+                'synthetic': options['synthetic'],
+                'catalog_size': int(len(ids)),
+                'queries': int(len(queries)),
+                'k': k,
+                'threshold': options['threshold'],
+                'ef_search': options['ef_search'] or settings.FOOD_HNSW_EF_SEARCH,
+                'nprobe': options['nprobe'] or settings.FOOD_ANN_NPROBE,
+                'rerank_k': settings.FOOD_VECTOR_RERANK_K,
+            },
+            'backends': results,
+        }
+
+        if options['baseline']:
+            self._compare(report, json.loads(Path(options['baseline']).read_text()), k)
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, ensure_ascii=False, indent=2))
+            self.stdout.write(self.style.SUCCESS(f'\n[OK] 결과 저장: {options["output"]}'))
+
+    # ------------------------------------------------------------------
+    # 데이터 준비
+    # ------------------------------------------------------------------
+
+    def _synthetic_data(self, options, rng):
+        """정규분포 랜덤 벡터 카탈로그 + 카탈로그 벡터에 잡음을 더한 쿼리 (정답 = 원래 벡터)"""
+        size, dim = options['catalog_size'], options['dim']
+        matrix = _normalize_rows(rng.standard_normal((size, dim), dtype=np.float32)).astype(np.float16)
+        ids = np.arange(1, size + 1, dtype=np.int64)
+
+        rows = rng.choice(size, min(options['sample'], size), replace=False)
+        noise = _normalize_rows(rng.standard_normal((len(rows), dim), dtype=np.float32)) * options['noise']
+        queries = _normalize_rows(matrix[rows].astype(np.float32) + noise)
+        self.stdout.write(f'[INFO] 랜덤 벡터 생성: {size:,}개 x {dim}차원 (잡음 {options["noise"]})')
+        return ids, matrix, queries, [int(ids[row]) for row in rows]
+
+    def _catalog_data(self, options):
+        """DB 임베딩 전체 + 쿼리 음식명 임베딩 (EmbeddingCache 사용)"""
+        pairs = self._load_fixture(options['fixture']) if options['fixture'] else self._sample_food_logs(options)
+        if not pairs:
+            return np.zeros(0), None, [], []
+
+        self.stdout.write('[INFO] 음식 임베딩 로드 중...')
+        ids, matrix = load_food_embeddings()
+
+        from nutrients_codi.ai_service import get_gemini_service
+        try:
+            ai_service = get_gemini_service()
+        except ValueError as e:
+            raise CommandError(f'AI 서비스 초기화 실패: {e} (오프라인 측정은 --synthetic)')
+
+        embeddings = ai_service.get_embeddings([query for query, _ in pairs])
+        kept = [(emb, label) for (_, label), emb in zip(pairs, embeddings) if emb]
+        if len(kept) < len(pairs):
+            self.stdout.write(self.style.WARNING(f'[WARNING] 임베딩 생성 실패로 제외된 쿼리: {len(pairs) - len(kept)}개'))
+        if not kept:
+            return ids, matrix, [], []
+
+        queries = _normalize_rows(np.asarray([emb for emb, _ in kept], dtype=np.float32))
+        return ids, matrix, queries, [label for _, label in kept]
+
+    def _load_fixture(self, path):
+        data = json.loads(Path(path).read_text())
+        pairs = [(item['query'], item.get('food_id')) for item in data if item.get('query')]
+        self.stdout.write(f'[INFO] fixture 쿼리: {len(pairs)}개 ({path})')
+        return pairs
+
+    def _sample_food_logs(self, options):
+        """최근 FoodLog에서 (AI가 추출한 음식명, 실제 저장된 food_id) 표본 - 음식명 중복 제거"""
+        seen = {}
+        logs = FoodLog.objects.order_by('-id').values_list('ai_analysis', 'food_id')[:options['sample'] * 20]
+        for ai_analysis, food_id in logs.iterator(chunk_size=2000):
+            name = (ai_analysis or {}).get('food_name') if isinstance(ai_analysis, dict) else None
+            key = normalize_food_text(name or '')
+            if key and key not in seen:
+                seen[key] = (name, food_id)
+
+        pairs = list(seen.values())
+        random.Random(options['seed']).shuffle(pairs)
+        pairs = pairs[:options['sample']]
+        self.stdout.write(f'[INFO] FoodLog 표본 쿼리: {len(pairs)}개')
+        return pairs
+
+    # ------------------------------------------------------------------
+    # 측정
+    # ------------------------------------------------------------------
+
+    def _make_searcher(self, backend, ids, matrix, k, options, temp_dir):
+        """쿼리 벡터 1개 → [(food_id, 유사도), ...] 함수 (준비할 수 없는 백엔드는 None)"""
+        if backend == 'exact':
+            def search(query):
+                rows, scores = exact_top_k(matrix, query[None, :], k)
+                return [(int(ids[row]), float(score)) for row, score in zip(rows[0], scores[0])]
+            return search
+
+        if backend == 'ann':
+            if options['synthetic']:
+                self.stdout.write('[INFO] [ann] 임시 인덱스 빌드 중...')
+                manifest = build_ann_index_from_arrays(Path(temp_dir), ids, matrix)
+                index = FoodAnnIndex(Path(temp_dir), manifest)
+            else:
+                index = get_food_ann_index()
+                if index is None:
+                    self.stdout.write(self.style.WARNING('[WARNING] [ann] 인덱스가 없어 건너뜁니다 (manage.py build_food_ann_index)'))
+                    return None
+            nprobe = options['nprobe']
+            return lambda query: index.search([query], k=k, nprobe=nprobe)[0]
+
+        from nutrients_codi.vector_search import search_foods_for_vectors
+        mode = backend.split('-', 1)[1]
+        ef_search = options['ef_search']
+
+        def search(query):
+            hits = search_foods_for_vectors([query.tolist()], k=k, mode=mode, ef_search=ef_search)[0]
+            return [(food_id, 1 - distance) for food_id, distance in hits]
+        return search
+
+    def _run_backend(self, search, queries, truth, labels, k, threshold):
+        for query in queries[:WARMUP_QUERIES]:
+            search(query)
+
+        latencies = []
+        recall_k = recall_1 = 0.0
+        labelled = label_top1 = label_recall = 0
+        matched = matched_correct = matched_labelled = 0
+
+        for query, expected, label in zip(queries, truth, labels):
+            started = time.perf_counter()
+            hits = search(query)
+            latencies.append(time.perf_counter() - started)
+
+            found = [food_id for food_id, _ in hits[:k]]
+            recall_k += len(set(found) & set(expected)) / len(expected)
+            recall_1 += bool(found) and found[0] == expected[0]
+
+            top_matched = bool(hits) and hits[0][1] >= threshold
+            matched += top_matched
+            if label is not None:
+                labelled += 1
+                label_top1 += bool(found) and found[0] == label
+                label_recall += label in found
+                if top_matched:
+                    matched_labelled += 1
+                    matched_correct += found[0] == label
+
+        count = len(queries)
+        result = {
+            f'recall@{k}': round(recall_k / count, 4),
+            'recall@1': round(recall_1 / count, 4),
+            'match_rate': round(matched / count, 4),
+            'labelled_queries': labelled,
+            'label_top1': round(label_top1 / labelled, 4) if labelled else None,
+            f'label_recall@{k}': round(label_recall / labelled, 4) if labelled else None,
+            'match_precision': round(matched_correct / matched_labelled, 4) if matched_labelled else None,
+        }
+        result.update(latency_stats(latencies))
+        return result
+
+    # ------------------------------------------------------------------
+    # 출력
+    # ------------------------------------------------------------------
+
+    def _print_result(self, backend, result, k):
+        self.stdout.write(
+            f'  recall@{k}={result[f"recall@{k}"]:.3f}  recall@1={result["recall@1"]:.3f}  '
+            f'p50={result["p50_ms"]:.2f}ms  p95={result["p95_ms"]:.2f}ms  p99={result["p99_ms"]:.2f}ms  '
+            f'QPS={result["qps"]}'
+        )
+        if result['labelled_queries']:
+            line = f'  정답 음식 top1={result["label_top1"]:.3f}  임계값 이상 매칭={result["match_rate"]:.3f}'
+            if result['match_precision'] is not None:
+                line += f'  매칭 정확도={result["match_precision"]:.3f}'
+            self.stdout.write(line)
+
+    def _compare(self, report, baseline, k):
+        """이전 결과 대비 recall 하락(0.01 초과) / p95 증가(20% 초과) 표시"""
+        self.stdout.write('\n[INFO] 기준 결과와 비교')
+        for backend, current in report['backends'].items():
+            previous = baseline.get('backends', {}).get(backend)
+            if not previous:
+                self.stdout.write(f'  {backend}: 기준 결과 없음')
+                continue
+
+            recall_key = f'recall@{k}'
+            recall_delta = current[recall_key] - previous.get(recall_key, current[recall_key])
+            p95_ratio = current['p95_ms'] / previous['p95_ms'] if previous.get('p95_ms') else 1.0
+            line = f'  {backend}: {recall_key} {recall_delta:+.4f}, p95 {(p95_ratio - 1) * 100:+.1f}%'
+
+            if recall_delta < -0.01 or p95_ratio > 1.2:
+                self.stdout.write(self.style.WARNING(line + '  ← 회귀'))
+            else:
+                self.stdout.write(line)
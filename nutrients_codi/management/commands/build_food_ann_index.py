@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from nutrients_codi.ann_index import build_food_ann_index, update_food_ann_index
+import time
+
+
+class Command(BaseCommand):
+    help = '음식 임베딩을 메모리 매핑 ANN 인덱스(float16 행렬 + IVF)로 내보냅니다 (FOOD_SEARCH_BACKEND=ann)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='마지막 전체 빌드 이후 추가된 음식만 반영 (인덱스가 없으면 전체 빌드)'
+        )
+        parser.add_argument(
+            '--nlist',
+            type=int,
+            default=None,
+            help='IVF 클러스터 수 (기본값: sqrt(음식 수))'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=10,
+            help='k-means 반복 횟수 (기본값: 10)'
+        )
+        parser.add_argument(
+            '--dir',
+            type=str,
+            default=None,
+            help=f'인덱스 저장 위치 (기본값: {settings.FOOD_ANN_INDEX_DIR})'
+        )
+
+    def handle(self, *args, **options):
+        index_dir = options['dir'] or settings.FOOD_ANN_INDEX_DIR
+        started = time.time()
+
+        try:
+            if options['incremental']:
+                self.stdout.write(f'[INFO] ANN 인덱스 증분 갱신: {index_dir}')
+                manifest = update_food_ann_index(index_dir)
+            else:
+                self.stdout.write(f'[INFO] ANN 인덱스 전체 빌드: {index_dir}')
+                manifest = build_food_ann_index(index_dir, nlist=options['nlist'], iterations=options['iterations'])
+        except RuntimeError as e:
+            self.stdout.write(self.style.ERROR(f'[ERROR] {e}'))
+            return
+
+        self.stdout.write(
+            f"[INFO] 음식 {manifest['count']:,}개 + 증분 {manifest.get('delta_count', 0):,}개, "
+            f"차원 {manifest['dim']}, 클러스터 {manifest['nlist']}개"
+        )
+        self.stdout.write(self.style.SUCCESS(f'[OK] 완료 ({time.time() - started:.1f}초)'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from nutrients_codi.ngram_index import build_food_ngram_index
+import time
+
+
+class Command(BaseCommand):
+    help = '음식명 문자 n-gram 역색인을 pickle 파일로 저장합니다 (문자열 유사도 검색용)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            type=str,
+            default=None,
+            help=f'저장 위치 (기본값: {settings.FOOD_NGRAM_INDEX_PATH})'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path'] or settings.FOOD_NGRAM_INDEX_PATH
+        started = time.time()
+
+        self.stdout.write(f'[INFO] n-gram 인덱스 빌드: {path}')
+        index = build_food_ngram_index(path)
+
+        self.stdout.write(f'[INFO] 음식 {len(index):,}개, n-gram {len(index.postings):,}개')
+        self.stdout.write(self.style.SUCCESS(f'[OK] 완료 ({time.time() - started:.1f}초)'))
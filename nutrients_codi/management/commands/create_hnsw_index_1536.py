@@ -1,11 +1,34 @@
 from django.core.management.base import BaseCommand
-from django.db import connection
-import math
+from django.conf import settings
+from django.db import connection, transaction
+from nutrients_codi.vector_search import HNSW_INDEX_NAMES, reduced_vector_expression, set_local_ef_search
+import numpy as np
+import time
+
+# --sweep 에서 사용하는 실제 데이터 복사본 (운영 테이블/인덱스는 건드리지 않음)
+SWEEP_TABLE = 'nutrients_codi_food_hnsw_sweep'
+
+
+def parse_int_list(value):
+    return [int(v) for v in str(value).split(',') if v.strip()]
 
 class Command(BaseCommand):
-    help = 'embedding 필드에 HNSW 인덱스를 추가합니다 (1536차원, 초고속 검색!)'
+    help = ('embedding 필드에 HNSW 인덱스를 추가합니다 (1536차원 또는 halfvec/binary 축소 표현, 초고속 검색!). '
+            '새 인덱스를 CONCURRENTLY로 만든 뒤 기존 인덱스와 교체하므로 쓰기가 막히지 않습니다.')
 
     def add_arguments(self, parser):
+        parser.add_argument(
+            '--mode',
+            choices=['full', 'halfvec', 'binary', 'all'],
+            default='full',
+            help='full: 1536차원, halfvec: 앞쪽 N차원 float16, binary: 1비트 양자화, all: 모두 생성 후 비교 (기본값: full)'
+        )
+        parser.add_argument(
+            '--dimensions',
+            type=int,
+            default=settings.FOOD_VECTOR_HALFVEC_DIMENSIONS,
+            help=f'halfvec 모드 차원 수 (기본값: {settings.FOOD_VECTOR_HALFVEC_DIMENSIONS}, FOOD_VECTOR_HALFVEC_DIMENSIONS와 같아야 함)'
+        )
         parser.add_argument(
             '--m',
             type=int,
@@ -18,16 +41,57 @@ class Command(BaseCommand):
             default=64,
             help='ef_construction 파라미터 (기본값: 64, 높을수록 품질 향상)'
         )
+        parser.add_argument(
+            '--sweep',
+            action='store_true',
+            help='인덱스를 바꾸지 않고 m / ef_construction / ef_search 조합별 recall@1과 지연 시간을 측정 (1536차원)'
+        )
+        parser.add_argument(
+            '--m-values',
+            type=parse_int_list,
+            default=[8, 16, 32],
+            help='--sweep: 측정할 m 값들 (기본값: 8,16,32)'
+        )
+        parser.add_argument(
+            '--ef-construction-values',
+            type=parse_int_list,
+            default=[32, 64, 128],
+            help='--sweep: 측정할 ef_construction 값들 (기본값: 32,64,128)'
+        )
+        parser.add_argument(
+            '--ef-search-values',
+            type=parse_int_list,
+            default=[20, 40, 80, 160],
+            help='--sweep: 측정할 ef_search 값들 (기본값: 20,40,80,160)'
+        )
+        parser.add_argument(
+            '--queries',
+            type=int,
+            default=200,
+            help='--sweep: 쿼리로 사용할 음식 임베딩 수 (기본값: 200)'
+        )
+        parser.add_argument(
+            '--target-recall',
+            type=float,
+            default=0.95,
+            help='--sweep: 추천 조합의 최소 recall@1 (기본값: 0.95)'
+        )
 
     def handle(self, *args, **options):
+        if options['sweep']:
+            return self._sweep(options)
+        
         m = options['m']
         ef_construction = options['ef_construction']
+        modes = ['full', 'halfvec', 'binary'] if options['mode'] == 'all' else [options['mode']]
         
         self.stdout.write('[INFO] HNSW 인덱스 생성 중...')
+        self.stdout.write(f'[INFO] 모드: {", ".join(modes)}')
         self.stdout.write(f'[INFO] 파라미터: m={m}, ef_construction={ef_construction}')
         self.stdout.write(f'[INFO] 임베딩이 있는 음식만 인덱스 생성')
-        self.stdout.write(f'[INFO] 예상 소요 시간: 약 2-5분\n')
+        self.stdout.write(f'[INFO] 예상 소요 시간: 약 2-5분 (모드당)\n')
         
+        report = []
         try:
             with connection.cursor() as cursor:
                 # 임베딩 개수 확인
@@ -48,47 +112,54 @@ class Command(BaseCommand):
                     )
                     return
                 
-                # 기존 HNSW 인덱스 확인 및 삭제
-                cursor.execute("""
-                    SELECT indexname 
-                    FROM pg_indexes 
-                    WHERE tablename = 'nutrients_codi_food' 
-                    AND indexname LIKE '%embedding%hnsw%';
-                """)
-                existing = cursor.fetchall()
-                
-                if existing:
-                    self.stdout.write(f'[INFO] 기존 HNSW 인덱스 삭제 중...')
-                    for idx in existing:
-                        cursor.execute(f"DROP INDEX IF EXISTS {idx[0]};")
-                
-                # HNSW 인덱스 생성 (1536차원!)
-                self.stdout.write('[INFO] HNSW 인덱스 생성 시작...')
-                cursor.execute(f"""
-                    CREATE INDEX nutrients_codi_food_embedding_hnsw_idx 
-                    ON nutrients_codi_food 
-                    USING hnsw (embedding vector_cosine_ops)
-                    WITH (m = {m}, ef_construction = {ef_construction});
-                """)
-                
-                self.stdout.write(
-                    self.style.SUCCESS('[OK] HNSW 인덱스 생성 완료!')
-                )
-                
-                # 인덱스 정보
-                cursor.execute("""
-                    SELECT 
-                        indexname,
-                        pg_size_pretty(pg_relation_size(indexname::regclass)) as size
-                    FROM pg_indexes 
-                    WHERE tablename = 'nutrients_codi_food' 
-                    AND indexname = 'nutrients_codi_food_embedding_hnsw_idx';
-                """)
-                
-                result = cursor.fetchone()
-                if result:
-                    self.stdout.write(f'[INFO] 인덱스 이름: {result[0]}')
-                    self.stdout.write(f'[INFO] 인덱스 크기: {result[1]}')
+                for mode in modes:
+                    index_name = HNSW_INDEX_NAMES[mode]
+                    temp_name = f'{index_name}_new'
+                    
+                    if mode == 'full':
+                        expression, opclass = '(embedding)', 'vector_cosine_ops'
+                    elif mode == 'halfvec':
+                        expression = reduced_vector_expression('embedding', mode, options['dimensions'])
+                        opclass = 'halfvec_cosine_ops'
+                    else:
+                        expression = reduced_vector_expression('embedding', mode, options['dimensions'])
+                        opclass = 'bit_hamming_ops'
+                    
+                    self.stdout.write(f'[INFO] [{mode}] HNSW 인덱스 생성 시작 (CONCURRENTLY, 임시 이름: {temp_name})...')
+                    started = time.time()
+                    
+                    # 이전 실행이 중단되어 남은 INVALID 임시 인덱스 정리
+                    cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {temp_name};")
+                    try:
+                        # 기존 인덱스는 그대로 두고 새 인덱스를 만듦 (쓰기 차단 없음, 검색도 계속 인덱스 사용)
+                        cursor.execute(f"""
+                            CREATE INDEX CONCURRENTLY {temp_name} 
+                            ON nutrients_codi_food 
+                            USING hnsw ({expression} {opclass})
+                            WITH (m = {m}, ef_construction = {ef_construction});
+                        """)
+                    except Exception:
+                        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {temp_name};")
+                        raise
+                    elapsed = time.time() - started
+                    
+                    # 교체: 삭제 + 이름 변경을 한 트랜잭션으로 (인덱스가 없는 구간 없음)
+                    # 오래 걸리는 쿼리 뒤에서 락을 기다리며 다른 쿼리를 막지 않도록 lock_timeout 지정
+                    with transaction.atomic():
+                        cursor.execute("SET LOCAL lock_timeout = '5s';")
+                        cursor.execute(f"DROP INDEX IF EXISTS {index_name};")
+                        cursor.execute(f"ALTER INDEX {temp_name} RENAME TO {index_name};")
+                    
+                    cursor.execute(
+                        "SELECT pg_relation_size(%s::regclass), pg_size_pretty(pg_relation_size(%s::regclass));",
+                        [index_name, index_name]
+                    )
+                    size_bytes, size_pretty = cursor.fetchone()
+                    report.append((mode, index_name, size_bytes, size_pretty, elapsed))
+                    
+                    self.stdout.write(
+                        self.style.SUCCESS(f'[OK] [{mode}] 인덱스 생성 및 교체 완료: {index_name} ({size_pretty}, {elapsed:.1f}초)')
+                    )
                 
                 # 통계 업데이트
                 cursor.execute("ANALYZE nutrients_codi_food;")
@@ -98,13 +169,126 @@ class Command(BaseCommand):
             self.stdout.write(
                 self.style.ERROR(f'[ERROR] HNSW 인덱스 생성 실패: {e}')
             )
+            if 'halfvec' in str(e) or 'binary_quantize' in str(e):
+                self.stdout.write('[INFO] halfvec/binary 모드는 pgvector 0.7.0 이상이 필요합니다.')
             raise
         
+        # 모드별 인덱스 크기 / 생성 시간 비교
+        self.stdout.write('\n[INFO] 인덱스 비교')
+        self.stdout.write(f'  {"모드":<10}{"크기":>12}{"생성 시간":>12}')
+        for mode, index_name, size_bytes, size_pretty, elapsed in report:
+            self.stdout.write(f'  {mode:<10}{size_pretty:>12}{elapsed:>11.1f}초')
+        
         self.stdout.write(
             self.style.SUCCESS(
                 '\n[SUCCESS] 최적화 완료!'
             )
         )
-        self.stdout.write('[INFO] 이제 임베딩 검색이 1000-2000배 빨라집니다!')
-        self.stdout.write('[INFO] 예상 검색 시간: 22초 -> 0.01-0.02초')
+        self.stdout.write(f'[INFO] 검색 모드 설정: FOOD_VECTOR_SEARCH_MODE={settings.FOOD_VECTOR_SEARCH_MODE}')
+        self.stdout.write('[INFO] halfvec/binary 모드는 후보 검색 후 1536차원 코사인 거리로 재정렬합니다 (FOOD_VECTOR_RERANK_K)')
+        self.stdout.write(f'[INFO] 검색 시 hnsw.ef_search: FOOD_HNSW_EF_SEARCH={settings.FOOD_HNSW_EF_SEARCH} (--sweep 으로 조정)')
+
+    def _sweep(self, options):
+        """
+        실제 음식 임베딩 복사본 테이블에서 파라미터 조합별 recall@1 / 지연 시간 측정
 
+        쿼리는 임의로 고른 음식 임베딩이고 자기 자신을 제외한 최근접 음식을 찾습니다.
+        정답은 인덱스를 만들기 전 전체 스캔(정확한 코사인 거리)으로 구합니다.
+        """
+        table = SWEEP_TABLE
+        self.stdout.write('[INFO] HNSW 파라미터 측정 (--sweep)')
+        self.stdout.write(f'[INFO] m: {options["m_values"]}, ef_construction: {options["ef_construction_values"]}, '
+                          f'ef_search: {options["ef_search_values"]}')
+        
+        results = []
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {table};")
+                cursor.execute(f"""
+                    CREATE UNLOGGED TABLE {table} AS
+                    SELECT id, embedding FROM nutrients_codi_food WHERE embedding IS NOT NULL;
+                """)
+                cursor.execute(f"SELECT COUNT(*) FROM {table};")
+                count = cursor.fetchone()[0]
+                if count < 2:
+                    self.stdout.write(self.style.WARNING('[WARNING] 임베딩이 부족합니다. generate_embeddings를 먼저 실행하세요.'))
+                    return
+                cursor.execute(f"ANALYZE {table};")
+                
+                cursor.execute(
+                    f"SELECT id, embedding::text FROM {table} ORDER BY random() LIMIT %s;",
+                    [options['queries']]
+                )
+                queries = cursor.fetchall()
+                self.stdout.write(f'[INFO] 데이터: {count:,}개, 쿼리: {len(queries)}개\n')
+                
+                # 정답 (인덱스 없는 상태의 전체 스캔)
+                self.stdout.write('[INFO] 정답 계산 중 (전체 스캔)...')
+                truth = [self._nearest(cursor, food_id, vector)[0] for food_id, vector in queries]
+                
+                index_name = f'{table}_hnsw_idx'
+                for m in options['m_values']:
+                    for ef_construction in options['ef_construction_values']:
+                        cursor.execute(f"DROP INDEX IF EXISTS {index_name};")
+                        started = time.time()
+                        cursor.execute(f"""
+                            CREATE INDEX {index_name} ON {table}
+                            USING hnsw (embedding vector_cosine_ops)
+                            WITH (m = {int(m)}, ef_construction = {int(ef_construction)});
+                        """)
+                        build_seconds = time.time() - started
+                        cursor.execute("SELECT pg_size_pretty(pg_relation_size(%s::regclass));", [index_name])
+                        size_pretty = cursor.fetchone()[0]
+                        
+                        for ef_search in options['ef_search_values']:
+                            latencies = []
+                            hits = 0
+                            for (food_id, vector), expected in zip(queries, truth):
+                                found, latency = self._nearest(cursor, food_id, vector, ef_search)
+                                latencies.append(latency)
+                                hits += found == expected
+                            recall = hits / len(queries)
+                            p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+                            results.append((m, ef_construction, build_seconds, size_pretty, ef_search, recall, p50, p95))
+                            self.stdout.write(
+                                f'  m={m:<4} ef_construction={ef_construction:<5} ef_search={ef_search:<5} '
+                                f'recall@1={recall:.3f}  p50={p50:.2f}ms  p95={p95:.2f}ms'
+                            )
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {table};")
+        
+        if not results:
+            return
+        
+        self.stdout.write('\n[INFO] 측정 결과')
+        self.stdout.write(f'  {"m":>4}{"ef_cons":>9}{"생성(초)":>10}{"크기":>10}{"ef_search":>11}{"recall@1":>10}{"p50(ms)":>9}{"p95(ms)":>9}')
+        for m, ef_construction, build_seconds, size_pretty, ef_search, recall, p50, p95 in results:
+            self.stdout.write(
+                f'  {m:>4}{ef_construction:>9}{build_seconds:>10.1f}{size_pretty:>10}{ef_search:>11}{recall:>10.3f}{p50:>9.2f}{p95:>9.2f}'
+            )
+        
+        # 목표 recall을 만족하는 조합 중 p95가 가장 낮은 것
+        candidates = [r for r in results if r[5] >= options['target_recall']]
+        if candidates:
+            m, ef_construction, _, _, ef_search, recall, p50, p95 = min(candidates, key=lambda r: r[7])
+            self.stdout.write(self.style.SUCCESS(
+                f'\n[OK] 추천: --m {m} --ef-construction {ef_construction}, FOOD_HNSW_EF_SEARCH={ef_search} '
+                f'(recall@1 {recall:.3f}, p95 {p95:.2f}ms)'
+            ))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f'\n[WARNING] recall@1 {options["target_recall"]} 이상인 조합이 없습니다. 더 큰 값으로 다시 측정하세요.'
+            ))
+
+    def _nearest(self, cursor, food_id, vector, ef_search=None):
+        """자기 자신을 제외한 최근접 음식 id와 쿼리 시간(초)"""
+        with transaction.atomic():
+            set_local_ef_search(cursor, ef_search)
+            started = time.perf_counter()
+            cursor.execute(
+                f"SELECT id FROM {SWEEP_TABLE} WHERE id <> %s ORDER BY embedding <=> %s::vector LIMIT 1;",
+                [food_id, vector]
+            )
+            row = cursor.fetchone()
+            return (row[0] if row else None), time.perf_counter() - started
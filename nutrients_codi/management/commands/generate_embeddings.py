@@ -1,13 +1,19 @@
 from django.core.management.base import BaseCommand
 from nutrients_codi.models import Food
 from nutrients_codi.ai_service import GeminiAIService
+from nutrients_codi.resolution_cache import bump_catalog_version
+from nutrients_codi.embedding_pipeline import (
+    MAX_EMBED_BATCH_SIZE, EmbeddingCheckpoint, TokenBucket, embed_texts_with_backoff
+)
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import logging
 from tqdm import tqdm
 
 logger = logging.getLogger(__name__)
 
 class Command(BaseCommand):
-    help = '음식 데이터에 임베딩을 생성합니다 (배치 처리로 최적화)'
+    help = '음식 데이터에 임베딩을 생성합니다 (배치 요청 + 병렬 처리 + 속도 제한 + 이어서 실행)'
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -25,13 +31,37 @@ class Command(BaseCommand):
             '--batch-size',
             type=int,
             default=100,
-            help='배치 크기 (기본값: 100)'
+            help=f'요청 1회당 음식 수 (기본값: 100, 최대 {MAX_EMBED_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='동시에 보낼 임베딩 요청 수 (기본값: 4)'
+        )
+        parser.add_argument(
+            '--requests-per-second',
+            type=float,
+            default=5.0,
+            help='초당 최대 임베딩 요청 수 (기본값: 5, 429 응답 시 자동으로 낮춤)'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            type=str,
+            default='generate_embeddings.checkpoint.json',
+            help='진행 상황 파일 (기본값: generate_embeddings.checkpoint.json)'
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='체크포인트의 실패 구간을 먼저 다시 시도한 뒤, 마지막 처리 id 다음부터 이어서 실행'
         )
 
     def handle(self, *args, **options):
         limit = options['limit']
         force = options['force']
-        batch_size = options['batch_size']
+        batch_size = max(1, min(options['batch_size'], MAX_EMBED_BATCH_SIZE))
+        workers = max(1, options['workers'])
         
         # AI 서비스 초기화
         try:
@@ -63,67 +93,122 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f'[ERROR] 임베딩 테스트 중 오류: {e}'))
             return
         
-        # 처리할 음식들 가져오기 (메모리 효율을 위해 only 사용)
-        # count() 병목 방지: exists()로 먼저 확인만
-        queryset = Food.objects.only('id', 'name', 'embedding')
+        # 처리할 음식 (id 순서 keyset 페이지네이션 - OFFSET 없이 체크포인트부터 이어서 조회)
+        queryset = Food.objects.all()
         
         if not force:
             queryset = queryset.filter(embedding__isnull=True)
         
+        checkpoint = EmbeddingCheckpoint(options['checkpoint'])
+        retry_ranges = deque()
+        if options['resume']:
+            checkpoint.load()
+            retry_ranges.extend(checkpoint.take_failed_ranges())
+            self.stdout.write(f'[INFO] 체크포인트에서 이어서 실행: id > {checkpoint.last_id} '
+                              f'(이전 성공: {checkpoint.success}, 실패: {checkpoint.errors}, '
+                              f'재시도할 실패 구간: {len(retry_ranges)}개)')
+        else:
+            checkpoint.clear()
+        
         # 빠른 체크: 처리할 데이터가 있는지만 확인
-        if not queryset.exists():
+        if not retry_ranges and not queryset.filter(id__gt=checkpoint.last_id).exists():
             self.stdout.write(self.style.WARNING('[INFO] 처리할 음식이 없습니다.'))
+            checkpoint.clear()
             return
         
-        if limit:
-            queryset = queryset[:limit]
-        
-        # count() 대신 대략적인 정보만 표시
         self.stdout.write(f'\n[INFO] 임베딩 생성을 시작합니다...')
-        self.stdout.write(f'[INFO] 배치 크기: {batch_size}')
+        self.stdout.write(f'[INFO] 배치 크기: {batch_size}, 동시 요청: {workers}, 초당 최대 요청: {options["requests_per_second"]}')
         if limit:
             self.stdout.write(f'[INFO] 최대 처리: {limit}개')
         else:
-            self.stdout.write(f'[INFO] 전체 데이터 처리 (임베딩 없는 음식만)')
-        self.stdout.write(f'[INFO] 진행 상황은 실시간으로 표시됩니다.\n')
-        
-        success_count = 0
-        error_count = 0
-        
-        # iterator()로 메모리 절약 (14만개도 문제없음!)
-        # 배치 단위로 DB에서 가져오기
-        import time
-        
-        # tqdm으로 진행 상황 표시 (total 없이 동적으로)
-        with tqdm(desc="임베딩 생성", unit="음식", total=None) as pbar:
-            batch = []
-            processed = 0
-            
-            # iterator()로 청크씩 가져오기 (메모리 효율적)
-            for food in queryset.iterator(chunk_size=batch_size):
-                batch.append(food)
-                
-                # 배치가 찼을 때 처리
-                if len(batch) >= batch_size:
-                    # 배치 처리
-                    try:
-                        # 음식명 추출
-                        food_names = [f.name for f in batch]
+            self.stdout.write(f'[INFO] 전체 데이터 처리 ({"모든 음식" if force else "임베딩 없는 음식만"})')
+        self.stdout.write(f'[INFO] 진행 상황: {checkpoint.path} (중단 시 --resume 으로 이어서 실행)\n')
+        
+        limiter = TokenBucket(options['requests_per_second'])
+        model = ai_service.embedding_model
+        dimensions = ai_service.embedding_dimension
+        
+        last_id = checkpoint.last_id
+        remaining = limit
+        exhausted = False
+        in_flight = {}
+        processed = 0
+        
+        def next_retry_rows():
+            """실패 구간에서 다음 배치 (구간 안에서도 id 순서 keyset, 이미 임베딩이 생긴 음식은 제외됨)"""
+            while retry_ranges:
+                start, end = retry_ranges[0]
+                rows = list(
+                    queryset.filter(id__gte=start, id__lte=end).order_by('id').values_list('id', 'name')[:batch_size]
+                )
+                if len(rows) < batch_size or rows[-1][0] >= end:
+                    retry_ranges.popleft()
+                else:
+                    retry_ranges[0] = [rows[-1][0] + 1, end]
+                if rows:
+                    return rows
+            return None
+        
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='embedding')
+        try:
+            with tqdm(desc="임베딩 생성", unit="음식", total=limit) as pbar:
+                while in_flight or retry_ranges or not exhausted:
+                    # 이전 실행에서 실패한 구간 먼저 (체크포인트 last_id는 움직이지 않음)
+                    while retry_ranges and len(in_flight) < workers * 2:
+                        rows = next_retry_rows()
+                        if not rows:
+                            break
+                        valid = [(food_id, name) for food_id, name in rows if name and name.strip()]
+                        if not valid:
+                            continue
+                        future = executor.submit(
+                            embed_texts_with_backoff, [name for _, name in valid], model, dimensions, limiter
+                        )
+                        in_flight[future] = (None, rows, valid)
+                    
+                    # 요청 스레드가 쉬지 않도록 항상 workers * 2개 배치를 미리 제출
+                    while not exhausted and len(in_flight) < workers * 2:
+                        page_size = batch_size if remaining is None else min(batch_size, remaining)
+                        rows = list(
+                            queryset.filter(id__gt=last_id).order_by('id').values_list('id', 'name')[:page_size]
+                        ) if page_size > 0 else []
+                        if not rows:
+                            exhausted = True
+                            break
+                        
+                        last_id = rows[-1][0]
+                        if remaining is not None:
+                            remaining -= len(rows)
                         
-                        # 임베딩 생성
-                        embeddings = ai_service.get_embeddings_batch(food_names)
+                        seq = checkpoint.start_batch()
+                        valid = [(food_id, name) for food_id, name in rows if name and name.strip()]
+                        if not valid:
+                            checkpoint.finish_batch(seq, last_id, 0, len(rows))
+                            pbar.update(len(rows))
+                            continue
                         
-                        # 임베딩 할당
-                        foods_to_update = []
-                        for f, emb in zip(batch, embeddings):
-                            if emb:
-                                f.embedding = emb
-                                foods_to_update.append(f)
-                                success_count += 1
-                            else:
-                                error_count += 1
+                        future = executor.submit(
+                            embed_texts_with_backoff, [name for _, name in valid], model, dimensions, limiter
+                        )
+                        in_flight[future] = (seq, rows, valid)
+                    
+                    if not in_flight:
+                        break
+                    
+                    # 완료된 배치부터 바로 저장 (나머지 배치는 계속 임베딩 중)
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        seq, rows, valid = in_flight.pop(future)
+                        try:
+                            embeddings = future.result()
+                        except Exception as e:
+                            logger.error(f'배치 처리 오류 (id {rows[0][0]}~{rows[-1][0]}): {e}')
+                            embeddings = []
                         
-                        # DB 저장 (bulk_update)
+                        foods_to_update = [
+                            Food(id=food_id, embedding=emb)
+                            for (food_id, _), emb in zip(valid, embeddings) if emb
+                        ]
                         if foods_to_update:
                             Food.objects.bulk_update(
                                 foods_to_update,
@@ -131,59 +216,58 @@ class Command(BaseCommand):
                                 batch_size=len(foods_to_update)
                             )
                         
-                        processed += len(batch)
-                        pbar.update(len(batch))
+                        # 실패한 음식은 체크포인트에 구간으로 남겨 --resume 시 다시 시도
+                        updated_ids = {food.id for food in foods_to_update}
+                        row_ids = [food_id for food_id, _ in rows]
+                        failed_ids = [food_id for food_id, _ in valid if food_id not in updated_ids]
+                        if seq is None:
+                            checkpoint.finish_retry(len(foods_to_update), row_ids, failed_ids)
+                        else:
+                            checkpoint.finish_batch(
+                                seq, rows[-1][0], len(foods_to_update), len(rows) - len(foods_to_update),
+                                row_ids, failed_ids
+                            )
+                        processed += len(rows)
+                        pbar.update(len(rows))
                         
                         # 진행 상황 출력 (1000개마다)
-                        if processed % 1000 == 0:
+                        if processed % 1000 < len(rows):
                             self.stdout.write(
                                 f'[PROGRESS] {processed}개 처리 완료 '
-                                f'(성공: {success_count}, 실패: {error_count})'
+                                f'(성공: {checkpoint.success}, 실패: {checkpoint.errors}, '
+                                f'초당 요청: {limiter.rate:.2f}, 체크포인트 id: {checkpoint.last_id})'
                             )
-                        
-                    except Exception as e:
-                        error_count += len(batch)
-                        logger.error(f'배치 처리 오류: {e}')
-                        pbar.update(len(batch))
-                    
-                    # 배치 초기화
-                    batch = []
-                    
-                    # API rate limit 방지 (짧은 대기)
-                    time.sleep(0.2)
-            
-            # 마지막 남은 배치 처리
-            if batch:
-                try:
-                    food_names = [f.name for f in batch]
-                    embeddings = ai_service.get_embeddings_batch(food_names)
-                    
-                    foods_to_update = []
-                    for f, emb in zip(batch, embeddings):
-                        if emb:
-                            f.embedding = emb
-                            foods_to_update.append(f)
-                            success_count += 1
-                        else:
-                            error_count += 1
-                    
-                    if foods_to_update:
-                        Food.objects.bulk_update(
-                            foods_to_update,
-                            ['embedding'],
-                            batch_size=len(foods_to_update)
-                        )
-                    
-                    pbar.update(len(batch))
-                    
-                except Exception as e:
-                    error_count += len(batch)
-                    logger.error(f'마지막 배치 처리 오류: {e}')
-                    pbar.update(len(batch))
+        except KeyboardInterrupt:
+            executor.shutdown(wait=False, cancel_futures=True)
+            # 끝나지 않은 재시도 배치와 아직 시작하지 않은 재시도 구간도 다음 --resume을 위해 남김
+            for seq, rows, _ in in_flight.values():
+                if seq is None:
+                    checkpoint.failed_ranges.append([rows[0][0], rows[-1][0]])
+            checkpoint.failed_ranges.extend(retry_ranges)
+            checkpoint.save()
+            self.stdout.write(self.style.WARNING(
+                f'\n[INFO] 중단됨 - id {checkpoint.last_id}까지 저장됨. --resume 으로 이어서 실행하세요.'
+            ))
+            return
+        finally:
+            executor.shutdown(wait=True)
+        
+        # 끝까지 처리했으면 체크포인트 삭제 (--limit으로 멈춘 경우, 실패 구간이 남은 경우는 유지)
+        if (remaining is None or remaining > 0) and not checkpoint.failed_ranges:
+            checkpoint.clear()
+        
+        # bulk_update는 시그널을 보내지 않으므로 캐시된 음식 검색 결과를 직접 무효화
+        if checkpoint.success:
+            bump_catalog_version()
         
         # 최종 결과
         self.stdout.write('\n' + '='*60)
-        self.stdout.write(self.style.SUCCESS(f'[COMPLETE] 완료: {success_count}개 성공'))
-        if error_count > 0:
-            self.stdout.write(self.style.WARNING(f'[WARNING] 실패: {error_count}개'))
+        self.stdout.write(self.style.SUCCESS(f'[COMPLETE] 완료: {checkpoint.success}개 성공'))
+        if checkpoint.errors > 0:
+            self.stdout.write(self.style.WARNING(f'[WARNING] 실패: {checkpoint.errors}개'))
+        if checkpoint.failed_ranges:
+            self.stdout.write(self.style.WARNING(
+                f'[WARNING] 실패한 id 구간 {len(checkpoint.failed_ranges)}개가 {checkpoint.path}에 기록됨 - '
+                f'--resume 으로 다시 시도하세요.'
+            ))
         self.stdout.write('='*60)
@@ -1,5 +1,7 @@
 from django.core.management.base import BaseCommand
 from nutrients_codi.models import Food
+from nutrients_codi.food_keywords import extract_food_keywords
+from nutrients_codi.resolution_cache import bump_catalog_version
 import pandas as pd
 import os
 from django.conf import settings
@@ -213,6 +215,10 @@ class Command(BaseCommand):
                     Food.objects.bulk_create(food_objects, ignore_conflicts=True)
                 created_count += len(food_objects)
             
+            # bulk_create는 시그널을 보내지 않으므로 캐시된 음식 검색 결과를 직접 무효화
+            if created_count:
+                bump_catalog_version()
+            
             self.stdout.write(
                 self.style.SUCCESS(
                     f'완료: {created_count}개 생성, {skipped_count}개 중복 건너뜀, {error_count}개 오류'
@@ -379,4 +385,7 @@ class Command(BaseCommand):
         food_data.setdefault('category', '기타')
         food_data.setdefault('source', '식품의약품안전처')
         
+        # 키워드 (bulk_create는 Food.save를 거치지 않으므로 여기서 추출)
+        food_data['keywords'] = extract_food_keywords(food_data['name'])
+        
         return food_data
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from nutrients_codi.daily_summary import rebuild_daily_summaries
+from nutrients_codi.utils_optimized import bump_nutrition_cache_versions
+from datetime import date
+import time
+
+
+class Command(BaseCommand):
+    help = 'FoodLog에서 일별 영양소 합계(DailyNutritionSummary)를 다시 계산합니다 (백필 / 어긋난 합계 복구)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-ids',
+            type=str,
+            default=None,
+            help='쉼표로 구분한 사용자 id (기본값: 전체 사용자)'
+        )
+        parser.add_argument(
+            '--since',
+            type=str,
+            default=None,
+            help='이 날짜 이후만 (YYYY-MM-DD, 포함)'
+        )
+        parser.add_argument(
+            '--until',
+            type=str,
+            default=None,
+            help='이 날짜 이전만 (YYYY-MM-DD, 포함)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='트랜잭션 1회당 사용자 수 (기본값: 500)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user_ids = [int(value) for value in options['user_ids'].split(',') if value.strip()] if options['user_ids'] else None
+            start_date = date.fromisoformat(options['since']) if options['since'] else None
+            end_date = date.fromisoformat(options['until']) if options['until'] else None
+        except ValueError as e:
+            raise CommandError(f'잘못된 옵션 값: {e}')
+
+        if user_ids is None:
+            user_ids = list(User.objects.order_by('id').values_list('id', flat=True))
+
+        self.stdout.write(
+            f"[INFO] 재계산 대상: 사용자 {len(user_ids):,}명, 기간 {start_date or '처음'} ~ {end_date or '현재'}"
+        )
+        started = time.time()
+
+        # 사용자 묶음마다 트랜잭션을 나눠 테이블 전체를 오래 잠그지 않음
+        batch_size = max(options['batch_size'], 1)
+        created = 0
+        for i in range(0, len(user_ids), batch_size):
+            batch = user_ids[i:i + batch_size]
+            created += rebuild_daily_summaries(batch, start_date, end_date)
+            bump_nutrition_cache_versions(batch)
+            self.stdout.write(f'[PROGRESS] 사용자 {min(i + batch_size, len(user_ids)):,}/{len(user_ids):,}명, 합계 {created:,}개')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'[OK] 완료: 일별 합계 {created:,}개 ({time.time() - started:.1f}초)'
+        ))
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+from nutrients_codi.utils_optimized import recompute_food_log_totals
+from datetime import date
+import time
+
+
+class Command(BaseCommand):
+    help = 'Food 영양성분 수정 후 기존 FoodLog의 total_* 값을 일괄 재계산합니다 (배치마다 UPDATE 1회)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--food-ids',
+            type=str,
+            default=None,
+            help='쉼표로 구분한 음식 id (기본값: 전체 음식)'
+        )
+        parser.add_argument(
+            '--since',
+            type=str,
+            default=None,
+            help='이 날짜 이후 기록만 (YYYY-MM-DD, 포함)'
+        )
+        parser.add_argument(
+            '--until',
+            type=str,
+            default=None,
+            help='이 날짜 이전 기록만 (YYYY-MM-DD, 포함)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='UPDATE 1회당 FoodLog 수 (기본값: 5000)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            food_ids = [int(value) for value in options['food_ids'].split(',') if value.strip()] if options['food_ids'] else None
+            start_date = date.fromisoformat(options['since']) if options['since'] else None
+            end_date = date.fromisoformat(options['until']) if options['until'] else None
+        except ValueError as e:
+            raise CommandError(f'잘못된 옵션 값: {e}')
+
+        self.stdout.write(
+            f"[INFO] 재계산 대상: 음식 {len(food_ids) if food_ids else '전체'}, "
+            f"기간 {start_date or '처음'} ~ {end_date or '현재'}"
+        )
+        started = time.time()
+
+        def progress(updated, last_id):
+            self.stdout.write(f'[PROGRESS] {updated:,}개 갱신 (마지막 id: {last_id})')
+
+        updated, user_ids = recompute_food_log_totals(
+            food_ids=food_ids,
+            start_date=start_date,
+            end_date=end_date,
+            batch_size=options['batch_size'],
+            progress=progress,
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'[OK] 완료: FoodLog {updated:,}개, 사용자 {len(user_ids):,}명 캐시 무효화 ({time.time() - started:.1f}초)'
+        ))
@@ -0,0 +1,122 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.db import close_old_connections, connection
+from nutrients_codi.ai_service import get_gemini_service
+from nutrients_codi.analysis_jobs import claim_analysis_job, process_analysis_job, requeue_stale_jobs
+import logging
+import signal
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = '음식 분석 백그라운드 작업(AnalysisJob)을 처리합니다 (DB 기반, 별도 브로커 불필요)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=settings.ANALYSIS_WORKER_CONCURRENCY,
+            help=f'동시에 처리할 작업 수 (기본값: {settings.ANALYSIS_WORKER_CONCURRENCY})'
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=None,
+            help='작업당 최대 시도 횟수 (기본값: 작업 등록 시 설정값)'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.ANALYSIS_WORKER_POLL_INTERVAL,
+            help=f'대기 작업이 없을 때 다시 조회하기까지의 간격(초) (기본값: {settings.ANALYSIS_WORKER_POLL_INTERVAL})'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='대기 중인 작업을 모두 처리하면 종료'
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        self.max_attempts = options['max_attempts']
+        self.poll_interval = options['poll_interval']
+        self.once = options['once']
+        self.stop_event = threading.Event()
+        self.processed = 0
+        self.lock = threading.Lock()
+
+        try:
+            self.ai_service = get_gemini_service()
+            self.stdout.write(self.style.SUCCESS('[OK] AI 서비스 초기화 성공'))
+        except ValueError as e:
+            self.stdout.write(self.style.ERROR(f'[ERROR] AI 서비스 초기화 실패: {e}'))
+            return
+
+        # 종료 신호를 받으면 진행 중인 작업까지만 끝내고 종료
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, self._handle_stop)
+
+        requeue_stale_jobs()
+        self.stdout.write(f'[INFO] 분석 워커 시작 (동시 처리: {concurrency}, 조회 간격: {self.poll_interval}초)')
+
+        threads = [
+            threading.Thread(target=self._work, name=f'analysis-worker-{i}', daemon=True)
+            for i in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+
+        last_requeue = time.monotonic()
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=self.poll_interval)
+
+            # 다른 워커 프로세스가 죽어 멈춘 작업 주기적으로 정리
+            if time.monotonic() - last_requeue >= 60 and not self.stop_event.is_set():
+                requeue_stale_jobs()
+                last_requeue = time.monotonic()
+
+        connection.close()
+        self.stdout.write(self.style.SUCCESS(f'[OK] 분석 워커 종료 (처리한 작업: {self.processed}개)'))
+
+    def _handle_stop(self, signum, frame):
+        self.stdout.write('[INFO] 종료 신호 수신 - 진행 중인 작업을 마치고 종료합니다')
+        self.stop_event.set()
+
+    def _work(self):
+        """작업 스레드 - 작업을 하나씩 가져와 처리 (스레드별 DB 연결 사용)"""
+        try:
+            while not self.stop_event.is_set():
+                close_old_connections()
+                try:
+                    job = claim_analysis_job()
+                except Exception as e:
+                    # DB 연결 끊김 등 - 잠시 후 다시 시도
+                    logger.error(f"분석 작업 조회 오류: {e}", exc_info=True)
+                    connection.close()
+                    if self.once:
+                        break
+                    self.stop_event.wait(self.poll_interval)
+                    continue
+
+                if job is None:
+                    if self.once:
+                        break
+                    self.stop_event.wait(self.poll_interval)
+                    continue
+
+                try:
+                    job = process_analysis_job(job, self.ai_service, max_attempts=self.max_attempts)
+                except Exception as e:
+                    # 결과 저장 실패 - 실행 중으로 남은 작업은 requeue_stale_jobs가 정리
+                    logger.error(f"분석 작업 #{job.id} 결과 저장 오류: {e}", exc_info=True)
+                    connection.close()
+                    continue
+
+                with self.lock:
+                    self.processed += 1
+                self.stdout.write(f'[INFO] 작업 #{job.id} → {job.status} ({job.attempts}회차)')
+        finally:
+            connection.close()
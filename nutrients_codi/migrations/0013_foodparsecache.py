@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrients_codi', '0012_communitypost_communitycomment_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FoodParseCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cache_key', models.CharField(help_text='정규화된 입력 + 언어의 SHA-256 해시', max_length=64, unique=True)),
+                ('normalized_text', models.TextField(help_text='정규화된 입력 텍스트')),
+                ('language', models.CharField(default='ko', help_text='분석 언어', max_length=10)),
+                ('parsed_foods', models.JSONField(default=list, help_text='AI 파싱 결과 (음식 리스트)')),
+                ('hit_count', models.PositiveIntegerField(default=0, help_text='캐시 적중 횟수')),
+                ('miss_count', models.PositiveIntegerField(default=1, help_text='LLM 호출(캐시 미스) 횟수')),
+                ('last_hit_at', models.DateTimeField(blank=True, help_text='마지막 적중 시간', null=True)),
+                ('expires_at', models.DateTimeField(help_text='만료 시간')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-hit_count'],
+                'indexes': [models.Index(fields=['expires_at'], name='nutrients_c_expires_9d671b_idx'), models.Index(fields=['-hit_count'], name='nutrients_c_hit_cou_80f1be_idx')],
+            },
+        ),
+    ]
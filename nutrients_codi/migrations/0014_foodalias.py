@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrients_codi', '0013_foodparsecache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FoodAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(help_text='정규화된 음식명 (공백 제거, 소문자)', max_length=200, unique=True)),
+                ('match_type', models.CharField(blank=True, help_text='최초 매칭 방식', max_length=30)),
+                ('similarity', models.FloatField(default=1.0, help_text='최초 매칭 유사도')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('food', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='nutrients_codi.food')),
+            ],
+            options={
+                'ordering': ['alias'],
+            },
+        ),
+    ]
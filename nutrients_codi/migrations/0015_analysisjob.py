@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrients_codi', '0014_foodalias'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('food_text', models.TextField(help_text='사용자가 입력한 원본 텍스트')),
+                ('language', models.CharField(default='ko', help_text='분석 언어', max_length=10)),
+                ('status', models.CharField(choices=[('pending', '대기'), ('running', '처리 중'), ('completed', '완료'), ('failed', '실패')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='시도 횟수')),
+                ('max_attempts', models.PositiveIntegerField(default=3, help_text='최대 시도 횟수')),
+                ('run_after', models.DateTimeField(help_text='이 시간 이후에 처리 (재시도 지연)')),
+                ('result', models.JSONField(blank=True, help_text='analyze_food 응답과 같은 형태의 결과', null=True)),
+                ('error', models.TextField(blank=True, help_text='마지막 오류 메시지')),
+                ('started_at', models.DateTimeField(blank=True, help_text='마지막 처리 시작 시간', null=True)),
+                ('finished_at', models.DateTimeField(blank=True, help_text='처리 완료 시간', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analysis_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='nutrients_c_status_5d34db_idx'), models.Index(fields=['user', '-created_at'], name='nutrients_c_user_id_b83720_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrients_codi', '0015_analysisjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmbeddingCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cache_key', models.CharField(help_text='모델:차원:정규화된 텍스트의 SHA-256 해시', max_length=64, unique=True)),
+                ('model_name', models.CharField(help_text='임베딩 모델', max_length=100)),
+                ('dimension', models.PositiveIntegerField(help_text='임베딩 차원')),
+                ('vector', models.BinaryField(help_text='float16으로 압축한 임베딩 벡터')),
+                ('hit_count', models.PositiveIntegerField(default=0, help_text='캐시 적중 횟수')),
+                ('last_used_at', models.DateTimeField(auto_now_add=True, db_index=True, help_text='마지막 사용 시간 (오래된 항목부터 삭제)')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
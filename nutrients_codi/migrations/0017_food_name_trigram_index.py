@@ -0,0 +1,41 @@
+# Manual migration: pg_trgm 확장 + 음식명 트라이그램 GIN 인덱스 (하이브리드 음식 검색용)
+
+from django.db import migrations
+
+
+def create_trigram_index(apps, schema_editor):
+    """
+    pg_trgm 설치 후 정규화된 음식명(소문자, 공백 제거)에 GIN 인덱스 생성
+
+    식이 vector_search.trigram_name_expression과 같아야 인덱스를 사용합니다.
+    한글 트라이그램은 DB LC_CTYPE이 C가 아닐 때(예: ko_KR.UTF-8, en_US.UTF-8)만 추출됩니다.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cursor.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS nutrients_codi_food_name_trgm_idx
+            ON nutrients_codi_food
+            USING gin ((lower(replace(name, ' ', ''))) gin_trgm_ops)
+        """)
+
+
+def drop_trigram_index(apps, schema_editor):
+    """인덱스 제거 (롤백용, 확장은 다른 곳에서 쓸 수 있으므로 유지)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP INDEX CONCURRENTLY IF EXISTS nutrients_codi_food_name_trgm_idx")
+
+
+class Migration(migrations.Migration):
+    atomic = False  # CREATE INDEX CONCURRENTLY는 트랜잭션 밖에서 실행
+
+    dependencies = [
+        ('nutrients_codi', '0016_embeddingcache'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
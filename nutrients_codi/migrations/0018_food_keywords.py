@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:05
+# 인덱스는 CREATE INDEX CONCURRENTLY로 직접 생성 (음식 테이블 쓰기를 막지 않음)
+# 기존 음식의 키워드는 manage.py backfill_food_keywords로 채움
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+def create_keywords_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS nutrients_c_food_keywords_gin
+            ON nutrients_codi_food USING gin (keywords)
+        """)
+
+
+def drop_keywords_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP INDEX CONCURRENTLY IF EXISTS nutrients_c_food_keywords_gin")
+
+
+class Migration(migrations.Migration):
+    atomic = False  # CREATE INDEX CONCURRENTLY는 트랜잭션 밖에서 실행
+
+    dependencies = [
+        ('nutrients_codi', '0017_food_name_trigram_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='food',
+            name='keywords',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=50), blank=True, default=list, help_text='음식 키워드', size=None),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='food',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['keywords'], name='nutrients_c_food_keywords_gin'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_keywords_index, drop_keywords_index),
+            ],
+        ),
+    ]
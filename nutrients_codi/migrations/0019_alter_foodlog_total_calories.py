@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrients_codi', '0018_food_keywords'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='foodlog',
+            name='total_calories',
+            field=models.FloatField(help_text='총 칼로리 (kcal)'),
+        ),
+    ]
@@ -0,0 +1,108 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_daily_summaries(apps, schema_editor):
+    """기존 FoodLog에서 일별 합계 생성 (INSERT ... SELECT 1회)"""
+    FoodLog = apps.get_model('nutrients_codi', 'FoodLog')
+    DailyNutritionSummary = apps.get_model('nutrients_codi', 'DailyNutritionSummary')
+    quote = schema_editor.connection.ops.quote_name
+    columns = [
+        quote(field.column) for field in DailyNutritionSummary._meta.concrete_fields
+        if field.name.startswith('total_')
+    ]
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(DailyNutritionSummary._meta.db_table)} '
+            f'(user_id, date, updated_at, food_count, {", ".join(columns)}) '
+            f'SELECT user_id, consumed_date, %s, COUNT(*), '
+            f'{", ".join(f"COALESCE(SUM({column}), 0)" for column in columns)} '
+            f'FROM {quote(FoodLog._meta.db_table)} GROUP BY user_id, consumed_date',
+            [timezone.now()]
+        )
+        print(f'\n[OK] 일별 영양소 합계 {cursor.rowcount:,}개 생성')
+
+
+def clear_daily_summaries(apps, schema_editor):
+    """롤백 시 테이블이 삭제되므로 할 일 없음"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrients_codi', '0019_alter_foodlog_total_calories'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyNutritionSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_calories', models.FloatField(help_text='총 칼로리 (kcal)')),
+                ('total_protein', models.FloatField(help_text='총 단백질 (g)')),
+                ('total_carbs', models.FloatField(help_text='총 탄수화물 (g)')),
+                ('total_fat', models.FloatField(help_text='총 지방 (g)')),
+                ('total_fiber', models.FloatField(default=0, help_text='총 식이섬유 (g)')),
+                ('total_sugar', models.FloatField(default=0, help_text='총 당분 (g)')),
+                ('total_sodium', models.FloatField(default=0, help_text='총 나트륨 (mg)')),
+                ('total_potassium', models.FloatField(default=0, help_text='총 칼륨 (mg)')),
+                ('total_calcium', models.FloatField(default=0, help_text='총 칼슘 (mg)')),
+                ('total_iron', models.FloatField(default=0, help_text='총 철분 (mg)')),
+                ('total_magnesium', models.FloatField(default=0, help_text='총 마그네슘 (mg)')),
+                ('total_phosphorus', models.FloatField(default=0, help_text='총 인 (mg)')),
+                ('total_zinc', models.FloatField(default=0, help_text='총 아연 (mg)')),
+                ('total_copper', models.FloatField(default=0, help_text='총 구리 (mg)')),
+                ('total_manganese', models.FloatField(default=0, help_text='총 망간 (mg)')),
+                ('total_selenium', models.FloatField(default=0, help_text='총 셀레늄 (μg)')),
+                ('total_vitamin_a', models.FloatField(default=0, help_text='총 비타민 A (μg)')),
+                ('total_vitamin_b1', models.FloatField(default=0, help_text='총 비타민 B1 (mg)')),
+                ('total_vitamin_b2', models.FloatField(default=0, help_text='총 비타민 B2 (mg)')),
+                ('total_vitamin_b3', models.FloatField(default=0, help_text='총 비타민 B3 (mg)')),
+                ('total_vitamin_b6', models.FloatField(default=0, help_text='총 비타민 B6 (mg)')),
+                ('total_vitamin_b12', models.FloatField(default=0, help_text='총 비타민 B12 (μg)')),
+                ('total_vitamin_c', models.FloatField(default=0, help_text='총 비타민 C (mg)')),
+                ('total_vitamin_d', models.FloatField(default=0, help_text='총 비타민 D (μg)')),
+                ('total_vitamin_e', models.FloatField(default=0, help_text='총 비타민 E (mg)')),
+                ('total_vitamin_k', models.FloatField(default=0, help_text='총 비타민 K (μg)')),
+                ('total_folate', models.FloatField(default=0, help_text='총 엽산 (μg)')),
+                ('total_choline', models.FloatField(default=0, help_text='총 콜린 (mg)')),
+                ('total_beta_carotene', models.FloatField(default=0, help_text='총 베타카로틴 (μg)')),
+                ('total_niacin', models.FloatField(default=0, help_text='총 나이아신 (mg)')),
+                ('total_vitamin_d2', models.FloatField(default=0, help_text='총 비타민 D2 (μg)')),
+                ('total_vitamin_d3', models.FloatField(default=0, help_text='총 비타민 D3 (μg)')),
+                ('total_vitamin_k1', models.FloatField(default=0, help_text='총 비타민 K1 (μg)')),
+                ('total_vitamin_k2', models.FloatField(default=0, help_text='총 비타민 K2 (μg)')),
+                ('total_iodine', models.FloatField(default=0, help_text='총 요오드 (μg)')),
+                ('total_fluorine', models.FloatField(default=0, help_text='총 불소 (mg)')),
+                ('total_chromium', models.FloatField(default=0, help_text='총 크롬 (μg)')),
+                ('total_molybdenum', models.FloatField(default=0, help_text='총 몰리브덴 (μg)')),
+                ('total_chlorine', models.FloatField(default=0, help_text='총 염소 (mg)')),
+                ('total_cholesterol', models.FloatField(default=0, help_text='총 콜레스테롤 (mg)')),
+                ('total_saturated_fat', models.FloatField(default=0, help_text='총 포화지방 (g)')),
+                ('total_monounsaturated_fat', models.FloatField(default=0, help_text='총 단일불포화지방 (g)')),
+                ('total_polyunsaturated_fat', models.FloatField(default=0, help_text='총 다중불포화지방 (g)')),
+                ('total_omega3', models.FloatField(default=0, help_text='총 오메가3 (g)')),
+                ('total_omega6', models.FloatField(default=0, help_text='총 오메가6 (g)')),
+                ('total_trans_fat', models.FloatField(default=0, help_text='총 트랜스지방 (g)')),
+                ('total_caffeine', models.FloatField(default=0, help_text='총 카페인 (mg)')),
+                ('total_alcohol', models.FloatField(default=0, help_text='총 알코올 (g)')),
+                ('total_water', models.FloatField(default=0, help_text='총 수분 (g)')),
+                ('total_ash', models.FloatField(default=0, help_text='총 회분 (g)')),
+                ('date', models.DateField(help_text='섭취 날짜')),
+                ('food_count', models.PositiveIntegerField(default=0, help_text='음식 기록 수')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'date'), name='unique_daily_nutrition_summary')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_summaries, clear_daily_summaries),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrients_codi', '0020_dailynutritionsummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='foodlog',
+            name='analysis_job',
+            field=models.ForeignKey(blank=True, help_text='이 기록을 저장한 백그라운드 분석 작업 (재시도 시 중복 저장 방지)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='food_logs', to='nutrients_codi.analysisjob'),
+        ),
+    ]
@@ -2,8 +2,15 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.translation import gettext_lazy as _
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from pgvector.django import VectorField
 
+from .food_keywords import extract_food_keywords
+from .nutrients import (
+    FOOD_BASIS_GRAMS, NUTRIENT_NAMES, compute_food_log_totals, nutrient_model_fields
+)
+
 
 class Profile(models.Model):
     """사용자 프로필 및 일일 권장 섭취량 정보"""
@@ -101,72 +108,28 @@ class Profile(models.Model):
         return 30  # 기본값
 
 
-class Food(models.Model):
+# 영양소 필드는 nutrients.NUTRIENT_FIELDS에서 생성하는 추상 모델로 상속 (Food / FoodLog 공통 목록)
+FoodNutrients = type('FoodNutrients', (models.Model,), {
+    '__module__': __name__,
+    '__doc__': '음식 영양소 필드 (100g 기준)',
+    'Meta': type('Meta', (), {'abstract': True}),
+    **nutrient_model_fields(),
+})
+
+FoodLogTotals = type('FoodLogTotals', (models.Model,), {
+    '__module__': __name__,
+    '__doc__': '섭취량 기준 영양소 필드 (total_*)',
+    'Meta': type('Meta', (), {'abstract': True}),
+    **nutrient_model_fields(prefix='total_', label_prefix='총 '),
+})
+
+
+class Food(FoodNutrients):
     """식약처 DB 기반의 개별 음식 영양 정보"""
     name = models.CharField(max_length=200, help_text="음식명")
     name_english = models.CharField(max_length=200, blank=True, help_text="영문 음식명")
     
-    # 기본 영양소 (100g 기준)
-    calories = models.FloatField(help_text="칼로리 (kcal)")
-    protein = models.FloatField(help_text="단백질 (g)")
-    carbs = models.FloatField(help_text="탄수화물 (g)")
-    fat = models.FloatField(help_text="지방 (g)")
-    fiber = models.FloatField(default=0, help_text="식이섬유 (g)")
-    sugar = models.FloatField(default=0, help_text="당분 (g)")
-    
-    # 미네랄
-    sodium = models.FloatField(default=0, help_text="나트륨 (mg)")
-    potassium = models.FloatField(default=0, help_text="칼륨 (mg)")
-    calcium = models.FloatField(default=0, help_text="칼슘 (mg)")
-    iron = models.FloatField(default=0, help_text="철분 (mg)")
-    magnesium = models.FloatField(default=0, help_text="마그네슘 (mg)")
-    phosphorus = models.FloatField(default=0, help_text="인 (mg)")
-    zinc = models.FloatField(default=0, help_text="아연 (mg)")
-    copper = models.FloatField(default=0, help_text="구리 (mg)")
-    manganese = models.FloatField(default=0, help_text="망간 (mg)")
-    selenium = models.FloatField(default=0, help_text="셀레늄 (μg)")
-    
-    # 비타민
-    vitamin_a = models.FloatField(default=0, help_text="비타민 A (μg)")
-    vitamin_b1 = models.FloatField(default=0, help_text="비타민 B1 (mg)")
-    vitamin_b2 = models.FloatField(default=0, help_text="비타민 B2 (mg)")
-    vitamin_b3 = models.FloatField(default=0, help_text="비타민 B3 (mg)")
-    vitamin_b6 = models.FloatField(default=0, help_text="비타민 B6 (mg)")
-    vitamin_b12 = models.FloatField(default=0, help_text="비타민 B12 (μg)")
-    vitamin_c = models.FloatField(default=0, help_text="비타민 C (mg)")
-    vitamin_d = models.FloatField(default=0, help_text="비타민 D (μg)")
-    vitamin_e = models.FloatField(default=0, help_text="비타민 E (mg)")
-    vitamin_k = models.FloatField(default=0, help_text="비타민 K (μg)")
-    folate = models.FloatField(default=0, help_text="엽산 (μg)")
-    choline = models.FloatField(default=0, help_text="콜린 (mg)")
-    
-    # 추가 비타민 및 영양소
-    beta_carotene = models.FloatField(default=0, help_text="베타카로틴 (μg)")
-    niacin = models.FloatField(default=0, help_text="나이아신 (mg)")
-    vitamin_d2 = models.FloatField(default=0, help_text="비타민 D2 (μg)")
-    vitamin_d3 = models.FloatField(default=0, help_text="비타민 D3 (μg)")
-    vitamin_k1 = models.FloatField(default=0, help_text="비타민 K1 (μg)")
-    vitamin_k2 = models.FloatField(default=0, help_text="비타민 K2 (μg)")
-    
-    # 추가 미네랄
-    iodine = models.FloatField(default=0, help_text="요오드 (μg)")
-    fluorine = models.FloatField(default=0, help_text="불소 (mg)")
-    chromium = models.FloatField(default=0, help_text="크롬 (μg)")
-    molybdenum = models.FloatField(default=0, help_text="몰리브덴 (μg)")
-    chlorine = models.FloatField(default=0, help_text="염소 (mg)")
-    
-    # 기타 영양소
-    cholesterol = models.FloatField(default=0, help_text="콜레스테롤 (mg)")
-    saturated_fat = models.FloatField(default=0, help_text="포화지방 (g)")
-    monounsaturated_fat = models.FloatField(default=0, help_text="단일불포화지방 (g)")
-    polyunsaturated_fat = models.FloatField(default=0, help_text="다중불포화지방 (g)")
-    omega3 = models.FloatField(default=0, help_text="오메가3 (g)")
-    omega6 = models.FloatField(default=0, help_text="오메가6 (g)")
-    trans_fat = models.FloatField(default=0, help_text="트랜스지방 (g)")
-    caffeine = models.FloatField(default=0, help_text="카페인 (mg)")
-    alcohol = models.FloatField(default=0, help_text="알코올 (g)")
-    water = models.FloatField(default=0, help_text="수분 (g)")
-    ash = models.FloatField(default=0, help_text="회분 (g)")
+    # 영양소 (100g 기준): FoodNutrients (nutrients.NUTRIENT_FIELDS)
     
     # 분류
     category = models.CharField(max_length=100, blank=True, help_text="음식 카테고리")
@@ -179,6 +142,9 @@ class Food(models.Model):
     # Gemini 임베딩 벡터 (pgvector로 최적화, 1536차원으로 HNSW 인덱스 사용)
     embedding = VectorField(dimensions=1536, null=True, blank=True)
     
+    # 음식명에서 추출한 조리법/재료/음식 유형 키워드 (food_keywords.py, 저장 시 자동 계산)
+    keywords = ArrayField(models.CharField(max_length=50), default=list, blank=True, help_text="음식 키워드")
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -200,79 +166,48 @@ class Food(models.Model):
             models.Index(fields=['protein']),
             models.Index(fields=['carbs']),
             models.Index(fields=['fat']),
+            
+            # 키워드 겹침 검색 (keywords && ARRAY[...])
+            GinIndex(fields=['keywords'], name='nutrients_c_food_keywords_gin'),
         ]
     
     def __str__(self):
         return self.name
     
+    def save(self, *args, **kwargs):
+        """음식명이 바뀔 수 있으므로 저장할 때마다 키워드 다시 계산 (bulk_create는 직접 설정)"""
+        self.keywords = extract_food_keywords(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'keywords'}
+        super().save(*args, **kwargs)
+    
     def get_nutrition_per_gram(self):
         """1g당 영양소 정보 반환"""
-        return {
-            # 기본 영양소
-            'calories': self.calories / 100,
-            'protein': self.protein / 100,
-            'carbs': self.carbs / 100,
-            'fat': self.fat / 100,
-            'fiber': self.fiber / 100,
-            'sugar': self.sugar / 100,
-            
-            # 미네랄
-            'sodium': self.sodium / 100,
-            'potassium': self.potassium / 100,
-            'calcium': self.calcium / 100,
-            'iron': self.iron / 100,
-            'magnesium': self.magnesium / 100,
-            'phosphorus': self.phosphorus / 100,
-            'zinc': self.zinc / 100,
-            'copper': self.copper / 100,
-            'manganese': self.manganese / 100,
-            'selenium': self.selenium / 100,
-            
-            # 비타민
-            'vitamin_a': self.vitamin_a / 100,
-            'vitamin_b1': self.vitamin_b1 / 100,
-            'vitamin_b2': self.vitamin_b2 / 100,
-            'vitamin_b3': self.vitamin_b3 / 100,
-            'vitamin_b6': self.vitamin_b6 / 100,
-            'vitamin_b12': self.vitamin_b12 / 100,
-            'vitamin_c': self.vitamin_c / 100,
-            'vitamin_d': self.vitamin_d / 100,
-            'vitamin_e': self.vitamin_e / 100,
-            'vitamin_k': self.vitamin_k / 100,
-            'folate': self.folate / 100,
-            'choline': self.choline / 100,
-            
-            # 추가 비타민 및 영양소
-            'beta_carotene': self.beta_carotene / 100,
-            'niacin': self.niacin / 100,
-            'vitamin_d2': self.vitamin_d2 / 100,
-            'vitamin_d3': self.vitamin_d3 / 100,
-            'vitamin_k1': self.vitamin_k1 / 100,
-            'vitamin_k2': self.vitamin_k2 / 100,
-            
-            # 추가 미네랄
-            'iodine': self.iodine / 100,
-            'fluorine': self.fluorine / 100,
-            'chromium': self.chromium / 100,
-            'molybdenum': self.molybdenum / 100,
-            'chlorine': self.chlorine / 100,
-            
-            # 기타 영양소
-            'cholesterol': self.cholesterol / 100,
-            'saturated_fat': self.saturated_fat / 100,
-            'monounsaturated_fat': self.monounsaturated_fat / 100,
-            'polyunsaturated_fat': self.polyunsaturated_fat / 100,
-            'omega3': self.omega3 / 100,
-            'omega6': self.omega6 / 100,
-            'trans_fat': self.trans_fat / 100,
-            'caffeine': self.caffeine / 100,
-            'alcohol': self.alcohol / 100,
-            'water': self.water / 100,
-            'ash': self.ash / 100,
-        }
+        return {name: getattr(self, name) / FOOD_BASIS_GRAMS for name in NUTRIENT_NAMES}
 
 
-class FoodLog(models.Model):
+class FoodAlias(models.Model):
+    """
+    AI가 반환한 음식명(정규화) → Food 매핑
+    
+    임베딩/LLM 단계에서 한 번 매칭된 이름은 다음부터 인덱스 조회 한 번으로 찾습니다.
+    """
+    alias = models.CharField(max_length=200, unique=True, help_text="정규화된 음식명 (공백 제거, 소문자)")
+    food = models.ForeignKey(Food, on_delete=models.CASCADE, related_name='aliases')
+    match_type = models.CharField(max_length=30, blank=True, help_text="최초 매칭 방식")
+    similarity = models.FloatField(default=1.0, help_text="최초 매칭 유사도")
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['alias']
+    
+    def __str__(self):
+        return f"{self.alias} → {self.food_id}"
+
+
+class FoodLog(FoodLogTotals):
     """사용자가 섭취한 음식 기록 (AI 분석을 통해 생성됨)"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='food_logs')
     food = models.ForeignKey(Food, on_delete=models.CASCADE, related_name='food_logs')
@@ -289,72 +224,16 @@ class FoodLog(models.Model):
     # AI 분석 정보
     original_text = models.TextField(help_text="사용자가 입력한 원본 텍스트")
     ai_analysis = models.JSONField(default=dict, help_text="AI 분석 결과")
+    analysis_job = models.ForeignKey(
+        'AnalysisJob', on_delete=models.SET_NULL, null=True, blank=True, related_name='food_logs',
+        help_text="이 기록을 저장한 백그라운드 분석 작업 (재시도 시 중복 저장 방지)"
+    )
     
     # 섭취 날짜/시간
     consumed_at = models.DateTimeField(auto_now_add=True)
     consumed_date = models.DateField(auto_now_add=True)
     
-    # 계산된 영양소 (섭취량 기준) - 기본 영양소
-    total_calories = models.FloatField(help_text="총 칼로리")
-    total_protein = models.FloatField(help_text="총 단백질 (g)")
-    total_carbs = models.FloatField(help_text="총 탄수화물 (g)")
-    total_fat = models.FloatField(help_text="총 지방 (g)")
-    total_fiber = models.FloatField(default=0, help_text="총 식이섬유 (g)")
-    total_sugar = models.FloatField(default=0, help_text="총 당분 (g)")
-    
-    # 미네랄
-    total_sodium = models.FloatField(default=0, help_text="총 나트륨 (mg)")
-    total_potassium = models.FloatField(default=0, help_text="총 칼륨 (mg)")
-    total_calcium = models.FloatField(default=0, help_text="총 칼슘 (mg)")
-    total_iron = models.FloatField(default=0, help_text="총 철분 (mg)")
-    total_magnesium = models.FloatField(default=0, help_text="총 마그네슘 (mg)")
-    total_phosphorus = models.FloatField(default=0, help_text="총 인 (mg)")
-    total_zinc = models.FloatField(default=0, help_text="총 아연 (mg)")
-    total_copper = models.FloatField(default=0, help_text="총 구리 (mg)")
-    total_manganese = models.FloatField(default=0, help_text="총 망간 (mg)")
-    total_selenium = models.FloatField(default=0, help_text="총 셀레늄 (μg)")
-    
-    # 비타민
-    total_vitamin_a = models.FloatField(default=0, help_text="총 비타민 A (μg)")
-    total_vitamin_b1 = models.FloatField(default=0, help_text="총 비타민 B1 (mg)")
-    total_vitamin_b2 = models.FloatField(default=0, help_text="총 비타민 B2 (mg)")
-    total_vitamin_b3 = models.FloatField(default=0, help_text="총 비타민 B3 (mg)")
-    total_vitamin_b6 = models.FloatField(default=0, help_text="총 비타민 B6 (mg)")
-    total_vitamin_b12 = models.FloatField(default=0, help_text="총 비타민 B12 (μg)")
-    total_vitamin_c = models.FloatField(default=0, help_text="총 비타민 C (mg)")
-    total_vitamin_d = models.FloatField(default=0, help_text="총 비타민 D (μg)")
-    total_vitamin_e = models.FloatField(default=0, help_text="총 비타민 E (mg)")
-    total_vitamin_k = models.FloatField(default=0, help_text="총 비타민 K (μg)")
-    total_folate = models.FloatField(default=0, help_text="총 엽산 (μg)")
-    total_choline = models.FloatField(default=0, help_text="총 콜린 (mg)")
-    
-    # 추가 비타민 및 영양소
-    total_beta_carotene = models.FloatField(default=0, help_text="총 베타카로틴 (μg)")
-    total_niacin = models.FloatField(default=0, help_text="총 나이아신 (mg)")
-    total_vitamin_d2 = models.FloatField(default=0, help_text="총 비타민 D2 (μg)")
-    total_vitamin_d3 = models.FloatField(default=0, help_text="총 비타민 D3 (μg)")
-    total_vitamin_k1 = models.FloatField(default=0, help_text="총 비타민 K1 (μg)")
-    total_vitamin_k2 = models.FloatField(default=0, help_text="총 비타민 K2 (μg)")
-    
-    # 추가 미네랄
-    total_iodine = models.FloatField(default=0, help_text="총 요오드 (μg)")
-    total_fluorine = models.FloatField(default=0, help_text="총 불소 (mg)")
-    total_chromium = models.FloatField(default=0, help_text="총 크롬 (μg)")
-    total_molybdenum = models.FloatField(default=0, help_text="총 몰리브덴 (μg)")
-    total_chlorine = models.FloatField(default=0, help_text="총 염소 (mg)")
-    
-    # 기타 영양소
-    total_cholesterol = models.FloatField(default=0, help_text="총 콜레스테롤 (mg)")
-    total_saturated_fat = models.FloatField(default=0, help_text="총 포화지방 (g)")
-    total_monounsaturated_fat = models.FloatField(default=0, help_text="총 단일불포화지방 (g)")
-    total_polyunsaturated_fat = models.FloatField(default=0, help_text="총 다중불포화지방 (g)")
-    total_omega3 = models.FloatField(default=0, help_text="총 오메가3 (g)")
-    total_omega6 = models.FloatField(default=0, help_text="총 오메가6 (g)")
-    total_trans_fat = models.FloatField(default=0, help_text="총 트랜스지방 (g)")
-    total_caffeine = models.FloatField(default=0, help_text="총 카페인 (mg)")
-    total_alcohol = models.FloatField(default=0, help_text="총 알코올 (g)")
-    total_water = models.FloatField(default=0, help_text="총 수분 (g)")
-    total_ash = models.FloatField(default=0, help_text="총 회분 (g)")
+    # 계산된 영양소 (섭취량 기준): FoodLogTotals (nutrients.NUTRIENT_FIELDS의 total_* 필드)
     
     class Meta:
         ordering = ['-consumed_at']
@@ -383,72 +262,122 @@ class FoodLog(models.Model):
     
     def save(self, *args, **kwargs):
         """섭취량에 따른 영양소 계산"""
-        if self.food:
-            nutrition_per_gram = self.food.get_nutrition_per_gram()
-            
-            # 기본 영양소
-            self.total_calories = round(nutrition_per_gram['calories'] * self.quantity, 1)
-            self.total_protein = round(nutrition_per_gram['protein'] * self.quantity, 1)
-            self.total_carbs = round(nutrition_per_gram['carbs'] * self.quantity, 1)
-            self.total_fat = round(nutrition_per_gram['fat'] * self.quantity, 1)
-            self.total_fiber = round(nutrition_per_gram['fiber'] * self.quantity, 1)
-            self.total_sugar = round(nutrition_per_gram['sugar'] * self.quantity, 1)
-            
-            # 미네랄
-            self.total_sodium = round(nutrition_per_gram['sodium'] * self.quantity, 1)
-            self.total_potassium = round(nutrition_per_gram['potassium'] * self.quantity, 1)
-            self.total_calcium = round(nutrition_per_gram['calcium'] * self.quantity, 1)
-            self.total_iron = round(nutrition_per_gram['iron'] * self.quantity, 1)
-            self.total_magnesium = round(nutrition_per_gram['magnesium'] * self.quantity, 1)
-            self.total_phosphorus = round(nutrition_per_gram['phosphorus'] * self.quantity, 1)
-            self.total_zinc = round(nutrition_per_gram['zinc'] * self.quantity, 1)
-            self.total_copper = round(nutrition_per_gram['copper'] * self.quantity, 1)
-            self.total_manganese = round(nutrition_per_gram['manganese'] * self.quantity, 1)
-            self.total_selenium = round(nutrition_per_gram['selenium'] * self.quantity, 1)
-            
-            # 비타민
-            self.total_vitamin_a = round(nutrition_per_gram['vitamin_a'] * self.quantity, 1)
-            self.total_vitamin_b1 = round(nutrition_per_gram['vitamin_b1'] * self.quantity, 1)
-            self.total_vitamin_b2 = round(nutrition_per_gram['vitamin_b2'] * self.quantity, 1)
-            self.total_vitamin_b3 = round(nutrition_per_gram['vitamin_b3'] * self.quantity, 1)
-            self.total_vitamin_b6 = round(nutrition_per_gram['vitamin_b6'] * self.quantity, 1)
-            self.total_vitamin_b12 = round(nutrition_per_gram['vitamin_b12'] * self.quantity, 1)
-            self.total_vitamin_c = round(nutrition_per_gram['vitamin_c'] * self.quantity, 1)
-            self.total_vitamin_d = round(nutrition_per_gram['vitamin_d'] * self.quantity, 1)
-            self.total_vitamin_e = round(nutrition_per_gram['vitamin_e'] * self.quantity, 1)
-            self.total_vitamin_k = round(nutrition_per_gram['vitamin_k'] * self.quantity, 1)
-            self.total_folate = round(nutrition_per_gram['folate'] * self.quantity, 1)
-            self.total_choline = round(nutrition_per_gram['choline'] * self.quantity, 1)
-            
-            # 추가 비타민 및 영양소
-            self.total_beta_carotene = round(nutrition_per_gram['beta_carotene'] * self.quantity, 1)
-            self.total_niacin = round(nutrition_per_gram['niacin'] * self.quantity, 1)
-            self.total_vitamin_d2 = round(nutrition_per_gram['vitamin_d2'] * self.quantity, 1)
-            self.total_vitamin_d3 = round(nutrition_per_gram['vitamin_d3'] * self.quantity, 1)
-            self.total_vitamin_k1 = round(nutrition_per_gram['vitamin_k1'] * self.quantity, 1)
-            self.total_vitamin_k2 = round(nutrition_per_gram['vitamin_k2'] * self.quantity, 1)
-            
-            # 추가 미네랄
-            self.total_iodine = round(nutrition_per_gram['iodine'] * self.quantity, 1)
-            self.total_fluorine = round(nutrition_per_gram['fluorine'] * self.quantity, 1)
-            self.total_chromium = round(nutrition_per_gram['chromium'] * self.quantity, 1)
-            self.total_molybdenum = round(nutrition_per_gram['molybdenum'] * self.quantity, 1)
-            self.total_chlorine = round(nutrition_per_gram['chlorine'] * self.quantity, 1)
-            
-            # 기타 영양소
-            self.total_cholesterol = round(nutrition_per_gram['cholesterol'] * self.quantity, 1)
-            self.total_saturated_fat = round(nutrition_per_gram['saturated_fat'] * self.quantity, 1)
-            self.total_monounsaturated_fat = round(nutrition_per_gram['monounsaturated_fat'] * self.quantity, 1)
-            self.total_polyunsaturated_fat = round(nutrition_per_gram['polyunsaturated_fat'] * self.quantity, 1)
-            self.total_omega3 = round(nutrition_per_gram['omega3'] * self.quantity, 1)
-            self.total_omega6 = round(nutrition_per_gram['omega6'] * self.quantity, 1)
-            self.total_trans_fat = round(nutrition_per_gram['trans_fat'] * self.quantity, 1)
-            self.total_caffeine = round(nutrition_per_gram['caffeine'] * self.quantity, 1)
-            self.total_alcohol = round(nutrition_per_gram['alcohol'] * self.quantity, 1)
-            self.total_water = round(nutrition_per_gram['water'] * self.quantity, 1)
-            self.total_ash = round(nutrition_per_gram['ash'] * self.quantity, 1)
-            
+        self.calculate_totals()
         super().save(*args, **kwargs)
+    
+    def calculate_totals(self):
+        """
+        섭취량 기준 total_* 영양소 계산 (DB 저장 없음)
+        
+        여러 기록을 bulk_create할 때는 nutrients.compute_food_log_totals로 한 번에 계산합니다.
+        """
+        if self.food:
+            compute_food_log_totals([self])
+
+
+class DailyNutritionSummary(FoodLogTotals):
+    """
+    사용자별 하루 영양소 합계 (FoodLog total_*의 합)
+    
+    FoodLog 생성/수정/삭제 시 같은 트랜잭션에서 변화량만 더하고 빼며 (daily_summary.py),
+    어긋난 경우 manage.py rebuild_daily_summaries로 다시 계산합니다.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_summaries')
+    date = models.DateField(help_text="섭취 날짜")
+    food_count = models.PositiveIntegerField(default=0, help_text="음식 기록 수")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='unique_daily_nutrition_summary'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.date} ({self.food_count}개)"
+
+
+class FoodParseCache(models.Model):
+    """analyze_food_text(Gemini) 파싱 결과 캐시 - 정규화된 입력 텍스트 + 언어 기준"""
+    cache_key = models.CharField(max_length=64, unique=True, help_text="정규화된 입력 + 언어의 SHA-256 해시")
+    normalized_text = models.TextField(help_text="정규화된 입력 텍스트")
+    language = models.CharField(max_length=10, default='ko', help_text="분석 언어")
+    parsed_foods = models.JSONField(default=list, help_text="AI 파싱 결과 (음식 리스트)")
+    
+    # 적중률 통계
+    hit_count = models.PositiveIntegerField(default=0, help_text="캐시 적중 횟수")
+    miss_count = models.PositiveIntegerField(default=1, help_text="LLM 호출(캐시 미스) 횟수")
+    last_hit_at = models.DateTimeField(null=True, blank=True, help_text="마지막 적중 시간")
+    
+    expires_at = models.DateTimeField(help_text="만료 시간")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-hit_count']
+        indexes = [
+            models.Index(fields=['expires_at']),
+            models.Index(fields=['-hit_count']),
+        ]
+    
+    def __str__(self):
+        return f"[{self.language}] {self.normalized_text[:30]} ({self.hit_count}회 적중)"
+
+
+class EmbeddingCache(models.Model):
+    """Gemini 임베딩 캐시 - 정규화된 텍스트 + 모델 + 차원 기준, float16 바이너리로 저장"""
+    cache_key = models.CharField(max_length=64, unique=True, help_text="모델:차원:정규화된 텍스트의 SHA-256 해시")
+    model_name = models.CharField(max_length=100, help_text="임베딩 모델")
+    dimension = models.PositiveIntegerField(help_text="임베딩 차원")
+    vector = models.BinaryField(help_text="float16으로 압축한 임베딩 벡터")
+    
+    hit_count = models.PositiveIntegerField(default=0, help_text="캐시 적중 횟수")
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True, help_text="마지막 사용 시간 (오래된 항목부터 삭제)")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.model_name}({self.dimension}) {self.cache_key[:12]}"
+
+
+class AnalysisJob(models.Model):
+    """음식 분석 백그라운드 작업 - run_analysis_worker가 처리"""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='analysis_jobs')
+    food_text = models.TextField(help_text="사용자가 입력한 원본 텍스트")
+    language = models.CharField(max_length=10, default='ko', help_text="분석 언어")
+    status = models.CharField(max_length=20, choices=[
+        (STATUS_PENDING, '대기'),
+        (STATUS_RUNNING, '처리 중'),
+        (STATUS_COMPLETED, '완료'),
+        (STATUS_FAILED, '실패'),
+    ], default=STATUS_PENDING)
+    
+    # 재시도
+    attempts = models.PositiveIntegerField(default=0, help_text="시도 횟수")
+    max_attempts = models.PositiveIntegerField(default=3, help_text="최대 시도 횟수")
+    run_after = models.DateTimeField(help_text="이 시간 이후에 처리 (재시도 지연)")
+    
+    result = models.JSONField(null=True, blank=True, help_text="analyze_food 응답과 같은 형태의 결과")
+    error = models.TextField(blank=True, help_text="마지막 오류 메시지")
+    
+    started_at = models.DateTimeField(null=True, blank=True, help_text="마지막 처리 시작 시간")
+    finished_at = models.DateTimeField(null=True, blank=True, help_text="처리 완료 시간")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+            models.Index(fields=['user', '-created_at']),
+        ]
+    
+    def __str__(self):
+        return f"#{self.id} {self.user.username} [{self.status}] {self.food_text[:30]}"
 
 
 class CommunityPost(models.Model):
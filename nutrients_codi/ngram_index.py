@@ -0,0 +1,245 @@
+"""
+음식명 문자 n-gram 역색인 (문자열 유사도 검색용)
+- 정규화된 음식명(소문자, 공백 제거)의 문자 2-gram → 음식 행 번호 배열
+- 음식별 키워드는 Food.keywords 컬럼(저장 시 1회 추출)을 그대로 사용
+- 검색: 역색인으로 겹치는 2-gram이 많은 후보(Dice 계수 상위 FOOD_NGRAM_SHORTLIST개)만 고른 뒤
+  후보에 대해서만 SequenceMatcher 유사도 계산 (전체 음식을 훑지 않음)
+  · 임계값은 SequenceMatcher 유사도만으로 비교하고, 공통 키워드 수는 후보 사이 동점 처리에만 사용
+    (키워드 보너스를 점수에 더하면 '닭고기볶음밥'과 '소고기볶음밥'이 1.0이 됨)
+- build_food_ngram_index 명령으로 pickle 파일(FOOD_NGRAM_INDEX_PATH)에 저장, 워커는 파일을 읽어 사용
+- 인덱스 이후 추가된 음식(LLM이 만든 음식 등)은 FOOD_NGRAM_REFRESH_SECONDS마다 DB에서 읽어 추가
+"""
+
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import defaultdict
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .food_keywords import extract_food_keywords
+from .models import Food
+from .text_normalization import normalize_food_name
+
+logger = logging.getLogger(__name__)
+
+NGRAM_SIZE = 2
+INDEX_FORMAT_VERSION = 1
+
+
+def char_ngrams(key: str, n: int = NGRAM_SIZE) -> List[str]:
+    """정규화된 이름의 문자 n-gram (중복 제거, n보다 짧으면 이름 전체)"""
+    if len(key) < n:
+        return [key] if key else []
+    return list(dict.fromkeys(key[i:i + n] for i in range(len(key) - n + 1)))
+
+
+def string_similarity(query_key: str, query_keywords: Sequence[str], key: str,
+                      keywords: Sequence[str]) -> Tuple[float, int]:
+    """
+    (SequenceMatcher 유사도, 공통 키워드 수)
+
+    임계값은 유사도만으로 비교하고, 튜플 순서대로 비교하면 유사도가 같은 후보끼리는
+    공통 키워드가 많은 쪽이 앞섭니다.
+    """
+    similarity = SequenceMatcher(None, query_key, key).ratio()
+    return similarity, len(set(query_keywords) & set(keywords))
+
+
+class FoodNgramIndex:
+    """음식명 n-gram 역색인 (만든 뒤에는 읽기 전용, 스레드 안전)"""
+
+    def __init__(self, ids: np.ndarray, keys: List[str], keywords: List[Tuple[str, ...]],
+                 postings: Dict[str, np.ndarray]):
+        self.ids = ids
+        self.keys = keys
+        self.keywords = keywords
+        self.postings = postings
+        # 행별 n-gram 개수 (Dice 계수 분모)
+        self.gram_counts = np.array([len(char_ngrams(key)) for key in keys], dtype=np.int32)
+        # 인덱스에 들어 있는 가장 큰 음식 id (이후 추가된 음식을 찾는 기준)
+        self.max_food_id = int(ids.max()) if len(ids) else 0
+        self.checked_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def _collect(rows, start_row: int = 0):
+        """(id, 이름, 키워드) 행 → ids, keys, keywords, {2-gram: [행 번호]}"""
+        ids, keys, keywords = [], [], []
+        postings = defaultdict(list)
+        for food_id, name, food_keywords in rows:
+            key = normalize_food_name(name)
+            if not key:
+                continue
+            row = start_row + len(ids)
+            ids.append(food_id)
+            keys.append(key)
+            keywords.append(tuple(food_keywords or ()))
+            for gram in char_ngrams(key):
+                postings[gram].append(row)
+        return ids, keys, keywords, postings
+
+    @classmethod
+    def build(cls) -> 'FoodNgramIndex':
+        """Food 전체에서 구성 (쿼리 1회)"""
+        rows = Food.objects.order_by('id').values_list('id', 'name', 'keywords').iterator(chunk_size=5000)
+        ids, keys, keywords, postings = cls._collect(rows)
+        return cls(
+            np.array(ids, dtype=np.int64),
+            keys,
+            keywords,
+            {gram: np.array(rows, dtype=np.int32) for gram, rows in postings.items()},
+        )
+
+    def with_new_foods(self) -> 'FoodNgramIndex':
+        """
+        인덱스 이후 추가된 음식(id 기준)을 더한 새 인덱스 (쿼리 1회, 새 음식이 없으면 self)
+
+        기존 인덱스는 바꾸지 않으므로 검색 중인 스레드에 영향이 없습니다.
+        새 음식의 2-gram 역색인 배열만 이어 붙입니다.
+        """
+        rows = Food.objects.filter(id__gt=self.max_food_id).order_by('id').values_list('id', 'name', 'keywords')
+        ids, keys, keywords, postings = self._collect(rows, start_row=len(self.ids))
+        if not ids:
+            return self
+
+        merged = dict(self.postings)
+        for gram, new_rows in postings.items():
+            new_rows = np.array(new_rows, dtype=np.int32)
+            merged[gram] = np.concatenate([merged[gram], new_rows]) if gram in merged else new_rows
+        return FoodNgramIndex(
+            np.concatenate([self.ids, np.array(ids, dtype=np.int64)]),
+            self.keys + keys,
+            self.keywords + keywords,
+            merged,
+        )
+
+    def shortlist(self, query_key: str, limit: int) -> np.ndarray:
+        """겹치는 n-gram이 많은 행 번호 (Dice 계수 상위 limit개)"""
+        grams = char_ngrams(query_key)
+        lists = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not lists:
+            return np.zeros(0, dtype=np.int32)
+
+        rows, common = np.unique(np.concatenate(lists), return_counts=True)
+        dice = 2 * common / (len(grams) + self.gram_counts[rows])
+        if len(rows) > limit:
+            top = np.argpartition(-dice, limit - 1)[:limit]
+            rows, dice = rows[top], dice[top]
+        return rows[np.argsort(-dice, kind='stable')]
+
+    def search(self, food_name: str, threshold: float = 0.6,
+               shortlist_size: Optional[int] = None) -> Optional[Tuple[int, float]]:
+        """
+        가장 비슷한 음식 1개
+
+        Returns:
+            (food_id, 유사도) 또는 None (threshold 이상인 후보가 없을 때)
+        """
+        query_key = normalize_food_name(food_name)
+        if not query_key:
+            return None
+
+        query_keywords = extract_food_keywords(food_name)
+        best, best_score = None, None
+        for row in self.shortlist(query_key, shortlist_size or settings.FOOD_NGRAM_SHORTLIST):
+            score = string_similarity(query_key, query_keywords, self.keys[row], self.keywords[row])
+            if score[0] >= threshold and (best_score is None or score > best_score):
+                best, best_score = (int(self.ids[row]), score[0]), score
+        return best
+
+    def save(self, path) -> None:
+        """pickle 파일로 저장 (임시 파일에 쓴 뒤 교체하므로 읽는 워커는 항상 완성된 파일을 봄)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({
+                'format': INDEX_FORMAT_VERSION,
+                'ngram_size': NGRAM_SIZE,
+                'ids': self.ids,
+                'keys': self.keys,
+                'keywords': self.keywords,
+                'postings': self.postings,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path) -> 'FoodNgramIndex':
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        if data.get('format') != INDEX_FORMAT_VERSION or data.get('ngram_size') != NGRAM_SIZE:
+            raise ValueError('n-gram 인덱스 형식이 다릅니다. build_food_ngram_index를 다시 실행하세요.')
+        return cls(data['ids'], data['keys'], data['keywords'], data['postings'])
+
+
+_index_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+_loaded_index: Optional[FoodNgramIndex] = None
+_loaded_mtime: Optional[float] = None
+
+
+def get_food_ngram_index() -> FoodNgramIndex:
+    """
+    프로세스 공용 n-gram 인덱스
+
+    FOOD_NGRAM_INDEX_PATH 파일의 수정 시간이 바뀌면 다시 읽고,
+    파일이 없으면 DB에서 메모리에만 구성합니다.
+    FOOD_NGRAM_REFRESH_SECONDS마다 인덱스 이후 추가된 음식을 반영합니다
+    (이미 다른 스레드가 반영 중이면 기다리지 않고 이전 인덱스로 검색).
+    """
+    global _loaded_index, _loaded_mtime
+
+    path = Path(settings.FOOD_NGRAM_INDEX_PATH)
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        mtime = None
+
+    if _loaded_index is None or mtime != _loaded_mtime:
+        with _index_lock:
+            if _loaded_index is None or mtime != _loaded_mtime:
+                started = time.monotonic()
+                try:
+                    index = FoodNgramIndex.load(path) if mtime is not None else FoodNgramIndex.build()
+                except Exception as e:
+                    logger.warning(f"n-gram 인덱스 파일 로드 실패, DB에서 구성: {e}")
+                    index = FoodNgramIndex.build()
+                _loaded_index, _loaded_mtime = index, mtime
+                logger.info(
+                    f"🔤 n-gram 인덱스 {'로드' if mtime is not None else '구성'}: "
+                    f"음식 {len(index):,}개 ({(time.monotonic() - started) * 1000:.0f}ms)"
+                )
+
+    index = _loaded_index
+    if time.monotonic() - index.checked_at >= settings.FOOD_NGRAM_REFRESH_SECONDS and _refresh_lock.acquire(blocking=False):
+        try:
+            index.checked_at = time.monotonic()
+            refreshed = index.with_new_foods()
+            if refreshed is not index:
+                with _index_lock:
+                    # 그 사이 파일이 다시 로드됐으면 덮어쓰지 않음
+                    if _loaded_index is index:
+                        _loaded_index = refreshed
+                logger.info(f"🔤 n-gram 인덱스 새 음식 {len(refreshed) - len(index)}개 반영")
+                index = refreshed
+        except Exception as e:
+            logger.warning(f"n-gram 인덱스 새 음식 반영 실패: {e}")
+        finally:
+            _refresh_lock.release()
+    return index
+
+
+def build_food_ngram_index(path=None) -> FoodNgramIndex:
+    """DB에서 인덱스를 구성해 파일로 저장 (실행 중인 워커는 다음 검색 때 새 파일을 읽음)"""
+    index = FoodNgramIndex.build()
+    index.save(path or settings.FOOD_NGRAM_INDEX_PATH)
+    return index
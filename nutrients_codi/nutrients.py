@@ -0,0 +1,171 @@
+"""
+영양소 목록 (Food 필드 / FoodLog total_* 필드 / 집계 공통)
+- NUTRIENT_FIELDS 하나로 모델 필드, 1g당 영양소, 섭취량 기준 total_* 계산, Sum 집계를 만듦
+- compute_food_log_totals: 여러 FoodLog의 total_*를 (음식 x 영양소) NumPy 행렬 연산 한 번으로 계산
+  (bulk_create / 데이터 가져오기에서도 save()와 같은 값)
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Sequence
+
+import numpy as np
+from django.db import models
+from django.db.models import Sum
+
+
+class Nutrient(NamedTuple):
+    field: str
+    label: str
+    unit: str
+    required: bool = False  # True면 기본값 없음 (Food 생성 시 반드시 입력)
+
+
+NUTRIENT_FIELDS = (
+    # 기본 영양소
+    Nutrient('calories', '칼로리', 'kcal', required=True),
+    Nutrient('protein', '단백질', 'g', required=True),
+    Nutrient('carbs', '탄수화물', 'g', required=True),
+    Nutrient('fat', '지방', 'g', required=True),
+    Nutrient('fiber', '식이섬유', 'g'),
+    Nutrient('sugar', '당분', 'g'),
+
+    # 미네랄
+    Nutrient('sodium', '나트륨', 'mg'),
+    Nutrient('potassium', '칼륨', 'mg'),
+    Nutrient('calcium', '칼슘', 'mg'),
+    Nutrient('iron', '철분', 'mg'),
+    Nutrient('magnesium', '마그네슘', 'mg'),
+    Nutrient('phosphorus', '인', 'mg'),
+    Nutrient('zinc', '아연', 'mg'),
+    Nutrient('copper', '구리', 'mg'),
+    Nutrient('manganese', '망간', 'mg'),
+    Nutrient('selenium', '셀레늄', 'μg'),
+
+    # 비타민
+    Nutrient('vitamin_a', '비타민 A', 'μg'),
+    Nutrient('vitamin_b1', '비타민 B1', 'mg'),
+    Nutrient('vitamin_b2', '비타민 B2', 'mg'),
+    Nutrient('vitamin_b3', '비타민 B3', 'mg'),
+    Nutrient('vitamin_b6', '비타민 B6', 'mg'),
+    Nutrient('vitamin_b12', '비타민 B12', 'μg'),
+    Nutrient('vitamin_c', '비타민 C', 'mg'),
+    Nutrient('vitamin_d', '비타민 D', 'μg'),
+    Nutrient('vitamin_e', '비타민 E', 'mg'),
+    Nutrient('vitamin_k', '비타민 K', 'μg'),
+    Nutrient('folate', '엽산', 'μg'),
+    Nutrient('choline', '콜린', 'mg'),
+
+    # 추가 비타민 및 영양소
+    Nutrient('beta_carotene', '베타카로틴', 'μg'),
+    Nutrient('niacin', '나이아신', 'mg'),
+    Nutrient('vitamin_d2', '비타민 D2', 'μg'),
+    Nutrient('vitamin_d3', '비타민 D3', 'μg'),
+    Nutrient('vitamin_k1', '비타민 K1', 'μg'),
+    Nutrient('vitamin_k2', '비타민 K2', 'μg'),
+
+    # 추가 미네랄
+    Nutrient('iodine', '요오드', 'μg'),
+    Nutrient('fluorine', '불소', 'mg'),
+    Nutrient('chromium', '크롬', 'μg'),
+    Nutrient('molybdenum', '몰리브덴', 'μg'),
+    Nutrient('chlorine', '염소', 'mg'),
+
+    # 기타 영양소
+    Nutrient('cholesterol', '콜레스테롤', 'mg'),
+    Nutrient('saturated_fat', '포화지방', 'g'),
+    Nutrient('monounsaturated_fat', '단일불포화지방', 'g'),
+    Nutrient('polyunsaturated_fat', '다중불포화지방', 'g'),
+    Nutrient('omega3', '오메가3', 'g'),
+    Nutrient('omega6', '오메가6', 'g'),
+    Nutrient('trans_fat', '트랜스지방', 'g'),
+    Nutrient('caffeine', '카페인', 'mg'),
+    Nutrient('alcohol', '알코올', 'g'),
+    Nutrient('water', '수분', 'g'),
+    Nutrient('ash', '회분', 'g'),
+)
+
+NUTRIENT_NAMES = tuple(nutrient.field for nutrient in NUTRIENT_FIELDS)
+TOTAL_FIELD_NAMES = tuple(f'total_{name}' for name in NUTRIENT_NAMES)
+
+# 대시보드 요약 / 상세 페이지에서 집계하는 영양소
+BASIC_SUMMARY_NUTRIENTS = ('calories', 'protein', 'carbs', 'fat', 'fiber', 'sugar', 'sodium')
+DETAIL_SUMMARY_NUTRIENTS = (
+    'calories', 'protein', 'carbs', 'fat', 'fiber', 'sugar',
+    'sodium', 'potassium', 'calcium', 'iron', 'magnesium', 'phosphorus', 'zinc',
+    'vitamin_a', 'vitamin_b1', 'vitamin_b2', 'vitamin_b3', 'vitamin_b6', 'vitamin_b12',
+    'vitamin_c', 'vitamin_d', 'vitamin_e', 'vitamin_k', 'folate',
+    'cholesterol', 'saturated_fat', 'omega3', 'omega6',
+)
+
+# Food 영양소는 100g 기준
+FOOD_BASIS_GRAMS = 100.0
+
+
+def nutrient_model_fields(prefix: str = '', label_prefix: str = '') -> Dict[str, models.FloatField]:
+    """
+    모델 필드 정의 (Food: 100g 기준 값, FoodLog: prefix='total_', label_prefix='총 ')
+
+    필드 정의를 바꾸면 makemigrations로 마이그레이션을 만들어야 합니다.
+    """
+    fields = {}
+    for nutrient in NUTRIENT_FIELDS:
+        options = {'help_text': f'{label_prefix}{nutrient.label} ({nutrient.unit})'}
+        if not nutrient.required:
+            options['default'] = 0
+        fields[f'{prefix}{nutrient.field}'] = models.FloatField(**options)
+    return fields
+
+
+def nutrient_sum_aggregates(names: Sequence[str] = NUTRIENT_NAMES) -> Dict[str, Sum]:
+    """FoodLog.aggregate(**...)용 {'total_<영양소>': Sum('total_<영양소>')}"""
+    return {f'total_{name}': Sum(f'total_{name}') for name in names}
+
+
+def food_nutrient_matrix(foods: Sequence) -> np.ndarray:
+    """(음식 수, 영양소 수) 1g당 영양소 행렬"""
+    values = [[getattr(food, name) or 0.0 for name in NUTRIENT_NAMES] for food in foods]
+    return np.array(values, dtype=np.float64).reshape(len(foods), len(NUTRIENT_NAMES)) / FOOD_BASIS_GRAMS
+
+
+def round_like_python(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """
+    np.round와 같지만 x.x5 경계 값은 파이썬 round로 다시 계산 (save()로 저장한 값과 동일하게)
+
+    np.round는 values * 10**ndigits를 반올림하므로 경계 근처에서 round와 결과가 다를 수 있습니다.
+    """
+    rounded = np.round(values, ndigits)
+    scaled = np.abs(values * 10 ** ndigits)
+    for index in zip(*np.nonzero(np.abs(scaled % 1 - 0.5) < 1e-6)):
+        rounded[index] = round(float(values[index]), ndigits)
+    return rounded
+
+
+def compute_food_log_totals(food_logs: Iterable) -> List:
+    """
+    여러 FoodLog의 total_* 필드를 채움 (DB 저장 없음)
+
+    같은 음식은 한 행으로 모아 (음식 x 영양소) 행렬을 만들고, 섭취량을 곱한 뒤
+    소수 첫째 자리로 반올림합니다. food가 없는 기록은 건너뜁니다.
+
+    Returns:
+        total_*를 채운 FoodLog 리스트 (입력 순서)
+    """
+    food_logs = [food_log for food_log in food_logs if food_log.food_id is not None]
+    if not food_logs:
+        return []
+
+    rows: Dict[int, int] = {}
+    foods = []
+    for food_log in food_logs:
+        if food_log.food_id not in rows:
+            rows[food_log.food_id] = len(foods)
+            foods.append(food_log.food)
+
+    per_gram = food_nutrient_matrix(foods)
+    food_rows = np.array([rows[food_log.food_id] for food_log in food_logs])
+    quantities = np.array([food_log.quantity or 0.0 for food_log in food_logs], dtype=np.float64)
+    totals = round_like_python(per_gram[food_rows] * quantities[:, None], 1)
+
+    for food_log, values in zip(food_logs, totals.tolist()):
+        for name, value in zip(TOTAL_FIELD_NAMES, values):
+            setattr(food_log, name, value)
+    return food_logs
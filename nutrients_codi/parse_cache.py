@@ -0,0 +1,115 @@
+"""
+음식 입력 파싱 결과 캐시
+- 같은 문장("아메리카노 한잔", "김치찌개랑 밥")은 Gemini 호출 없이 바로 재사용
+- 정규화된 입력 + 언어 기준, TTL 및 적중률 통계 포함
+"""
+
+import hashlib
+import logging
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import FoodParseCache
+from .text_normalization import normalize_food_text
+
+logger = logging.getLogger(__name__)
+
+
+def make_parse_cache_key(text: str, language: str) -> str:
+    """정규화된 입력과 언어로 캐시 키(SHA-256) 생성"""
+    raw = f'{language}:{normalize_food_text(text)}'
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def get_cached_food_analysis(text: str, language: str = 'ko') -> Optional[List[Dict[str, Any]]]:
+    """
+    캐시된 파싱 결과 조회 (만료된 항목은 무시)
+
+    Returns:
+        List[Dict] 또는 None (캐시 미스)
+    """
+    cache_key = make_parse_cache_key(text, language)
+    now = timezone.now()
+
+    entry = FoodParseCache.objects.filter(
+        cache_key=cache_key,
+        expires_at__gt=now
+    ).only('id', 'parsed_foods').first()
+
+    if entry is None:
+        return None
+
+    FoodParseCache.objects.filter(id=entry.id).update(
+        hit_count=F('hit_count') + 1,
+        last_hit_at=now
+    )
+    logger.debug(f"[CACHE HIT] 파싱 캐시 사용: {text[:30]}...")
+    return entry.parsed_foods
+
+
+def store_food_analysis(text: str, language: str, parsed_foods: List[Dict[str, Any]]) -> None:
+    """파싱 결과 저장 (빈 결과는 저장하지 않음)"""
+    if not parsed_foods:
+        return
+
+    cache_key = make_parse_cache_key(text, language)
+    expires_at = timezone.now() + timedelta(seconds=settings.FOOD_PARSE_CACHE_TTL)
+
+    try:
+        updated = FoodParseCache.objects.filter(cache_key=cache_key).update(
+            parsed_foods=parsed_foods,
+            miss_count=F('miss_count') + 1,
+            expires_at=expires_at,
+            updated_at=timezone.now()
+        )
+        if not updated:
+            FoodParseCache.objects.create(
+                cache_key=cache_key,
+                normalized_text=normalize_food_text(text),
+                language=language,
+                parsed_foods=parsed_foods,
+                expires_at=expires_at
+            )
+    except Exception as e:
+        # 동시에 같은 입력이 저장되는 경우 등 - 캐시 저장 실패는 무시
+        logger.warning(f"파싱 캐시 저장 실패: {e}")
+
+
+def parse_cache_stats() -> Dict[str, Any]:
+    """
+    캐시 적중률 통계
+
+    Returns:
+        dict: entries, hits, misses, hit_rate
+    """
+    totals = FoodParseCache.objects.aggregate(hits=Sum('hit_count'), misses=Sum('miss_count'))
+    hits = totals['hits'] or 0
+    misses = totals['misses'] or 0
+    lookups = hits + misses
+    return {
+        'entries': FoodParseCache.objects.count(),
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / lookups if lookups else 0.0,
+    }
+
+
+def purge_parse_cache(expired_only: bool = True) -> int:
+    """
+    캐시 삭제
+
+    Args:
+        expired_only: True면 만료된 항목만 삭제
+
+    Returns:
+        int: 삭제된 항목 수
+    """
+    queryset = FoodParseCache.objects.all()
+    if expired_only:
+        queryset = queryset.filter(expires_at__lte=timezone.now())
+    deleted, _ = queryset.delete()
+    return deleted
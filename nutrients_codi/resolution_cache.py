@@ -0,0 +1,102 @@
+"""
+임베딩 검색 결과 캐시 (정규화된 음식명 → food_id, 유사도)
+- 매칭 성공은 FOOD_RESOLUTION_CACHE_TTL, 매칭 실패는 더 짧은 FOOD_RESOLUTION_NEGATIVE_TTL 동안 보관
+- 값에 음식 카탈로그 버전을 함께 저장하고, 조회할 때 버전 키와 함께 get_many 1회로 읽어
+  현재 버전과 다른 항목은 버림 (Food 추가/삭제, 이름·임베딩 변경 커밋 후 signals.py에서 버전을 올림,
+  영양성분만 고치는 저장은 검색 결과를 바꾸지 않으므로 유지)
+- 전용 캐시(CACHES['food_resolution'])를 사용해 YouTube/영양소 캐시를 밀어내지 않음
+"""
+
+import hashlib
+import logging
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .text_normalization import normalize_food_name
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = 'food_resolution'
+CATALOG_VERSION_KEY = 'food_catalog_version'
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _new_version() -> int:
+    # 버전 키가 정리(cull)되어도 예전 항목이 되살아나지 않도록 시각 기반으로 시작
+    return int(time.time() * 1000)
+
+
+def make_resolution_key(name: str, threshold: float) -> str:
+    raw = f'{settings.FOOD_SEARCH_BACKEND}:{threshold:.4f}:{normalize_food_name(name)}'
+    return 'food_resolution:' + hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def bump_catalog_version() -> None:
+    """음식 카탈로그가 바뀌었을 때 호출 - 이전에 저장된 모든 검색 결과가 무효화됨"""
+    cache = _cache()
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, _new_version(), timeout=None)
+
+
+def get_cached_resolutions(
+    names: Sequence[str], threshold: float
+) -> Tuple[int, Dict[str, Optional[Tuple[int, float]]]]:
+    """
+    여러 음식명의 캐시된 검색 결과 조회 (버전 키 포함 get_many 1회)
+
+    Returns:
+        (카탈로그 버전, {음식명: (food_id, 유사도) 또는 None(매칭 실패 캐시)})
+        캐시에 없거나 버전이 다른 음식명은 dict에 포함되지 않음
+    """
+    cache = _cache()
+    keys = {name: make_resolution_key(name, threshold) for name in names}
+    found = cache.get_many([CATALOG_VERSION_KEY, *keys.values()])
+
+    version = found.get(CATALOG_VERSION_KEY)
+    if version is None:
+        version = _new_version()
+        if not cache.add(CATALOG_VERSION_KEY, version, timeout=None):
+            version = cache.get(CATALOG_VERSION_KEY, version)
+        return version, {}
+
+    results = {}
+    for name, key in keys.items():
+        entry = found.get(key)
+        if entry and entry[0] == version:
+            results[name] = (entry[1], entry[2]) if entry[1] is not None else None
+
+    if results:
+        logger.debug(f"[CACHE HIT] 음식 검색 결과 캐시 사용: {len(results)}/{len(names)}개")
+    return version, results
+
+
+def store_resolutions(
+    version: int, resolutions: Dict[str, Optional[Tuple[int, float]]], threshold: float
+) -> None:
+    """
+    검색 결과 저장 (조회 시점의 버전으로 저장하므로 그 사이 카탈로그가 바뀌었으면 바로 무효)
+
+    Args:
+        resolutions: {음식명: (food_id, 유사도) 또는 None(매칭 실패)}
+    """
+    positive, negative = {}, {}
+    for name, hit in resolutions.items():
+        key = make_resolution_key(name, threshold)
+        if hit is None:
+            negative[key] = (version, None, 0.0)
+        else:
+            positive[key] = (version, hit[0], hit[1])
+
+    cache = _cache()
+    if positive:
+        cache.set_many(positive, timeout=settings.FOOD_RESOLUTION_CACHE_TTL)
+    if negative:
+        cache.set_many(negative, timeout=settings.FOOD_RESOLUTION_NEGATIVE_TTL)
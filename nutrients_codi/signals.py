@@ -0,0 +1,136 @@
+"""
+모델 변경 감지
+- Food 추가 / 삭제 / 이름·임베딩 변경이 커밋되면 카탈로그 버전을 올려 캐시된 임베딩 검색 결과(resolution_cache)를 무효화
+  (영양성분만 고치는 저장은 검색 결과를 바꾸지 않으므로 캐시 유지)
+- FoodLog 저장/삭제 시 일별 영양소 합계(DailyNutritionSummary)에 변화량 반영하고,
+  커밋 후 바뀐 날짜(수정 전/후)의 영양소 캐시와 추이 구간 캐시를 무효화
+  (관리자 화면, Food 삭제로 인한 연쇄 삭제 등 뷰를 거치지 않는 변경 포함)
+- bulk_create/bulk_update는 시그널을 보내지 않으므로 대량 작업은 bump_catalog_version /
+  apply_food_log_deltas를 직접 호출
+"""
+
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .daily_summary import apply_food_log_deltas
+from .models import Food, FoodLog
+from .nutrients import TOTAL_FIELD_NAMES
+from .resolution_cache import bump_catalog_version
+from .utils_optimized import invalidate_nutrition_cache_dates
+
+logger = logging.getLogger(__name__)
+
+
+# 검색 결과(이름 → food_id)를 바꿀 수 있는 Food 필드
+CATALOG_SEARCH_FIELDS = frozenset({'name', 'embedding'})
+
+
+@receiver(pre_save, sender=Food)
+def remember_food_search_fields(sender, instance, raw=False, update_fields=None, **kwargs):
+    """수정 시 이름/임베딩이 실제로 바뀌는지 확인 (영양성분만 고치는 저장은 캐시를 유지)"""
+    instance._catalog_changed = True
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None:
+        instance._catalog_changed = not CATALOG_SEARCH_FIELDS.isdisjoint(update_fields)
+        return
+    previous = Food.objects.filter(pk=instance.pk).values('name', 'embedding').first()
+    if previous is not None:
+        embedding = instance.embedding
+        same_embedding = (
+            (previous['embedding'] is None) == (embedding is None)
+            and (embedding is None or list(previous['embedding']) == list(embedding))
+        )
+        instance._catalog_changed = previous['name'] != instance.name or not same_embedding
+
+
+def _bump_catalog_version_on_commit() -> None:
+    """
+    트랜잭션 커밋 후 카탈로그 버전을 올림 (롤백되면 그대로 둠)
+
+    저장 직후에 올리면 다른 요청이 새 버전을 읽고도 아직 커밋되지 않은 음식을 보지 못해
+    '매칭 실패'를 새 버전으로 캐시할 수 있음
+    """
+    def bump():
+        try:
+            bump_catalog_version()
+        except Exception as e:
+            # 캐시 장애로 음식 저장이 실패하지 않도록 (검색 결과는 TTL이 지나면 만료)
+            logger.warning(f"음식 카탈로그 버전 갱신 실패: {e}")
+
+    transaction.on_commit(bump)
+
+
+@receiver(post_save, sender=Food)
+def invalidate_food_resolutions_on_save(sender, instance, created, **kwargs):
+    """
+    음식 추가, 이름/임베딩 변경 → 모든 검색 결과 무효화 (영양성분만 고치면 유지)
+
+    새 음식이 기존 매칭보다 가까운 최근접 음식이 될 수 있으므로 추가 시에도 무효화합니다.
+    """
+    if created or getattr(instance, '_catalog_changed', True):
+        _bump_catalog_version_on_commit()
+
+
+@receiver(post_delete, sender=Food)
+def invalidate_food_resolutions(sender, instance, **kwargs):
+    _bump_catalog_version_on_commit()
+
+
+# 이 필드가 바뀌지 않는 저장(update_fields 지정)은 일별 합계에 영향 없음
+DAILY_SUMMARY_FIELDS = frozenset({'user', 'user_id', 'consumed_date', 'food', 'food_id', 'quantity', *TOTAL_FIELD_NAMES})
+
+
+def _affects_daily_summary(update_fields) -> bool:
+    return update_fields is None or not DAILY_SUMMARY_FIELDS.isdisjoint(update_fields)
+
+
+def _invalidate_nutrition_cache_on_commit(food_logs) -> None:
+    """FoodLog가 바뀐 (사용자, 날짜)의 캐시를 트랜잭션 커밋 후 무효화 (롤백되면 그대로 둠)"""
+    dates_by_user = defaultdict(set)
+    for food_log in food_logs:
+        dates_by_user[food_log.user_id].add(food_log.consumed_date)
+
+    def invalidate():
+        for user_id, dates in dates_by_user.items():
+            try:
+                invalidate_nutrition_cache_dates(user_id, dates)
+            except Exception as e:
+                # 캐시 장애로 기록 저장이 실패하지 않도록
+                logger.warning(f"영양소 캐시 무효화 실패: {e}")
+
+    transaction.on_commit(invalidate)
+
+
+@receiver(pre_save, sender=FoodLog)
+def remember_food_log_totals(sender, instance, raw=False, update_fields=None, **kwargs):
+    """수정 전 날짜/합계를 읽어 둠 (post_save에서 빼기 위해)"""
+    instance._previous_daily_totals = None
+    if raw or instance._state.adding or instance.pk is None or not _affects_daily_summary(update_fields):
+        return
+    instance._previous_daily_totals = (
+        FoodLog.objects.filter(pk=instance.pk)
+        .only('user_id', 'consumed_date', *TOTAL_FIELD_NAMES)
+        .first()
+    )
+
+
+@receiver(post_save, sender=FoodLog)
+def add_food_log_to_daily_summary(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or not _affects_daily_summary(update_fields):
+        return
+    previous = getattr(instance, '_previous_daily_totals', None)
+    removed = [previous] if previous else []
+    apply_food_log_deltas(added=[instance], removed=removed)
+    _invalidate_nutrition_cache_on_commit([instance, *removed])
+    instance._previous_daily_totals = None
+
+
+@receiver(post_delete, sender=FoodLog)
+def remove_food_log_from_daily_summary(sender, instance, **kwargs):
+    apply_food_log_deltas(removed=[instance])
+    _invalidate_nutrition_cache_on_commit([instance])
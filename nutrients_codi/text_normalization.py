@@ -0,0 +1,30 @@
+"""
+음식명/입력 텍스트 정규화 함수
+- 캐시 키, 별칭(FoodAlias) 조회 등에서 같은 기준으로 사용
+"""
+
+import re
+import unicodedata
+
+
+def normalize_food_text(text: str) -> str:
+    """
+    자연어 입력 정규화 (파싱 캐시 키용)
+
+    - 유니코드 NFC 정규화 (자모 분리 입력 통일)
+    - 소문자 변환, 연속 공백 축소
+    - 끝의 문장부호 제거 ("먹었어요." == "먹었어요")
+    """
+    text = unicodedata.normalize('NFC', text or '')
+    text = re.sub(r'\s+', ' ', text.strip().lower())
+    return re.sub(r'[\s.!?~,]+$', '', text)
+
+
+def normalize_food_name(name: str) -> str:
+    """
+    음식명 정규화 (별칭 조회용)
+
+    공백을 모두 제거하므로 "계란 말이"와 "계란말이"가 같은 키가 됩니다.
+    """
+    name = unicodedata.normalize('NFC', name or '')
+    return re.sub(r'\s+', '', name).lower()
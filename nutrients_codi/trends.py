@@ -0,0 +1,147 @@
+"""
+장기 영양소 추이 (30/90/365일 차트용)
+- 일별 합계(DailyNutritionSummary)를 SQL date_trunc(Trunc)로 일/주/월 단위로 묶어 Sum 1회로 집계
+- 응답은 열 단위: 날짜 배열 1개 + 영양소마다 값 배열 1개
+- 지난 구간(오늘이 포함되지 않은 일/주/월)은 값이 바뀌지 않으므로 만료 없이 캐시
+  (FoodLog save()/delete() 시 signals.py가 수정 전/후 날짜의 구간 키를 지우고,
+   bulk_create는 invalidate_nutrition_cache 직접 호출, 대량 재계산은 사용자 캐시 버전을 올려 한 번에 무효화)
+- 오늘이 포함된 구간은 항상 DB에서 계산
+"""
+
+import logging
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence
+
+from django.core.cache import cache
+from django.db.models import Count, DateField, F, Sum
+from django.db.models.functions import Trunc
+
+from .models import DailyNutritionSummary
+from .nutrients import NUTRIENT_NAMES, TOTAL_FIELD_NAMES
+from .utils_optimized import get_nutrition_cache_version
+
+logger = logging.getLogger(__name__)
+
+TREND_BUCKETS = ('day', 'week', 'month')
+TREND_MAX_DAYS = 366
+
+
+def bucket_start(target_date: date, bucket: str) -> date:
+    """target_date가 속한 구간의 첫날 (주는 월요일 시작 - date_trunc('week')와 같음)"""
+    if bucket == 'week':
+        return target_date - timedelta(days=target_date.weekday())
+    if bucket == 'month':
+        return target_date.replace(day=1)
+    return target_date
+
+
+def next_bucket_start(start: date, bucket: str) -> date:
+    if bucket == 'week':
+        return start + timedelta(days=7)
+    if bucket == 'month':
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def trend_cache_key(user_id: int, bucket: str, start: date) -> str:
+    return f'nutrition_trend_{user_id}_{bucket}_{start}'
+
+
+def trend_cache_keys_for_date(user_id: int, target_date: date) -> List[str]:
+    """target_date가 속한 일/주/월 구간의 캐시 키 (기록 변경 시 삭제용)"""
+    return [trend_cache_key(user_id, bucket, bucket_start(target_date, bucket)) for bucket in TREND_BUCKETS]
+
+
+def _aggregate_buckets(user, bucket: str, start: date, end: date) -> Dict[date, Dict]:
+    """start~end(포함) 일별 합계를 구간별로 묶어 {구간 첫날: {'food_count', 'days', 'total_*'}}"""
+    summaries = DailyNutritionSummary.objects.filter(user=user, date__gte=start, date__lte=end)
+    period = F('date') if bucket == 'day' else Trunc('date', bucket, output_field=DateField())
+    rows = summaries.annotate(period=period).values('period').annotate(
+        food_count=Sum('food_count'),
+        days=Count('id'),
+        **{name: Sum(name) for name in TOTAL_FIELD_NAMES}
+    ).order_by('period')
+
+    buckets = {}
+    for row in rows:
+        period_start = row.pop('period')
+        buckets[period_start] = {key: value or 0 for key, value in row.items()}
+    return buckets
+
+
+def _empty_bucket() -> Dict:
+    return {'food_count': 0, 'days': 0, **dict.fromkeys(TOTAL_FIELD_NAMES, 0)}
+
+
+def get_nutrition_trend(user, start_date: date, end_date: date, bucket: str = 'day',
+                        nutrients: Optional[Sequence[str]] = None, use_cache: bool = True) -> Dict:
+    """
+    기간별 영양소 추이
+
+    start_date/end_date는 구간 경계로 넓히고 (주: 월요일, 월: 1일), 오늘 이후는 잘라냅니다.
+    캐시에는 구간마다 전체 영양소를 저장하므로 요청한 영양소 조합과 관계없이 재사용됩니다.
+
+    Args:
+        bucket: 'day', 'week', 'month'
+        nutrients: 영양소 이름 (None이면 전체)
+
+    Returns:
+        dict: {'bucket', 'start', 'end', 'dates': [...], 'food_count': [...], 'days': [...],
+               'nutrients': {영양소: [...]}} - 배열은 모두 같은 길이 (구간 순서)
+    """
+    if bucket not in TREND_BUCKETS:
+        raise ValueError(f'지원하지 않는 구간입니다: {bucket}')
+    nutrients = list(nutrients) if nutrients else list(NUTRIENT_NAMES)
+    unknown = [name for name in nutrients if name not in NUTRIENT_NAMES]
+    if unknown:
+        raise ValueError(f'알 수 없는 영양소: {", ".join(unknown)}')
+
+    today = date.today()
+    end_date = min(end_date, today)
+    if start_date > end_date:
+        raise ValueError('시작 날짜가 종료 날짜보다 늦습니다.')
+
+    # 구간 첫날 목록
+    starts = []
+    current = bucket_start(start_date, bucket)
+    while current <= end_date:
+        starts.append(current)
+        current = next_bucket_start(current, bucket)
+    range_end = min(next_bucket_start(starts[-1], bucket) - timedelta(days=1), today)
+    current_bucket = bucket_start(today, bucket)
+
+    # 지난 구간은 캐시에서 (get_many 1회)
+    buckets: Dict[date, Dict] = {}
+    version = get_nutrition_cache_version(user.id) if use_cache else None
+    past_keys = {trend_cache_key(user.id, bucket, start): start for start in starts if start < current_bucket}
+    if use_cache and past_keys:
+        for key, value in cache.get_many(list(past_keys), version=version).items():
+            buckets[past_keys[key]] = value
+
+    # 나머지는 DB에서 한 번에 (캐시에 없는 첫 구간 ~ 마지막 구간)
+    missing = [start for start in starts if start not in buckets]
+    if missing:
+        query_end = min(next_bucket_start(missing[-1], bucket) - timedelta(days=1), range_end)
+        aggregated = _aggregate_buckets(user, bucket, missing[0], query_end)
+        fresh = {}
+        for start in missing:
+            buckets[start] = aggregated.get(start) or _empty_bucket()
+            if start < current_bucket:
+                fresh[trend_cache_key(user.id, bucket, start)] = buckets[start]
+        if use_cache and fresh:
+            cache.set_many(fresh, timeout=None, version=version)
+        logger.debug(f"[CACHE MISS] 영양소 추이 구간 {len(missing)}/{len(starts)}개 DB 집계")
+
+    series = [buckets[start] for start in starts]
+    return {
+        'bucket': bucket,
+        'start': starts[0].isoformat(),
+        'end': range_end.isoformat(),
+        'dates': [start.isoformat() for start in starts],
+        'food_count': [row['food_count'] for row in series],
+        'days': [row['days'] for row in series],
+        'nutrients': {
+            name: [round(row[f'total_{name}'], 1) for row in series]
+            for name in nutrients
+        },
+    }
@@ -9,8 +9,15 @@ urlpatterns = [
     path('', views.dashboard, name='dashboard'),
     path('profile/', views.profile_setup, name='profile_setup'),
     path('analyze/', views.analyze_food, name='analyze_food'),
+    path('analyze/stream/', views.analyze_food_stream, name='analyze_food_stream'),
+    path('analyze/jobs/', views.enqueue_food_analysis, name='enqueue_food_analysis'),
+    path('analyze/jobs/<int:job_id>/', views.analysis_job_status, name='analysis_job_status'),
+    path('foods/similar/', views.similar_foods, name='similar_foods'),
+    path('foods/autocomplete/', views.food_autocomplete, name='food_autocomplete'),
+    path('foods/log/', views.log_food, name='log_food'),
     path('delete-log/<int:log_id>/', views.delete_food_log, name='delete_food_log'),
     path('daily/<int:year>/<int:month>/<int:day>/', views.daily_detail, name='daily_detail'),
+    path('trends/', views.nutrition_trend, name='nutrition_trend'),
     path('edit-log/<int:log_id>/', views.edit_food_log, name='edit_food_log'),
     
     # 커뮤니티 기능
@@ -1,68 +1,72 @@
 """
 최적화된 유틸리티 함수들
 - 선택적 영양소 집계
-- 캐싱 활용
+- 캐싱 활용 (사용자별 캐시 버전: 대량 재계산 후 버전만 올려 한 번에 무효화)
 - 성능 최적화
 """
 
-from django.db.models import Sum
+import logging
+import time
 from django.core.cache import cache
+from django.db import connection
 from datetime import date, timedelta
-from .models import FoodLog
+from .daily_summary import rebuild_daily_summaries
+from .models import DailyNutritionSummary, Food, FoodLog
+from .nutrients import (
+    BASIC_SUMMARY_NUTRIENTS, DETAIL_SUMMARY_NUTRIENTS, FOOD_BASIS_GRAMS, NUTRIENT_NAMES, nutrient_sum_aggregates
+)
+
+logger = logging.getLogger(__name__)
 
 
 def get_basic_nutrition_aggregate():
     """기본 영양소만 집계 (가장 자주 사용)"""
-    return {
-        'total_calories': Sum('total_calories'),
-        'total_protein': Sum('total_protein'),
-        'total_carbs': Sum('total_carbs'),
-        'total_fat': Sum('total_fat'),
-        'total_fiber': Sum('total_fiber'),
-        'total_sugar': Sum('total_sugar'),
-        'total_sodium': Sum('total_sodium'),
-    }
+    return nutrient_sum_aggregates(BASIC_SUMMARY_NUTRIENTS)
 
 
 def get_full_nutrition_aggregate():
     """전체 영양소 집계 (상세 페이지용)"""
-    return {
-        # 기본 영양소
-        'total_calories': Sum('total_calories'),
-        'total_protein': Sum('total_protein'),
-        'total_carbs': Sum('total_carbs'),
-        'total_fat': Sum('total_fat'),
-        'total_fiber': Sum('total_fiber'),
-        'total_sugar': Sum('total_sugar'),
-        
-        # 주요 미네랄
-        'total_sodium': Sum('total_sodium'),
-        'total_potassium': Sum('total_potassium'),
-        'total_calcium': Sum('total_calcium'),
-        'total_iron': Sum('total_iron'),
-        'total_magnesium': Sum('total_magnesium'),
-        'total_phosphorus': Sum('total_phosphorus'),
-        'total_zinc': Sum('total_zinc'),
-        
-        # 주요 비타민
-        'total_vitamin_a': Sum('total_vitamin_a'),
-        'total_vitamin_b1': Sum('total_vitamin_b1'),
-        'total_vitamin_b2': Sum('total_vitamin_b2'),
-        'total_vitamin_b3': Sum('total_vitamin_b3'),
-        'total_vitamin_b6': Sum('total_vitamin_b6'),
-        'total_vitamin_b12': Sum('total_vitamin_b12'),
-        'total_vitamin_c': Sum('total_vitamin_c'),
-        'total_vitamin_d': Sum('total_vitamin_d'),
-        'total_vitamin_e': Sum('total_vitamin_e'),
-        'total_vitamin_k': Sum('total_vitamin_k'),
-        'total_folate': Sum('total_folate'),
-        
-        # 기타 영양소
-        'total_cholesterol': Sum('total_cholesterol'),
-        'total_saturated_fat': Sum('total_saturated_fat'),
-        'total_omega3': Sum('total_omega3'),
-        'total_omega6': Sum('total_omega6'),
-    }
+    return nutrient_sum_aggregates(DETAIL_SUMMARY_NUTRIENTS)
+
+
+def _nutrition_version_key(user_id):
+    return f'nutrition_version_{user_id}'
+
+
+def get_nutrition_cache_version(user_id):
+    """
+    사용자별 영양소 캐시 버전 (캐시 키 version으로 사용)
+
+    버전 키가 정리(cull)되어도 예전 항목이 되살아나지 않도록 시각 기반으로 시작합니다.
+    """
+    key = _nutrition_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = int(time.time() * 1000)
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_nutrition_cache_versions(user_ids):
+    """여러 사용자의 영양소 캐시를 한 번에 무효화 (날짜별 키를 지우지 않고 버전만 올림)"""
+    user_ids = list(set(user_ids))
+    if not user_ids:
+        return
+    keys = {_nutrition_version_key(user_id): user_id for user_id in user_ids}
+    current = cache.get_many(list(keys))
+    base = int(time.time() * 1000)
+    cache.set_many(
+        {key: max(current.get(key, 0) + 1, base) for key in keys},
+        timeout=None
+    )
+
+
+def _daily_summary_values(user, target_date, names):
+    """DailyNutritionSummary 1행의 {'total_<영양소>': 값} (기록이 없는 날은 모두 None)"""
+    fields = [f'total_{name}' for name in names]
+    row = DailyNutritionSummary.objects.filter(user=user, date=target_date).values(*fields).first()
+    return row or dict.fromkeys(fields)
 
 
 def get_today_nutrition_cached(user, use_cache=True):
@@ -78,24 +82,22 @@ def get_today_nutrition_cached(user, use_cache=True):
     """
     today = date.today()
     cache_key = f'nutrition_today_{user.id}_{today}'
+    version = get_nutrition_cache_version(user.id) if use_cache else None
     
     if use_cache:
-        cached_data = cache.get(cache_key)
+        cached_data = cache.get(cache_key, version=version)
         if cached_data:
             return cached_data
     
-    # 기본 영양소만 조회 (빠름)
-    today_aggregates = FoodLog.objects.filter(
-        user=user,
-        consumed_date=today
-    ).aggregate(**get_basic_nutrition_aggregate())
+    # 기본 영양소만 조회 (일별 합계 1행)
+    today_aggregates = _daily_summary_values(user, today, BASIC_SUMMARY_NUTRIENTS)
     
     # None 값을 0으로 변환
     result = {k: v or 0 for k, v in today_aggregates.items()}
     
     # 1시간 캐시
     if use_cache:
-        cache.set(cache_key, result, 3600)
+        cache.set(cache_key, result, 3600, version=version)
     
     return result
 
@@ -113,17 +115,15 @@ def get_date_nutrition_cached(user, target_date, use_cache=True):
         dict: 영양소 합계 데이터
     """
     cache_key = f'nutrition_date_{user.id}_{target_date}'
+    version = get_nutrition_cache_version(user.id) if use_cache else None
     
     if use_cache:
-        cached_data = cache.get(cache_key)
+        cached_data = cache.get(cache_key, version=version)
         if cached_data:
             return cached_data
     
-    # 기본 영양소만 조회
-    date_aggregates = FoodLog.objects.filter(
-        user=user,
-        consumed_date=target_date
-    ).aggregate(**get_basic_nutrition_aggregate())
+    # 기본 영양소만 조회 (일별 합계 1행)
+    date_aggregates = _daily_summary_values(user, target_date, BASIC_SUMMARY_NUTRIENTS)
     
     # None 값을 0으로 변환
     result = {k: v or 0 for k, v in date_aggregates.items()}
@@ -131,7 +131,7 @@ def get_date_nutrition_cached(user, target_date, use_cache=True):
     # 과거 날짜는 24시간 캐시, 오늘은 1시간
     cache_time = 86400 if target_date < date.today() else 3600
     if use_cache:
-        cache.set(cache_key, result, cache_time)
+        cache.set(cache_key, result, cache_time, version=version)
     
     return result
 
@@ -145,20 +145,18 @@ def get_daily_summaries_optimized(user, days=7):
     today = date.today()
     start_date = today - timedelta(days=days-1)
     
-    # 기본 영양소만 집계 (빠름!)
-    daily_data = FoodLog.objects.filter(
+    # 기본 영양소만, 미리 합산된 일별 합계에서 조회 (빠름!)
+    daily_data = DailyNutritionSummary.objects.filter(
         user=user,
-        consumed_date__gte=start_date,
-        consumed_date__lte=today
-    ).values('consumed_date').annotate(
-        **get_basic_nutrition_aggregate()
-    ).order_by('-consumed_date')
+        date__gte=start_date,
+        date__lte=today
+    ).values('date', *get_basic_nutrition_aggregate()).order_by('-date')
     
     # 결과 변환
     daily_summaries = []
     for day_data in daily_data:
         summary = {
-            'date': day_data['consumed_date'],
+            'date': day_data['date'],
             'nutrients': {
                 'calories': day_data['total_calories'] or 0,
                 'protein': day_data['total_protein'] or 0,
@@ -185,11 +183,111 @@ def invalidate_nutrition_cache(user, target_date=None):
     if target_date is None:
         target_date = date.today()
     
-    cache_keys = [
-        f'nutrition_today_{user.id}_{target_date}',
-        f'nutrition_date_{user.id}_{target_date}',
-    ]
+    invalidate_nutrition_cache_dates(user.id, [target_date])
+
+
+def invalidate_nutrition_cache_dates(user_id, dates):
+    """
+    여러 날짜의 영양소 캐시를 한 번에 무효화 (delete_many 1회)
     
-    for key in cache_keys:
-        cache.delete(key)
+    FoodLog save()/delete()는 signals.py에서 커밋 후 자동으로 호출하고,
+    bulk_create처럼 시그널이 없는 경로는 invalidate_nutrition_cache를 직접 호출합니다.
+    """
+    from .trends import trend_cache_keys_for_date
+
+    cache_keys = []
+    for target_date in set(dates):
+        cache_keys += [
+            f'nutrition_today_{user_id}_{target_date}',
+            f'nutrition_date_{user_id}_{target_date}',
+            # 만료 없이 캐시되는 지난 추이 구간 (일/주/월)
+            *trend_cache_keys_for_date(user_id, target_date),
+        ]
+    if cache_keys:
+        cache.delete_many(cache_keys, version=get_nutrition_cache_version(user_id))
+
+
+def recompute_food_log_totals(food_ids=None, start_date=None, end_date=None, batch_size=5000, progress=None):
+    """
+    Food 영양성분 수정 후 FoodLog total_* 일괄 재계산 (배치마다 UPDATE ... FROM 1회)
+
+    FoodLog id 구간을 batch_size개씩 나눠 total_<영양소> = ROUND(음식.<영양소> * quantity / 100, 1)로
+    갱신합니다. 행을 파이썬으로 읽지 않으므로 전체 테이블도 수 초~수십 초면 끝납니다.
+    (DB ROUND는 .x5를 0에서 먼 쪽으로 올리므로 save()의 round와 마지막 자리가 다를 수 있음)
+    끝나면 영향을 받은 사용자의 일별 합계를 다시 계산하고 영양소 캐시 버전을 올립니다.
+
+    Args:
+        food_ids: 이 음식들의 기록만 (None이면 전체)
+        start_date, end_date: consumed_date 범위 (포함)
+        progress: 배치마다 호출 progress(갱신된 누적 행 수, 마지막 id)
+
+    Returns:
+        Tuple[int, Set[int]]: (갱신된 행 수, 영향을 받은 사용자 id)
+    """
+    if food_ids is not None:
+        food_ids = list(food_ids)
+        if not food_ids:
+            return 0, set()
+
+    queryset = FoodLog.objects.order_by('id')
+    if food_ids is not None:
+        queryset = queryset.filter(food_id__in=food_ids)
+    if start_date:
+        queryset = queryset.filter(consumed_date__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(consumed_date__lte=end_date)
+
+    quote = connection.ops.quote_name
+    assignments = ', '.join(
+        f'{quote("total_" + name)} = ROUND(CAST(f.{quote(name)} * fl.{quote("quantity")} / %s AS NUMERIC), 1)'
+        for name in NUTRIENT_NAMES
+    )
+    conditions = ['fl.food_id = f.id', 'fl.id > %s', 'fl.id <= %s']
+    filter_params = []
+    if food_ids is not None:
+        conditions.append(f'fl.food_id IN ({", ".join(["%s"] * len(food_ids))})')
+        filter_params.extend(food_ids)
+    if start_date:
+        conditions.append('fl.consumed_date >= %s')
+        filter_params.append(start_date)
+    if end_date:
+        conditions.append('fl.consumed_date <= %s')
+        filter_params.append(end_date)
+    sql = (
+        f'UPDATE {quote(FoodLog._meta.db_table)} AS fl SET {assignments} '
+        f'FROM {quote(Food._meta.db_table)} AS f '
+        f'WHERE {" AND ".join(conditions)} '
+        f'RETURNING user_id'
+    )
+
+    updated = 0
+    user_ids = set()
+    last_id = 0
+    while True:
+        # 이번 배치의 마지막 id (batch_size번째 행, 없으면 남은 행의 마지막)
+        upper = list(queryset.filter(id__gt=last_id).values_list('id', flat=True)[batch_size - 1:batch_size])
+        if not upper:
+            upper = list(queryset.filter(id__gt=last_id).reverse().values_list('id', flat=True)[:1])
+            if not upper:
+                break
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [FOOD_BASIS_GRAMS] * len(NUTRIENT_NAMES) + [last_id, upper[0]] + filter_params)
+            rows = cursor.fetchall()
+        updated += len(rows)
+        user_ids.update(row[0] for row in rows)
+        last_id = upper[0]
+        if progress:
+            progress(updated, last_id)
+
+    if user_ids:
+        if food_ids is None:
+            rebuild_daily_summaries(None, start_date, end_date)
+        else:
+            sorted_ids = sorted(user_ids)
+            for i in range(0, len(sorted_ids), 1000):
+                rebuild_daily_summaries(sorted_ids[i:i + 1000], start_date, end_date)
+    bump_nutrition_cache_versions(user_ids)
+    logger.info(f"🔁 FoodLog 영양소 재계산: {updated}개, 사용자 {len(user_ids)}명")
+    return updated, user_ids
 
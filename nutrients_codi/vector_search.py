@@ -0,0 +1,326 @@
+"""
+pgvector 기반 음식 임베딩 검색 헬퍼
+- 여러 쿼리 벡터를 한 번의 SQL로 검색 (multi-probe)
+- 축소 표현(halfvec/binary) 인덱스로 후보 검색 후 1536차원으로 재정렬 (FOOD_VECTOR_SEARCH_MODE)
+- 쿼리마다 hnsw.ef_search를 SET LOCAL로 지정 (FOOD_HNSW_EF_SEARCH, 트랜잭션 안에서만 적용)
+- 트라이그램(pg_trgm GIN) + 벡터 순위를 reciprocal rank fusion으로 합친 하이브리드 검색
+- FOOD_SEARCH_BACKEND='ann'이면 메모리 매핑된 ANN 인덱스(ann_index)로 검색
+"""
+
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import Food
+
+logger = logging.getLogger(__name__)
+
+
+def to_vector_literal(vector: Sequence[float]) -> str:
+    """파이썬 리스트를 pgvector 텍스트 표현('[0.1,0.2,...]')으로 변환"""
+    return '[' + ','.join(repr(float(x)) for x in vector) + ']'
+
+
+# 후보 검색용 축소 표현 (create_hnsw_index_1536 --mode 로 만든 표현식 인덱스와 같은 식이어야 인덱스를 사용)
+HNSW_INDEX_NAMES = {
+    'full': 'nutrients_codi_food_embedding_hnsw_idx',
+    'halfvec': 'nutrients_codi_food_embedding_halfvec_hnsw_idx',
+    'binary': 'nutrients_codi_food_embedding_binary_hnsw_idx',
+}
+
+
+def reduced_vector_expression(column: str, mode: str, dimensions: int) -> str:
+    """
+    후보 검색에 사용할 축소 표현 SQL 식
+
+    - halfvec: 앞쪽 N차원만 잘라 float16으로 (Gemini 임베딩은 앞쪽 차원에 정보가 몰려 있음)
+    - binary: 부호만 남긴 1536비트 (해밍 거리)
+    """
+    if mode == 'halfvec':
+        return f'(subvector({column}, 1, {int(dimensions)})::halfvec({int(dimensions)}))'
+    if mode == 'binary':
+        return f'(binary_quantize({column})::bit(1536))'
+    raise ValueError(f'지원하지 않는 벡터 검색 모드: {mode}')
+
+
+def reduced_distance_operator(mode: str) -> str:
+    return '<~>' if mode == 'binary' else '<=>'
+
+
+def set_local_ef_search(cursor, ef_search: Optional[int]) -> None:
+    """
+    현재 트랜잭션에만 hnsw.ef_search 적용 (transaction.atomic 안에서 호출)
+
+    SET LOCAL은 트랜잭션이 끝나면 되돌아가므로 커넥션 풀/영구 연결에 설정이 남지 않습니다.
+    ef_search가 None 또는 0이면 서버 기본값(40)을 그대로 사용합니다.
+    """
+    if ef_search:
+        # SET은 바인드 파라미터를 받지 않으므로 정수로 검증 후 직접 넣음
+        cursor.execute(f'SET LOCAL hnsw.ef_search = {int(ef_search)}')
+
+
+def search_foods_for_vectors(
+    vectors: Sequence[Sequence[float]],
+    k: int = 1,
+    max_distance: Optional[float] = None,
+    mode: Optional[str] = None,
+    ef_search: Optional[int] = None,
+) -> List[List[Tuple[int, float]]]:
+    """
+    여러 임베딩 벡터 각각에 대해 가까운 음식 k개를 한 번의 쿼리로 찾습니다.
+
+    LATERAL 서브쿼리마다 `ORDER BY embedding <=> q LIMIT k`를 실행하므로
+    프로브마다 HNSW 인덱스를 그대로 사용합니다.
+
+    mode가 'halfvec' 또는 'binary'면 2단계로 검색합니다: 작은 표현식 인덱스로
+    후보 FOOD_VECTOR_RERANK_K개를 찾고, 그 후보만 1536차원 코사인 거리로 다시 정렬합니다.
+
+    Args:
+        vectors: 쿼리 임베딩 벡터 리스트
+        k: 쿼리당 반환할 음식 수
+        max_distance: 허용할 최대 코사인 거리 (None이면 제한 없음)
+        mode: 'full', 'halfvec', 'binary' (기본값: FOOD_VECTOR_SEARCH_MODE)
+        ef_search: HNSW 탐색 후보 수 (기본값: FOOD_HNSW_EF_SEARCH, 클수록 정확하지만 느림)
+
+    Returns:
+        입력 순서대로 [(food_id, distance), ...] (거리 오름차순)
+    """
+    if not vectors:
+        return []
+
+    mode = mode or settings.FOOD_VECTOR_SEARCH_MODE
+    ef_search = settings.FOOD_HNSW_EF_SEARCH if ef_search is None else ef_search
+    table = Food._meta.db_table
+    params: list = [[to_vector_literal(v) for v in vectors]]
+
+    if mode == 'full':
+        candidates = f"""
+            SELECT f.id, f.embedding <=> q.vec::vector AS distance
+            FROM {table} f
+            WHERE f.embedding IS NOT NULL
+            ORDER BY f.embedding <=> q.vec::vector
+            LIMIT %s
+        """
+        params.append(k)
+    else:
+        dimensions = settings.FOOD_VECTOR_HALFVEC_DIMENSIONS
+        food_expr = reduced_vector_expression('f.embedding', mode, dimensions)
+        query_expr = reduced_vector_expression('q.vec::vector', mode, dimensions)
+        operator = reduced_distance_operator(mode)
+        candidates = f"""
+            SELECT c.id, c.embedding <=> q.vec::vector AS distance
+            FROM (
+                SELECT f.id, f.embedding
+                FROM {table} f
+                WHERE f.embedding IS NOT NULL
+                ORDER BY {food_expr} {operator} {query_expr}
+                LIMIT %s
+            ) c
+            ORDER BY distance
+            LIMIT %s
+        """
+        rerank_k = max(settings.FOOD_VECTOR_RERANK_K, k)
+        params.extend([rerank_k, k])
+        # 인덱스 스캔은 ef_search개까지만 반환하므로 재정렬 후보 수보다 작으면 후보가 잘림
+        if ef_search:
+            ef_search = max(ef_search, rerank_k)
+
+    sql = f"""
+        SELECT q.ord, m.id, m.distance
+        FROM unnest(%s::text[]) WITH ORDINALITY AS q(vec, ord)
+        CROSS JOIN LATERAL ({candidates}) m
+    """
+    if max_distance is not None:
+        sql += " WHERE m.distance < %s"
+        params.append(max_distance)
+    sql += " ORDER BY q.ord, m.distance"
+
+    results: List[List[Tuple[int, float]]] = [[] for _ in vectors]
+    with transaction.atomic(), connection.cursor() as cursor:
+        set_local_ef_search(cursor, ef_search)
+        cursor.execute(sql, params)
+        for ord_, food_id, distance in cursor.fetchall():
+            results[ord_ - 1].append((food_id, float(distance)))
+
+    return results
+
+
+def nearest_foods_for_vectors(
+    vectors: Sequence[Sequence[float]],
+    max_distance: float,
+    mode: Optional[str] = None,
+    ef_search: Optional[int] = None,
+) -> List[Optional[Tuple[int, float]]]:
+    """
+    여러 임베딩 벡터 각각에 대해 가장 가까운 음식을 한 번의 쿼리로 찾습니다. (search_foods_for_vectors k=1)
+
+    Returns:
+        입력 순서대로 (food_id, distance) 또는 None
+    """
+    return [
+        hits[0] if hits else None
+        for hits in search_foods_for_vectors(vectors, k=1, max_distance=max_distance, mode=mode, ef_search=ef_search)
+    ]
+
+
+def similar_foods(
+    vector: Sequence[float],
+    k: int = 5,
+    max_distance: Optional[float] = None,
+    ef_search: Optional[int] = None,
+) -> List[Tuple[Food, float]]:
+    """
+    임베딩 벡터와 가까운 음식 k개를 거리순으로 반환합니다.
+
+    pgvector 1536차원(full) 모드는 embedding 컬럼을 제외하고 거리를 annotate한 쿼리 1회로 끝나고,
+    ANN 인덱스 / halfvec·binary 모드는 id 검색 후 in_bulk 1회로 Food를 가져옵니다.
+
+    Returns:
+        [(Food, 코사인 거리), ...]
+    """
+    hits: Optional[List[Tuple[int, float]]] = None
+    if settings.FOOD_SEARCH_BACKEND == 'ann':
+        from .ann_index import get_food_ann_index
+        index = get_food_ann_index()
+        if index is not None:
+            hits = [(food_id, 1 - similarity) for food_id, similarity in index.search([vector], k=k)[0]]
+            if max_distance is not None:
+                hits = [hit for hit in hits if hit[1] < max_distance]
+    if hits is None and settings.FOOD_VECTOR_SEARCH_MODE != 'full':
+        hits = search_foods_for_vectors([vector], k=k, max_distance=max_distance, ef_search=ef_search)[0]
+
+    if hits is not None:
+        foods = Food.objects.defer('embedding').in_bulk([food_id for food_id, _ in hits])
+        return [(foods[food_id], distance) for food_id, distance in hits if food_id in foods]
+
+    from pgvector.django import CosineDistance
+
+    queryset = Food.objects.defer('embedding').filter(embedding__isnull=False).annotate(
+        distance=CosineDistance('embedding', list(vector))
+    )
+    if max_distance is not None:
+        queryset = queryset.filter(distance__lt=max_distance)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        set_local_ef_search(cursor, ef_search)
+        foods = list(queryset.order_by('distance')[:k])
+    return [(food, float(food.distance)) for food in foods]
+
+
+def trigram_name_expression(column: str) -> str:
+    """트라이그램 인덱스 식 (마이그레이션 0017의 인덱스와 같은 식, 입력은 normalize_food_name으로 맞춤)"""
+    return f"lower(replace({column}, ' ', ''))"
+
+
+def hybrid_search_foods(
+    names: Sequence[str],
+    vectors: Sequence[Optional[Sequence[float]]],
+    candidates: Optional[int] = None,
+    ef_search: Optional[int] = None,
+) -> List[Optional[Dict]]:
+    """
+    음식명 트라이그램 유사도 순위와 임베딩 거리 순위를 RRF로 합쳐 음식마다 1위를 한 번의 쿼리로 찾습니다.
+
+    프로브마다 트라이그램 후보(GIN 인덱스, `%` 연산자)와 벡터 후보(HNSW 인덱스)를
+    각각 candidates개씩 가져와 FULL OUTER JOIN하고 1 / (FOOD_RRF_K + 순위) 합으로 정렬합니다.
+    벡터가 None인 음식은 트라이그램 순위만으로 정렬됩니다.
+
+    Args:
+        names: 음식명 리스트 (normalize_food_name으로 정규화해 비교)
+        vectors: names와 같은 순서의 임베딩 벡터 또는 None
+        candidates: 순위별 후보 수 (기본값: FOOD_HYBRID_CANDIDATES)
+        ef_search: HNSW 탐색 후보 수 (기본값: FOOD_HNSW_EF_SEARCH)
+
+    Returns:
+        입력 순서대로 {'id', 'score', 'trigram_similarity', 'distance'} 또는 None
+        (trigram_similarity / distance는 해당 순위에 없으면 None)
+    """
+    if not names:
+        return []
+
+    from .text_normalization import normalize_food_name
+
+    candidates = candidates or settings.FOOD_HYBRID_CANDIDATES
+    ef_search = settings.FOOD_HNSW_EF_SEARCH if ef_search is None else ef_search
+    table = Food._meta.db_table
+    name_expr = trigram_name_expression('f.name')
+
+    sql = f"""
+        SELECT q.ord, m.id, m.score, m.trigram_similarity, m.distance
+        FROM unnest(%s::text[], %s::text[]) WITH ORDINALITY AS q(name, vec, ord)
+        CROSS JOIN LATERAL (
+            SELECT COALESCE(t.id, v.id) AS id,
+                   COALESCE(1.0 / (%s + t.rank), 0) + COALESCE(1.0 / (%s + v.rank), 0) AS score,
+                   t.trigram_similarity,
+                   v.distance
+            FROM (
+                SELECT c.id, c.trigram_similarity,
+                       row_number() OVER (ORDER BY c.trigram_similarity DESC, c.id) AS rank
+                FROM (
+                    SELECT f.id, similarity({name_expr}, q.name) AS trigram_similarity
+                    FROM {table} f
+                    WHERE {name_expr} %% q.name
+                    ORDER BY trigram_similarity DESC
+                    LIMIT %s
+                ) c
+            ) t
+            FULL OUTER JOIN (
+                SELECT c.id, c.distance,
+                       row_number() OVER (ORDER BY c.distance, c.id) AS rank
+                FROM (
+                    SELECT f.id, f.embedding <=> q.vec::vector AS distance
+                    FROM {table} f
+                    WHERE q.vec IS NOT NULL AND f.embedding IS NOT NULL
+                    ORDER BY f.embedding <=> q.vec::vector
+                    LIMIT %s
+                ) c
+            ) v ON t.id = v.id
+            ORDER BY score DESC, t.trigram_similarity DESC NULLS LAST
+            LIMIT 1
+        ) m
+    """
+    params = [
+        [normalize_food_name(name) for name in names],
+        [to_vector_literal(v) if v else None for v in vectors],
+        settings.FOOD_RRF_K, settings.FOOD_RRF_K,
+        candidates, candidates,
+    ]
+
+    results: List[Optional[Dict]] = [None] * len(names)
+    with transaction.atomic(), connection.cursor() as cursor:
+        set_local_ef_search(cursor, ef_search)
+        # `%` 연산자가 사용하는 후보 임계값 (SET은 바인드 파라미터를 받지 않으므로 실수로 검증 후 직접 넣음)
+        cursor.execute(f'SET LOCAL pg_trgm.similarity_threshold = {float(settings.FOOD_TRIGRAM_THRESHOLD)}')
+        cursor.execute(sql, params)
+        for ord_, food_id, score, trigram_similarity, distance in cursor.fetchall():
+            results[ord_ - 1] = {
+                'id': food_id,
+                'score': float(score),
+                'trigram_similarity': float(trigram_similarity) if trigram_similarity is not None else None,
+                'distance': float(distance) if distance is not None else None,
+            }
+
+    return results
+
+
+def nearest_foods(
+    vectors: Sequence[Sequence[float]],
+    max_distance: float,
+    ef_search: Optional[int] = None,
+) -> List[Optional[Tuple[int, float]]]:
+    """
+    FOOD_SEARCH_BACKEND 설정에 따라 pgvector 또는 ANN 인덱스로 최근접 음식 검색
+
+    ef_search는 pgvector HNSW 검색에만 적용됩니다 (ANN 인덱스는 FOOD_ANN_NPROBE).
+
+    Returns:
+        입력 순서대로 (food_id, distance) 또는 None
+    """
+    if settings.FOOD_SEARCH_BACKEND == 'ann':
+        from .ann_index import get_food_ann_index, nearest_foods_for_vectors_ann
+        if get_food_ann_index() is not None:
+            return nearest_foods_for_vectors_ann(vectors, max_distance)
+        logger.warning("[ANN] 인덱스가 없어 pgvector로 검색합니다 (manage.py build_food_ann_index 필요)")
+    return nearest_foods_for_vectors(vectors, max_distance, ef_search=ef_search)
@@ -1,108 +1,45 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from django.db import transaction
 from datetime import date, timedelta
 import json
 import logging
+import math
 
-from .models import Profile, Food, FoodLog
+from .models import Profile, Food, FoodLog, AnalysisJob, DailyNutritionSummary
 from .forms import ProfileForm, FoodAnalysisForm
+from .nutrients import TOTAL_FIELD_NAMES, nutrient_sum_aggregates
 from .utils_optimized import (
     get_today_nutrition_cached,
     get_daily_summaries_optimized,
-    invalidate_nutrition_cache
 )
 
 logger = logging.getLogger(__name__)
 
 def get_daily_summaries(user, days=7):
-    """일별 영양소 종합 데이터를 생성하는 헬퍼 함수"""
-    from django.db.models import Sum, Count
+    """일별 영양소 종합 데이터를 생성하는 헬퍼 함수 (미리 합산된 DailyNutritionSummary 행을 읽음)"""
     from datetime import date, timedelta
     
     today = date.today()
     start_date = today - timedelta(days=days-1)
     
-    # 일별로 그룹화하여 영양소 합계 계산
-    daily_data = FoodLog.objects.filter(
+    # 일별 합계 테이블에서 조회 (FoodLog 기록 수와 무관하게 하루 1행)
+    daily_data = DailyNutritionSummary.objects.filter(
         user=user,
-        consumed_date__gte=start_date,
-        consumed_date__lte=today
-    ).values('consumed_date').annotate(
-        # 기본 영양소
-        total_calories=Sum('total_calories'),
-        total_protein=Sum('total_protein'),
-        total_carbs=Sum('total_carbs'),
-        total_fat=Sum('total_fat'),
-        total_fiber=Sum('total_fiber'),
-        total_sugar=Sum('total_sugar'),
-        
-        # 미네랄
-        total_sodium=Sum('total_sodium'),
-        total_potassium=Sum('total_potassium'),
-        total_calcium=Sum('total_calcium'),
-        total_iron=Sum('total_iron'),
-        total_magnesium=Sum('total_magnesium'),
-        total_phosphorus=Sum('total_phosphorus'),
-        total_zinc=Sum('total_zinc'),
-        total_copper=Sum('total_copper'),
-        total_manganese=Sum('total_manganese'),
-        total_selenium=Sum('total_selenium'),
-        
-        # 비타민
-        total_vitamin_a=Sum('total_vitamin_a'),
-        total_vitamin_b1=Sum('total_vitamin_b1'),
-        total_vitamin_b2=Sum('total_vitamin_b2'),
-        total_vitamin_b3=Sum('total_vitamin_b3'),
-        total_vitamin_b6=Sum('total_vitamin_b6'),
-        total_vitamin_b12=Sum('total_vitamin_b12'),
-        total_vitamin_c=Sum('total_vitamin_c'),
-        total_vitamin_d=Sum('total_vitamin_d'),
-        total_vitamin_e=Sum('total_vitamin_e'),
-        total_vitamin_k=Sum('total_vitamin_k'),
-        total_folate=Sum('total_folate'),
-        total_choline=Sum('total_choline'),
-        
-        # 추가 비타민 및 영양소
-        total_beta_carotene=Sum('total_beta_carotene'),
-        total_niacin=Sum('total_niacin'),
-        total_vitamin_d2=Sum('total_vitamin_d2'),
-        total_vitamin_d3=Sum('total_vitamin_d3'),
-        total_vitamin_k1=Sum('total_vitamin_k1'),
-        total_vitamin_k2=Sum('total_vitamin_k2'),
-        
-        # 추가 미네랄
-        total_iodine=Sum('total_iodine'),
-        total_fluorine=Sum('total_fluorine'),
-        total_chromium=Sum('total_chromium'),
-        total_molybdenum=Sum('total_molybdenum'),
-        total_chlorine=Sum('total_chlorine'),
-        
-        # 기타 영양소
-        total_cholesterol=Sum('total_cholesterol'),
-        total_saturated_fat=Sum('total_saturated_fat'),
-        total_monounsaturated_fat=Sum('total_monounsaturated_fat'),
-        total_polyunsaturated_fat=Sum('total_polyunsaturated_fat'),
-        total_omega3=Sum('total_omega3'),
-        total_omega6=Sum('total_omega6'),
-        total_trans_fat=Sum('total_trans_fat'),
-        total_caffeine=Sum('total_caffeine'),
-        total_alcohol=Sum('total_alcohol'),
-        total_water=Sum('total_water'),
-        total_ash=Sum('total_ash'),
-        
-        # 음식 개수
-        food_count=Count('id')
-    ).order_by('-consumed_date')
+        date__gte=start_date,
+        date__lte=today
+    ).values('date', 'food_count', *TOTAL_FIELD_NAMES).order_by('-date')
     
     # 결과를 리스트로 변환하고 None 값을 0으로 처리
     daily_summaries = []
     for day_data in daily_data:
         summary = {
-            'date': day_data['consumed_date'],
+            'date': day_data['date'],
             'food_count': day_data['food_count'],
             'nutrition': {
                 # 기본 영양소
@@ -448,71 +385,13 @@ def daily_detail(request, year, month, day):
         messages.info(request, _('%(date)s에는 기록된 음식이 없습니다.') % {'date': target_date.strftime("%Y년 %m월 %d일")})
         return redirect('nutrients_codi:dashboard')
     
-    # 해당 날짜의 영양소 합계
-    from django.db.models import Sum
-    daily_aggregates = daily_logs.aggregate(
-        # 기본 영양소
-        total_calories=Sum('total_calories'),
-        total_protein=Sum('total_protein'),
-        total_carbs=Sum('total_carbs'),
-        total_fat=Sum('total_fat'),
-        total_fiber=Sum('total_fiber'),
-        total_sugar=Sum('total_sugar'),
-        
-        # 미네랄
-        total_sodium=Sum('total_sodium'),
-        total_potassium=Sum('total_potassium'),
-        total_calcium=Sum('total_calcium'),
-        total_iron=Sum('total_iron'),
-        total_magnesium=Sum('total_magnesium'),
-        total_phosphorus=Sum('total_phosphorus'),
-        total_zinc=Sum('total_zinc'),
-        total_copper=Sum('total_copper'),
-        total_manganese=Sum('total_manganese'),
-        total_selenium=Sum('total_selenium'),
-        
-        # 비타민
-        total_vitamin_a=Sum('total_vitamin_a'),
-        total_vitamin_b1=Sum('total_vitamin_b1'),
-        total_vitamin_b2=Sum('total_vitamin_b2'),
-        total_vitamin_b3=Sum('total_vitamin_b3'),
-        total_vitamin_b6=Sum('total_vitamin_b6'),
-        total_vitamin_b12=Sum('total_vitamin_b12'),
-        total_vitamin_c=Sum('total_vitamin_c'),
-        total_vitamin_d=Sum('total_vitamin_d'),
-        total_vitamin_e=Sum('total_vitamin_e'),
-        total_vitamin_k=Sum('total_vitamin_k'),
-        total_folate=Sum('total_folate'),
-        total_choline=Sum('total_choline'),
-        
-        # 추가 비타민 및 영양소
-        total_beta_carotene=Sum('total_beta_carotene'),
-        total_niacin=Sum('total_niacin'),
-        total_vitamin_d2=Sum('total_vitamin_d2'),
-        total_vitamin_d3=Sum('total_vitamin_d3'),
-        total_vitamin_k1=Sum('total_vitamin_k1'),
-        total_vitamin_k2=Sum('total_vitamin_k2'),
-        
-        # 추가 미네랄
-        total_iodine=Sum('total_iodine'),
-        total_fluorine=Sum('total_fluorine'),
-        total_chromium=Sum('total_chromium'),
-        total_molybdenum=Sum('total_molybdenum'),
-        total_chlorine=Sum('total_chlorine'),
-        
-        # 기타 영양소
-        total_cholesterol=Sum('total_cholesterol'),
-        total_saturated_fat=Sum('total_saturated_fat'),
-        total_monounsaturated_fat=Sum('total_monounsaturated_fat'),
-        total_polyunsaturated_fat=Sum('total_polyunsaturated_fat'),
-        total_omega3=Sum('total_omega3'),
-        total_omega6=Sum('total_omega6'),
-        total_trans_fat=Sum('total_trans_fat'),
-        total_caffeine=Sum('total_caffeine'),
-        total_alcohol=Sum('total_alcohol'),
-        total_water=Sum('total_water'),
-        total_ash=Sum('total_ash')
-    )
+    # 해당 날짜의 영양소 합계 (일별 합계 행, 없으면 기록을 직접 집계)
+    daily_aggregates = DailyNutritionSummary.objects.filter(
+        user=request.user,
+        date=target_date
+    ).values(*TOTAL_FIELD_NAMES).first()
+    if daily_aggregates is None:
+        daily_aggregates = daily_logs.aggregate(**nutrient_sum_aggregates())
     
     # 프로필 정보 (권장량 계산용)
     try:
@@ -819,9 +698,9 @@ def analyze_food(request):
             
             try:
                 # AI 서비스 초기화
-                from .ai_service import GeminiAIService
+                from .ai_service import get_gemini_service
                 try:
-                    ai_service = GeminiAIService()
+                    ai_service = get_gemini_service()
                     logger.info("🤖 AI 서비스 초기화 성공")
                 except ValueError as e:
                     logger.error(f"❌ AI 서비스 초기화 실패: {e}")
@@ -831,162 +710,13 @@ def analyze_food(request):
                     })
                 
                 # 브라우저 언어 감지
-                from .utils import get_browser_language, get_language_messages
+                from .utils import get_browser_language
                 browser_language = get_browser_language(request)
-                messages = get_language_messages(browser_language)
                 
-                # AI 분석 실행 (식사 유형 자동 분석)
-                logger.info(f"🔍 AI 분석 시작: '{food_text}' (언어: {browser_language})")
-                ai_results = ai_service.analyze_food_text(food_text, browser_language)
-                logger.info(f"📋 AI 분석 결과: {ai_results}")
-                
-                if not ai_results:
-                    logger.warning("⚠️ AI 분석 결과가 비어있음")
-                    return JsonResponse({
-                        'success': False,
-                        'message': messages['analysis_failed']
-                    })
-                
-                # 분석 결과를 FoodLog로 저장
-                saved_count = 0
-                not_found_foods = []
-                saved_foods = []
-                
-                logger.info(f"🎯 음식 매칭 시작: {len(ai_results)}개 결과")
-                
-                for i, result in enumerate(ai_results):
-                    logger.info(f"🍽️ 음식 {i+1} 처리 시작: {result}")
-                    
-                    food_name = result.get('food_name', '')
-                    quantity = result.get('quantity', 100)  # 기본값 100g
-                    # AI가 분석한 식사유형 (기본값: lunch)
-                    result_meal_type = result.get('meal_type', 'lunch')
-                    
-                    logger.info(f"음식명: '{food_name}', 수량: {quantity}, 식사유형: '{result_meal_type}'")
-                    
-                    # meal_type 검증 및 정규화
-                    valid_meal_types = ['breakfast', 'lunch', 'dinner', 'snack']
-                    if result_meal_type not in valid_meal_types:
-                        logger.warning(f"유효하지 않은 meal_type: '{result_meal_type}', 'lunch'로 변경")
-                        result_meal_type = 'lunch'
-                    
-                    # 음식 데이터베이스에서 검색
-                    food = None
-                    search_method = None
-                    
-                    # 1. 정확한 이름으로 검색 (인덱스 최적화)
-                    try:
-                        food = Food.objects.select_related().get(name=food_name)
-                        search_method = "정확한 이름 매칭"
-                        logger.info(f"✅ [{search_method}] 성공: '{food_name}'")
-                    except Food.DoesNotExist:
-                        logger.info(f"❌ [정확한 이름 매칭] 실패: '{food_name}'")
-                        pass
-                    
-                    # 2. 임베딩 기반 유사 음식 검색
-                    if not food:
-                        try:
-                            logger.info(f"🔍 [임베딩 검색] 시도: '{food_name}'")
-                            similar_match = ai_service.find_similar_food_by_embedding(food_name, threshold=0.95)
-                            if similar_match:
-                                food = similar_match['food']
-                                search_method = "임베딩 기반 유사 검색"
-                                logger.info(f"✅ [{search_method}] 성공: '{food_name}' -> '{food.name}' (유사도: {similar_match['similarity']:.3f})")
-                            else:
-                                logger.info(f"❌ [임베딩 검색] 실패: '{food_name}' (유사도 임계값 미달)")
-                        except Exception as e:
-                            logger.warning(f"❌ [임베딩 검색] 오류: {e}")
-                    
-                    # 3. 문자열 유사도 기반 유사 음식 검색
-                    # if not food:
-                    #     try:
-                    #         logger.info(f"🔍 [문자열 유사도 검색] 시도: '{food_name}'")
-                    #         similar_match = ai_service.find_similar_food_by_string_matching(food_name, threshold=0.95)
-                    #         if similar_match:
-                    #             food = similar_match['food']
-                    #             search_method = "문자열 유사도 기반 검색"
-                    #             logger.info(f"✅ [{search_method}] 성공: '{food_name}' -> '{food.name}' (유사도: {similar_match['similarity']:.3f})")
-                    #         else:
-                    #             logger.info(f"❌ [문자열 유사도 검색] 실패: '{food_name}' (유사도 임계값 미달)")
-                    #     except Exception as e:
-                    #         logger.error(f"❌ [문자열 유사도 검색] 오류: {e}")
-                    
-                    # 4. LLM으로 새로운 음식 생성
-                    if not food:
-                        try:
-                            logger.info(f"🤖 [LLM 생성] 시도: '{food_name}'")
-                            llm_match = ai_service.create_food_from_llm(food_name)
-                            if llm_match:
-                                food = llm_match['food']
-                                search_method = "LLM 기반 새 음식 생성"
-                                logger.info(f"✅ [{search_method}] 성공: '{food_name}' -> '{food.name}'")
-                            else:
-                                logger.info(f"❌ [LLM 생성] 실패: '{food_name}'")
-                        except Exception as e:
-                            logger.error(f"LLM 기반 음식 생성 실패: {e}")
-                    
-                    if food:
-                        # FoodLog 생성
-                        try:
-                            food_log = FoodLog.objects.create(
-                                user=request.user,
-                                food=food,
-                                quantity=quantity,
-                                meal_type=result_meal_type,
-                                original_text=food_text,
-                                ai_analysis=result
-                            )
-                            logger.info(f"💾 FoodLog 저장 완료: {food.name} ({quantity}g) - {search_method}")
-                            
-                            # 캐시 무효화 (최적화: 저장 직후 캐시 삭제)
-                            invalidate_nutrition_cache(request.user, food_log.consumed_date)
-                        except Exception as e:
-                            logger.error(f"❌ FoodLog 생성 실패: {e}")
-                            logger.error(f"Food: {food.name}, Quantity: {quantity}, Meal Type: {result_meal_type}")
-                            continue
-                        
-                        saved_count += 1
-                        saved_foods.append({
-                            'name': food.name,
-                            'quantity': quantity,
-                            'meal_type': result_meal_type,
-                            'calories': food_log.total_calories,
-                            'protein': food_log.total_protein,
-                            'carbs': food_log.total_carbs,
-                            'fat': food_log.total_fat,
-                        })
-                    else:
-                        logger.warning(f"❌ 모든 검색 방법 실패: '{food_name}'")
-                        not_found_foods.append(food_name)
-                
-                # 결과 메시지 생성
-                logger.info(f"📊 분석 결과 요약: 총 {len(ai_results)}개 음식 분석, {saved_count}개 저장 성공, {len(not_found_foods)}개 실패")
-                
-                if saved_count > 0:
-                    message = f'{saved_count}{messages["analysis_success"]}'
-                    if not_found_foods:
-                        if browser_language == 'ko':
-                            message += f' (찾을 수 없는 음식: {", ".join(not_found_foods)})'
-                        else:
-                            message += f' (Foods not found: {", ".join(not_found_foods)})'
-                    
-                    logger.info(f"✅ 최종 결과: {message}")
-                    return JsonResponse({
-                        'success': True,
-                        'message': message,
-                        'saved_foods': saved_foods,
-                        'not_found_foods': not_found_foods,
-                        'saved_count': saved_count,
-                        'language': browser_language
-                    })
-                else:
-                    logger.warning(f"❌ 최종 결과: 모든 음식 분석 실패")
-                    return JsonResponse({
-                        'success': False,
-                        'message': messages['food_not_found'],
-                        'not_found_foods': not_found_foods,
-                        'language': browser_language
-                    })
+                # AI 분석 → 일괄 매칭 → 일괄 저장 (식사 유형 자동 분석)
+                from .food_analysis import run_food_analysis
+                result = run_food_analysis(ai_service, request.user, food_text, browser_language)
+                return JsonResponse(result)
                 
             except Exception as e:
                 logger.error(f"음식 분석 중 오류: {e}", exc_info=True)
@@ -1007,16 +737,260 @@ def analyze_food(request):
     })
 
 
+@login_required
+def analyze_food_stream(request):
+    """
+    음식 분석 처리 (스트리밍, NDJSON)
+
+    파싱된 음식 목록 → 저장된 음식(매칭되는 대로 하나씩) → 최종 요약 순서로
+    한 줄에 JSON 하나씩 내보냅니다. 각 줄의 'event' 키로 구분합니다.
+    """
+    if request.method != 'POST':
+        return JsonResponse({
+            'success': False,
+            'message': '잘못된 요청입니다.'
+        })
+
+    form = FoodAnalysisForm(request.POST)
+    if not form.is_valid():
+        logger.error(f"폼 검증 실패: {form.errors}")
+        return JsonResponse({
+            'success': False,
+            'message': '입력이 올바르지 않습니다.'
+        })
+
+    food_text = form.cleaned_data['food_text']
+    logger.info(f"음식 분석 스트리밍 요청 시작: {request.user.username}")
+
+    from .ai_service import get_gemini_service
+    try:
+        ai_service = get_gemini_service()
+    except ValueError as e:
+        logger.error(f"❌ AI 서비스 초기화 실패: {e}")
+        return JsonResponse({
+            'success': False,
+            'message': 'AI 서비스가 설정되지 않았습니다. 관리자에게 문의하세요.'
+        })
+
+    from .utils import get_browser_language
+    from .food_analysis import stream_food_analysis
+    events = stream_food_analysis(ai_service, request.user, food_text, get_browser_language(request))
+
+    response = StreamingHttpResponse(
+        (json.dumps(event, ensure_ascii=False) + '\n' for event in events),
+        content_type='application/x-ndjson; charset=utf-8'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx 버퍼링 방지 (이벤트 즉시 전달)
+    return response
+
+@login_required
+def enqueue_food_analysis(request):
+    """음식 분석 작업 등록 (백그라운드 처리, 작업 ID를 바로 반환)"""
+    if request.method != 'POST':
+        return JsonResponse({
+            'success': False,
+            'message': '잘못된 요청입니다.'
+        })
+
+    form = FoodAnalysisForm(request.POST)
+    if not form.is_valid():
+        logger.error(f"폼 검증 실패: {form.errors}")
+        return JsonResponse({
+            'success': False,
+            'message': '입력이 올바르지 않습니다.'
+        })
+
+    from .utils import get_browser_language
+    from .analysis_jobs import enqueue_analysis_job
+    job = enqueue_analysis_job(request.user, form.cleaned_data['food_text'], get_browser_language(request))
+
+    return JsonResponse({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': reverse('nutrients_codi:analysis_job_status', args=[job.id]),
+    }, status=202)
+
+
+@login_required
+def analysis_job_status(request, job_id):
+    """음식 분석 작업 상태 조회 (폴링용)"""
+    from .analysis_jobs import serialize_analysis_job
+    job = get_object_or_404(AnalysisJob, id=job_id, user=request.user)
+    return JsonResponse(serialize_analysis_job(job))
+
+@login_required
+def similar_foods(request):
+    """
+    비슷한 음식 후보 조회 (GET ?q=음식명&k=5)
+
+    매칭되지 않은 음식을 LLM으로 새로 만들기 전에 "혹시 이 음식인가요?" 후보로 보여줄 때 사용합니다.
+    """
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({
+            'success': False,
+            'message': '검색할 음식명을 입력해주세요.'
+        })
+
+    try:
+        k = min(max(int(request.GET.get('k', 5)), 1), 20)
+    except ValueError:
+        k = 5
+
+    from .ai_service import get_gemini_service
+    try:
+        ai_service = get_gemini_service()
+    except ValueError as e:
+        logger.error(f"❌ AI 서비스 초기화 실패: {e}")
+        return JsonResponse({
+            'success': False,
+            'message': 'AI 서비스가 설정되지 않았습니다. 관리자에게 문의하세요.'
+        })
+
+    candidates = ai_service.find_similar_foods(query, k=k)
+    return JsonResponse({
+        'success': True,
+        'query': query,
+        'candidates': [
+            {
+                'id': candidate['food'].id,
+                'name': candidate['food'].name,
+                'category': candidate['food'].category,
+                'calories': candidate['food'].calories,
+                'protein': candidate['food'].protein,
+                'carbs': candidate['food'].carbs,
+                'fat': candidate['food'].fat,
+                'similarity': round(candidate['similarity'], 4),
+            }
+            for candidate in candidates
+        ],
+    })
+
+@login_required
+def food_autocomplete(request):
+    """음식명 자동완성 (GET ?q=김치 또는 초성 ?q=ㄱㅊㅉㄱ, 메모리 인덱스 - DB/AI 호출 없음)"""
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 20)
+    except ValueError:
+        limit = 10
+
+    from .autocomplete import get_food_autocomplete_index
+    query = request.GET.get('q', '').strip()
+    return JsonResponse({
+        'success': True,
+        'query': query,
+        'results': get_food_autocomplete_index().search(query, limit=limit) if query else [],
+    })
+
+@login_required
+def nutrition_trend(request):
+    """
+    영양소 추이 (GET ?days=90&bucket=week&nutrients=calories,protein 또는 ?start=YYYY-MM-DD&end=YYYY-MM-DD)
+
+    차트용 열 단위 JSON: 날짜 배열 1개 + 영양소마다 값 배열 1개
+    """
+    from .trends import TREND_MAX_DAYS, get_nutrition_trend
+    from .nutrients import BASIC_SUMMARY_NUTRIENTS
+
+    bucket = request.GET.get('bucket', 'day')
+    nutrients = [name.strip() for name in request.GET.get('nutrients', '').split(',') if name.strip()]
+    try:
+        if request.GET.get('start'):
+            start_date = date.fromisoformat(request.GET['start'])
+            end_date = date.fromisoformat(request.GET['end']) if request.GET.get('end') else date.today()
+        else:
+            days = min(max(int(request.GET.get('days', 30)), 1), TREND_MAX_DAYS)
+            end_date = date.today()
+            start_date = end_date - timedelta(days=days - 1)
+    except ValueError:
+        return JsonResponse({
+            'success': False,
+            'message': '기간이 올바르지 않습니다.'
+        })
+
+    if (end_date - start_date).days >= TREND_MAX_DAYS:
+        return JsonResponse({
+            'success': False,
+            'message': f'기간은 최대 {TREND_MAX_DAYS}일까지 조회할 수 있습니다.'
+        })
+
+    try:
+        trend = get_nutrition_trend(request.user, start_date, end_date, bucket, nutrients or BASIC_SUMMARY_NUTRIENTS)
+    except ValueError as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        })
+
+    return JsonResponse({'success': True, **trend})
+
+@login_required
+def log_food(request):
+    """자동완성에서 고른 음식을 바로 기록 (AI 호출 없음)"""
+    if request.method != 'POST':
+        return JsonResponse({
+            'success': False,
+            'message': '잘못된 요청입니다.'
+        })
+
+    from .food_analysis import MAX_FOOD_LOG_QUANTITY, VALID_MEAL_TYPES, meal_type_for_time, serialize_food_log
+
+    try:
+        food_id = int(request.POST.get('food_id', ''))
+        quantity = float(request.POST.get('quantity', 100))
+    except ValueError:
+        return JsonResponse({
+            'success': False,
+            'message': '입력이 올바르지 않습니다.'
+        })
+    # float()는 'nan', 'inf'도 받으므로 유한한 값인지 확인 (일별 합계가 깨지지 않도록)
+    if not math.isfinite(quantity) or not 0 < quantity <= MAX_FOOD_LOG_QUANTITY:
+        return JsonResponse({
+            'success': False,
+            'message': f'섭취량은 0보다 크고 {MAX_FOOD_LOG_QUANTITY}g 이하여야 합니다.'
+        })
+
+    food = Food.objects.defer('embedding').filter(id=food_id).first()
+    if food is None:
+        return JsonResponse({
+            'success': False,
+            'message': '음식을 찾을 수 없습니다.'
+        })
+
+    meal_type = request.POST.get('meal_type')
+    if meal_type not in VALID_MEAL_TYPES:
+        meal_type = meal_type_for_time(timezone.localtime())
+
+    # 일별 합계(시그널)와 함께 커밋 - 영양소 캐시는 커밋 후 시그널에서 무효화
+    with transaction.atomic():
+        food_log = FoodLog.objects.create(
+            user=request.user,
+            food=food,
+            quantity=quantity,
+            meal_type=meal_type,
+            original_text=food.name,
+            ai_analysis={'source': 'autocomplete', 'food_name': food.name, 'quantity': quantity, 'meal_type': meal_type},
+        )
+
+    from .autocomplete import get_food_autocomplete_index
+    get_food_autocomplete_index().record_use(food.id)
+
+    return JsonResponse({
+        'success': True,
+        'message': f'{food.name} {quantity:g}g 기록되었습니다.',
+        'food_log': serialize_food_log(food_log),
+    })
+
 @login_required
 def delete_food_log(request, log_id):
     """음식 기록 삭제"""
     if request.method == 'POST':
         food_log = get_object_or_404(FoodLog, id=log_id, user=request.user)
         consumed_date = food_log.consumed_date
-        food_log.delete()
-        
-        # 캐시 무효화 (최적화)
-        invalidate_nutrition_cache(request.user, consumed_date)
+        with transaction.atomic():
+            food_log.delete()  # 일별 합계는 시그널에서 같은 트랜잭션으로 차감 (캐시는 커밋 후 무효화)
         
         messages.success(request, _('음식 기록이 삭제되었습니다.'))
         
@@ -1039,10 +1013,8 @@ def edit_food_log(request, log_id):
         
         # 영양소 값들 업데이트
         food_log.quantity = quantity
-        food_log.save()  # save() 메서드에서 total_* 값들이 자동으로 재계산됨
-        
-        # 캐시 무효화 (최적화)
-        invalidate_nutrition_cache(request.user, food_log.consumed_date)
+        with transaction.atomic():
+            food_log.save()  # save() 메서드에서 total_* 값들이 자동으로 재계산됨 (일별 합계/캐시는 시그널에서 반영)
         
         messages.success(request, _('음식 기록이 수정되었습니다.'))
         
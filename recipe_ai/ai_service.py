@@ -1,6 +1,7 @@
 import google.generativeai as genai
 import json
 import logging
+import threading
 import time
 from django.conf import settings
 
@@ -499,3 +500,22 @@ Response format:
                 "method": "transcript"
             }
 
+
+
+# 프로세스(gunicorn 워커) 단위로 공유하는 서비스 인스턴스
+_recipe_ai_service = None
+_recipe_ai_service_lock = threading.Lock()
+
+
+def get_recipe_ai_service() -> RecipeAIService:
+    """워커 프로세스당 한 번만 생성되는 RecipeAIService 반환 (스레드 안전, 최초 호출 시 생성)
+
+    Raises:
+        ValueError: GEMINI_API_KEY가 설정되지 않은 경우
+    """
+    global _recipe_ai_service
+    if _recipe_ai_service is None:
+        with _recipe_ai_service_lock:
+            if _recipe_ai_service is None:
+                _recipe_ai_service = RecipeAIService()
+    return _recipe_ai_service
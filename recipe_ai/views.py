@@ -7,7 +7,7 @@ from django.views.decorators.http import require_http_methods
 import logging
 import json
 
-from .ai_service import RecipeAIService
+from .ai_service import get_recipe_ai_service
 from .youtube_service import YouTubeService
 from .models import RecipeSearchHistory, FavoriteRecipe
 
@@ -48,7 +48,7 @@ def recommend_menus(request):
         language = 'en' if browser_language.startswith('en') else 'ko'
         
         # AI 서비스 초기화 및 메뉴 추천
-        ai_service = RecipeAIService()
+        ai_service = get_recipe_ai_service()
         result = ai_service.recommend_menus(user_input, language=language)
         
         if result['status'] != 'success' or not result['foods']:
@@ -105,7 +105,7 @@ def recommend_more_menus(request):
         language = 'en' if browser_language.startswith('en') else 'ko'
         
         # AI에게 추가 메뉴 추천 요청
-        ai_service = RecipeAIService()
+        ai_service = get_recipe_ai_service()
         
         # 프롬프트 수정 - 이미 추천한 메뉴 제외
         if language == 'en':
@@ -240,7 +240,7 @@ def get_recipe_detail(request):
         language = 'en' if browser_language.startswith('en') else 'ko'
         
         youtube_service = YouTubeService()
-        ai_service = RecipeAIService()
+        ai_service = get_recipe_ai_service()
         
         # 댓글 수집
         comments_result = youtube_service.get_video_comments(video_id, max_comments=15)
@@ -296,7 +296,7 @@ def recipe_detail(request, video_id):
             logger.warning(f"API 키 확인 중 오류: {e}")
         
         youtube_service = YouTubeService()
-        ai_service = RecipeAIService()
+        ai_service = get_recipe_ai_service()
         
         # 영상 정보 가져오기
         try:
@@ -528,7 +528,7 @@ def enhance_favorite_with_ai(request):
                 })
             
             # AI 분석 수행
-            ai_service = RecipeAIService()
+            ai_service = get_recipe_ai_service()
             youtube_service = YouTubeService()
             
             # 브라우저 언어 감지
@@ -625,7 +625,7 @@ def add_favorite(request):
         language = 'en' if browser_language.startswith('en') else 'ko'
         
         # AI 댓글 분석
-        ai_service = RecipeAIService()
+        ai_service = get_recipe_ai_service()
         comments_result = youtube_service.get_video_comments(video_id, max_comments=20)
         
         comment_summary = ''